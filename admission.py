@@ -0,0 +1,185 @@
+"""
+Admission control for request handlers.
+
+An AdmissionController caps how many requests of one kind run at once and
+how many may wait for a slot. A request that finds the wait queue full is
+rejected immediately instead of piling up inside the WSGI server, and the
+rejection carries a Retry-After estimate from recent service times.
+
+Waiting requests are granted slots by priority, then round-robin across
+clients, so one API caller submitting many requests cannot starve others.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        reason: 'queue_full', 'client_limit' or 'timeout'
+        retry_after: Suggested wait in whole seconds before retrying
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after} s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('event', 'granted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Bounded concurrency plus a bounded, fair wait queue.
+
+    Args:
+        name: Name used in logs and metrics
+        max_in_flight: Requests allowed to run at once
+        max_queue: Requests allowed to wait for a slot
+        max_wait: Seconds a request may wait before it is rejected
+        max_queued_per_client: Waiting requests allowed per client
+            (default: half the queue, at least one)
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, max_wait: float,
+                 max_queued_per_client: Optional[int] = None):
+        self.name = name
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = max_wait
+        self.max_queued_per_client = max_queued_per_client or max(1, self.max_queue // 2)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        # priority -> client -> waiters in arrival order; clients rotate for fairness
+        self._waiting: Dict[int, "OrderedDict[Hashable, deque]"] = {}
+        # Smoothed time a request holds its slot, for Retry-After
+        self._service_seconds = 1.0
+        self._metrics = {
+            'admitted': 0,
+            'rejected': {'queue_full': 0, 'client_limit': 0, 'timeout': 0},
+            'max_queue_depth': 0,
+            'total_wait_ms': 0.0,
+        }
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue has likely drained"""
+        backlog = (self._queued + self._in_flight) / self.max_in_flight
+        return max(1, int(round(backlog * self._service_seconds)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self._metrics['rejected'][reason] += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    def acquire(self, client: Hashable = None, priority: int = 0) -> float:
+        """
+        Take a slot, waiting in the fair queue if none is free
+
+        Args:
+            client: Identity used for fairness (e.g. the remote address)
+            priority: Higher priorities are granted first
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            AdmissionRejected: If the queue or the client's share of it is
+                full, or no slot was granted within max_wait
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._queued:
+                self._in_flight += 1
+                self._metrics['admitted'] += 1
+                return 0.0
+            if self._queued >= self.max_queue:
+                raise self._reject('queue_full')
+            clients = self._waiting.setdefault(priority, OrderedDict())
+            waiters = clients.setdefault(client, deque())
+            if len(waiters) >= self.max_queued_per_client:
+                if not waiters:
+                    del clients[client]
+                raise self._reject('client_limit')
+            waiter = _Waiter()
+            waiters.append(waiter)
+            self._queued += 1
+            self._metrics['max_queue_depth'] = max(self._metrics['max_queue_depth'], self._queued)
+
+        waiter.event.wait(self.max_wait)
+        with self._lock:
+            if not waiter.granted:
+                # Timed out: leave the queue
+                waiters.remove(waiter)
+                if not waiters and clients.get(client) is waiters:
+                    del clients[client]
+                self._queued -= 1
+                raise self._reject('timeout')
+            waited = time.perf_counter() - started
+            self._metrics['total_wait_ms'] += waited * 1000
+            return waited
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it to the next waiter if there is one"""
+        with self._lock:
+            if service_seconds is not None:
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * service_seconds
+            for priority in sorted(self._waiting, reverse=True):
+                clients = self._waiting[priority]
+                if not clients:
+                    continue
+                # First client in rotation; it moves to the back if it has more waiters
+                client, waiters = next(iter(clients.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                self._queued -= 1
+                self._metrics['admitted'] += 1
+                waiter.granted = True
+                waiter.event.set()
+                # The slot passes straight to the waiter
+                return
+            self._in_flight -= 1
+
+    @contextmanager
+    def admit(self, client: Hashable = None, priority: int = 0) -> Iterator[float]:
+        """Hold a slot for the duration of a with block; yields the wait in seconds"""
+        waited = self.acquire(client, priority)
+        started = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current load, admissions, rejections by reason and mean queue wait"""
+        with self._lock:
+            admitted = self._metrics['admitted']
+            return {
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queue_depth': self._queued,
+                'max_queue_depth': self._metrics['max_queue_depth'],
+                'admitted': admitted,
+                'rejected': dict(self._metrics['rejected']),
+                'avg_wait_ms': self._metrics['total_wait_ms'] / admitted if admitted else 0.0,
+                'avg_service_ms': self._service_seconds * 1000,
+            }
@@ -0,0 +1,265 @@
+"""
+Local retrieval-based answers for common career questions.
+
+Knowledge-base entries (career_knowledge.json) pair example questions with
+an answer template. Queries are matched against the example questions with
+TF-IDF cosine similarity, and the best entry's template is filled in with
+the session's skills, missing skills and target job title. Only answers
+whose score reaches the confidence threshold are returned; anything else
+is left for the LLM.
+"""
+import json
+import logging
+import os
+import string
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Try to import scikit-learn
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+ANSWER_KB_PATH = os.environ.get(
+    "ANSWER_KB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_knowledge.json'))
+# Score a question needs to be answered locally; 0 answers nothing locally.
+# The default is the one choose_threshold picks on ANSWER_EVAL_PATH
+LOCAL_ANSWER_THRESHOLD = float(os.environ.get("LOCAL_ANSWER_THRESHOLD", 0.3))
+# Labeled in-scope and out-of-scope questions for choosing the threshold
+ANSWER_EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_knowledge_eval.json')
+# Context fields templates can use, mapped from the chat context keys
+CONTEXT_FIELDS = ('skills', 'missing_skills', 'job_title')
+# Items of a list-valued context field included in an answer
+MAX_LISTED_ITEMS = 8
+
+_FORMATTER = string.Formatter()
+
+
+def _template_fields(template: str) -> set:
+    return {field for _, field, _, _ in _FORMATTER.parse(template) if field}
+
+
+@dataclass
+class LocalAnswer:
+    """An answer built from a knowledge-base entry"""
+    entry_id: str
+    score: float
+    text: str
+
+
+class AnswerEngine:
+    """
+    TF-IDF retrieval over a career-advice knowledge base.
+
+    Args:
+        entries: Knowledge-base entries, each with ``id``, ``questions``,
+            ``answer`` and optionally ``context`` (field -> sentence added
+            when the field is known) and ``requires`` (fields without which
+            the entry is not used)
+        threshold: Minimum match score for a confident answer
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], threshold: float = LOCAL_ANSWER_THRESHOLD):
+        self.entries = entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._metrics = {'questions': 0, 'answered_locally': 0, 'forwarded': 0,
+                         'total_local_ms': 0.0, 'by_entry': {}}
+        self.vectorizer = None
+        if not SKLEARN_AVAILABLE or not entries:
+            logger.warning("Local answer engine disabled (scikit-learn unavailable or no entries)")
+            return
+
+        # One document per example question, remembered by entry
+        questions, self._question_entry = [], []
+        for index, entry in enumerate(entries):
+            for question in entry['questions']:
+                questions.append(question)
+                self._question_entry.append(index)
+        self._question_entry = np.asarray(self._question_entry)
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, stop_words='english')
+        self._matrix = self.vectorizer.fit_transform(questions)
+        # Words of each entry's example questions, for coverage. The answer is
+        # left out: its advice mentions many words ("formatting", "projects")
+        # the entry does not actually answer questions about
+        self._analyze = self.vectorizer.build_analyzer()
+        self._entry_words = [
+            {term for text in entry['questions'] for term in self._analyze(text) if ' ' not in term}
+            for entry in entries]
+        logger.info(f"Local answer engine indexed {len(questions)} questions for {len(entries)} entries")
+
+    @classmethod
+    def from_file(cls, path: str = ANSWER_KB_PATH, threshold: float = LOCAL_ANSWER_THRESHOLD) -> 'AnswerEngine':
+        """Build an engine from a JSON knowledge-base file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), threshold)
+
+    @staticmethod
+    def _context_values(context: Optional[Dict]) -> Dict[str, str]:
+        values = {}
+        for field in CONTEXT_FIELDS:
+            value = (context or {}).get(field)
+            if isinstance(value, (list, tuple)):
+                value = ', '.join(str(item) for item in list(value)[:MAX_LISTED_ITEMS])
+            if value:
+                values[field] = str(value)
+        return values
+
+    def match(self, query: str, context: Optional[Dict] = None) -> Optional[LocalAnswer]:
+        """
+        Best-matching entry for a query, whatever its score
+
+        The score is the cosine similarity to the closest example question,
+        scaled by the square of the share of the query's words that appear in
+        the entry's example questions, and halved when only one word is
+        shared. The similarity alone ignores words outside the vocabulary, so
+        a specific request ("... formatting in LaTeX", "... at Acme
+        emphasizing my Kafka project") would match a generic entry on the
+        few words it shares with it.
+        Entries whose required context fields are missing are skipped.
+
+        Returns:
+            The filled-in answer, or None if no entry shares terms with the query
+        """
+        if self.vectorizer is None or not query.strip():
+            return None
+        words = {term for term in self._analyze(query) if ' ' not in term}
+        if not words:
+            return None
+        values = self._context_values(context)
+        # Rows are L2-normalised, so the dot product is the cosine similarity
+        similarities = (self._matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        best = None
+        for question in np.flatnonzero(similarities > 0):
+            index = self._question_entry[question]
+            entry = self.entries[index]
+            if not all(field in values for field in entry.get('requires', ())):
+                continue
+            shared = len(words & self._entry_words[index])
+            score = float(similarities[question]) * (shared / len(words)) ** 2
+            if shared < 2:
+                score /= 2
+            if best is None or score > best[0]:
+                best = (score, entry)
+        if best is None:
+            return None
+        return LocalAnswer(best[1]['id'], best[0], self._render(best[1], values))
+
+    @staticmethod
+    def _render(entry: Dict[str, Any], values: Dict[str, str]) -> str:
+        text = entry['answer'].format(**values)
+        for field, sentence in entry.get('context', {}).items():
+            # Add a context sentence only when every field it mentions is known
+            if field in values and _template_fields(sentence) <= values.keys():
+                text += sentence.format(**values)
+        return text
+
+    def answer(self, query: str, context: Optional[Dict] = None) -> Optional[str]:
+        """
+        Answer a question locally if it matches the knowledge base confidently
+
+        Args:
+            query: The user's question
+            context: Chat context with skills, missing_skills and job_title
+
+        Returns:
+            The answer, or None when the question should go to the LLM
+        """
+        started = time.perf_counter()
+        result = self.match(query, context) if self.threshold > 0 else None
+        confident = result is not None and result.score >= self.threshold
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._metrics['questions'] += 1
+            if confident:
+                self._metrics['answered_locally'] += 1
+                self._metrics['total_local_ms'] += elapsed_ms
+                by_entry = self._metrics['by_entry']
+                by_entry[result.entry_id] = by_entry.get(result.entry_id, 0) + 1
+            else:
+                self._metrics['forwarded'] += 1
+        if confident:
+            logger.debug(f"Answered locally from '{result.entry_id}' (score {result.score:.2f})")
+            return result.text
+        return None
+
+    def evaluate(self, labeled: List[Dict[str, Any]], context: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Score labeled questions
+
+        Args:
+            labeled: Items with ``question`` and ``entry`` (the id of the entry
+                that should answer it, or None if it should go to the LLM)
+            context: Chat context used for every question
+
+        Returns:
+            One item per question with its best match and score
+        """
+        results = []
+        for item in labeled:
+            result = self.match(item['question'], context)
+            results.append({'question': item['question'], 'expected': item['entry'],
+                            'matched': result.entry_id if result else None,
+                            'score': result.score if result else 0.0})
+        return results
+
+    @staticmethod
+    def choose_threshold(results: List[Dict[str, Any]], step: float = 0.05) -> float:
+        """
+        Lowest threshold (a multiple of step) that answers no labeled question wrongly
+
+        Out-of-scope questions and questions matched to the wrong entry must
+        score below the threshold; precision matters more than the share
+        answered locally, since a wrong canned answer is worse than an LLM call.
+        """
+        wrong = [result['score'] for result in results
+                 if result['matched'] is not None and result['matched'] != result['expected']]
+        return round((int(max(wrong, default=0.0) / step) + 1) * step, 4)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Questions seen, share answered locally, local latency and entry hits"""
+        with self._lock:
+            questions = self._metrics['questions']
+            local = self._metrics['answered_locally']
+            return {
+                'enabled': self.vectorizer is not None,
+                'threshold': self.threshold,
+                'questions': questions,
+                'answered_locally': local,
+                'forwarded': self._metrics['forwarded'],
+                'local_share': local / questions if questions else 0.0,
+                'avg_local_ms': self._metrics['total_local_ms'] / local if local else 0.0,
+                'by_entry': dict(self._metrics['by_entry']),
+            }
+
+
+if __name__ == '__main__':
+    # Threshold calibration: python answer_engine.py [labeled.json]
+    logging.disable(logging.INFO)
+    with open(sys.argv[1] if len(sys.argv) > 1 else ANSWER_EVAL_PATH, 'r', encoding='utf-8') as f:
+        labeled = json.load(f)
+    engine = AnswerEngine.from_file()
+    sample_context = {'skills': ['Python', 'SQL'], 'missing_skills': ['Docker', 'AWS'],
+                      'job_title': 'Data Engineer'}
+    results = engine.evaluate(labeled, sample_context)
+    threshold = engine.choose_threshold(results)
+    for result in sorted(results, key=lambda result: -result['score']):
+        print(f"{result['score']:.2f}  {str(result['expected']):34} {str(result['matched']):34} "
+              f"{result['question']}")
+    in_scope = [result for result in results if result['expected'] is not None]
+    answered = sum(1 for result in in_scope
+                   if result['matched'] == result['expected'] and result['score'] >= threshold)
+    print(f"threshold {threshold}: {answered}/{len(in_scope)} in-scope questions answered locally, "
+          f"no out-of-scope or wrong answers")
@@ -1,12 +1,23 @@
 import os
 import logging
 import uuid
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response
+from functools import wraps
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response, g
 import werkzeug.utils
 from werkzeug.utils import secure_filename
-from resume_parser import extract_text_from_resume, parse_resume
-from job_recommender import get_job_recommendations
-from chatgpt_service import generate_chatgpt_response, is_api_key_valid
+from resume_parser import PARSE_TIME_BUDGET, extract_text_from_resume, parse_resume
+from extraction_pool import EXTRACTION_WORKERS, ExtractionPool
+from admission import AdmissionController, AdmissionRejected
+from job_recommender import (get_job_recommendations, JOB_CATALOG, RANKING_CASCADE, RANKING_MODE,
+                             build_resume_text, get_experience_level, materialize_page)
+from result_store import RESULTS_DEPTH, SORT_KEYS, ResultStore
+from mem_profiling import MEMORY_PROFILE_HEADER, MemoryProfiler, profile_stage
+from job_filters import FILTER_FIELDS
+from models import Recommendations, Resume
+from chatgpt_service import (generate_chatgpt_response, get_answer_metrics, get_llm_health, get_prompt_metrics,
+                             is_api_key_valid)
+from candidate_index import SPARSE_AVAILABLE, CandidateSearch, CandidateStore
+from bert_integration import get_chunk_cache_metrics, get_encoder_metrics, get_job_embedding_metrics
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -26,16 +37,151 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Job catalog: optional JSON source, admin token for live updates, compaction period
+CATALOG_ADMIN_TOKEN = os.environ.get("CATALOG_ADMIN_TOKEN")
+if os.environ.get("JOB_CATALOG_PATH"):
+    JOB_CATALOG.reload_from_file(os.environ["JOB_CATALOG_PATH"])
+JOB_CATALOG.start_compaction_thread(float(os.environ.get("CATALOG_COMPACTION_INTERVAL", 300)))
+
+# Candidate store for recruiter search: parsed uploads are kept when a path is configured
+RECRUITER_API_TOKEN = os.environ.get("RECRUITER_API_TOKEN")
+CANDIDATE_SEARCH = None
+if os.environ.get("CANDIDATE_STORE_PATH") and SPARSE_AVAILABLE:
+    CANDIDATE_SEARCH = CandidateSearch(CandidateStore(os.environ["CANDIDATE_STORE_PATH"]),
+                                       build_resume_text, get_experience_level)
+
+# Sandboxed extraction workers; EXTRACTION_WORKERS=0 extracts in the web process
+EXTRACTION_POOL = ExtractionPool(EXTRACTION_WORKERS) if EXTRACTION_WORKERS > 0 else None
+
+# Ranked results behind the first page, paged through /api/results/<result_id>.
+# The store is per worker process; a worker without the session's results
+# re-ranks them from the session (see get_session_ranking)
+RESULT_STORE = ResultStore()
+
+# Opt-in memory profiling of request stages (MEMORY_PROFILING=on|sample|off);
+# admins can also profile a single request with the X-Memory-Profile header
+MEMORY_PROFILER = MemoryProfiler(token=CATALOG_ADMIN_TOKEN)
+
+# Admission control: CPU-bound parsing/ranking and I/O-bound chat have separate limits.
+# Requests beyond in-flight + queue are rejected at once with 503 and Retry-After.
+PARSE_ADMISSION = AdmissionController(
+    'parse',
+    max_in_flight=int(os.environ.get("PARSE_MAX_IN_FLIGHT", os.cpu_count() or 2)),
+    max_queue=int(os.environ.get("PARSE_MAX_QUEUE", 2 * (os.cpu_count() or 2))),
+    max_wait=float(os.environ.get("PARSE_MAX_WAIT", 10)))
+CHAT_ADMISSION = AdmissionController(
+    'chat',
+    max_in_flight=int(os.environ.get("CHAT_MAX_IN_FLIGHT", 32)),
+    max_queue=int(os.environ.get("CHAT_MAX_QUEUE", 64)),
+    max_wait=float(os.environ.get("CHAT_MAX_WAIT", 15)))
+
+# Interactive page requests are served ahead of API callers
+PRIORITY_INTERACTIVE = 1
+PRIORITY_API = 0
+
+def admission_controlled(controller, priority=PRIORITY_API):
+    """Run a view only once the controller admits it; clients are told apart by address"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method == 'OPTIONS':
+                return view(*args, **kwargs)
+            with controller.admit(request.remote_addr, priority):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@app.before_request
+def start_memory_profile():
+    """Profile this request's memory if it is sampled or asked for"""
+    g.memory_profile = None
+    if MEMORY_PROFILER.should_profile(request.headers.get(MEMORY_PROFILE_HEADER)):
+        g.memory_profile = MEMORY_PROFILER.begin(f"{request.method} {request.path}")
+
+@app.after_request
+def report_memory_profile(response):
+    """Return the per-stage summary of a profiled request in a response header"""
+    profile = g.get('memory_profile')
+    if profile is not None and profile.stages:
+        response.headers[MEMORY_PROFILE_HEADER] = profile.summary()
+    return response
+
+@app.teardown_request
+def finish_memory_profile(exc):
+    profile = g.pop('memory_profile', None)
+    if profile is not None:
+        MEMORY_PROFILER.end(profile)
+
+def memory_stage(name):
+    """Measure a pipeline stage when the current request is being profiled"""
+    return profile_stage(g.get('memory_profile'), name)
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_request_filters(source):
+    """Collect job filters (location, remote, seniority, industry) from form or query args"""
+    filters = {}
+    for field in FILTER_FIELDS:
+        if field == 'remote':
+            filters[field] = source.get(field, '').lower() in ('1', 'true', 'on', 'yes')
+        else:
+            values = [v.strip() for v in source.getlist(field) if v.strip()]
+            if values:
+                filters[field] = values
+    return {k: v for k, v in filters.items() if v}
+
+def load_session_results():
+    """Decode the parsed resume and recommendations stored in the session, if any"""
+    if 'parsed_data' not in session or 'job_recommendations' not in session:
+        return None, None
+    try:
+        return (Resume.from_bytes(session['parsed_data']),
+                Recommendations.from_bytes(session['job_recommendations']))
+    except (TypeError, ValueError) as e:
+        # Sessions written by an older release hold a different format
+        logging.warning(f"Discarding unreadable session results: {str(e)}")
+        session.pop('parsed_data', None)
+        session.pop('job_recommendations', None)
+        return None, None
+
+def get_session_ranking(result_id):
+    """
+    Ranked results of the current session, re-ranked if this worker lacks them
+    
+    RESULT_STORE lives in one worker process, so a request can reach a worker
+    that never saw the upload, or has evicted its results. The ranking is then
+    rebuilt from the parsed resume and filters kept in the session, against
+    the current job catalog, and stored under the same id.
+    
+    Args:
+        result_id: Result id of the session
+        
+    Returns:
+        RankedResults, or None if the session holds no results
+    """
+    if not result_id or result_id != session.get('result_id'):
+        return None
+    ranking = RESULT_STORE.get(result_id)
+    if ranking is not None:
+        return ranking
+    parsed_data, _ = load_session_results()
+    if parsed_data is None:
+        return None
+    ranking = get_job_recommendations(parsed_data, filters=session.get('result_filters'),
+                                      depth=RESULTS_DEPTH).ranking
+    if ranking is not None:
+        RESULT_STORE.put(ranking, result_id)
+    return ranking
+
 @app.route('/')
 def index():
     """Render the home page"""
     return render_template('index.html')
 
 @app.route('/upload', methods=['POST'])
+@admission_controlled(PARSE_ADMISSION, PRIORITY_INTERACTIVE)
 def upload_resume():
     """Handle resume upload and processing"""
     # Check if a file was submitted
@@ -61,22 +207,45 @@ def upload_resume():
         file.save(filepath)
         
         try:
-            # Extract text from the resume file
-            extracted_text = extract_text_from_resume(filepath, file_extension)
+            # Extract text from the resume file, in a sandboxed worker when the pool is enabled
+            with memory_stage('extraction'):
+                if EXTRACTION_POOL is not None:
+                    result = EXTRACTION_POOL.extract(filepath, file_extension)
+                    extracted_text = result.text
+                else:
+                    result = None
+                    extracted_text = extract_text_from_resume(filepath, file_extension)
+            if result is not None and result.error in ('timeout', 'cpu_limit', 'memory_limit'):
+                flash('The uploaded file took too long or too much memory to read. '
+                      'Please try a simpler PDF or a DOCX version.', 'danger')
+                return redirect(url_for('index'))
             
             if not extracted_text:
                 flash('Could not extract text from the uploaded file', 'danger')
                 return redirect(url_for('index'))
             
-            # Parse the resume using NLP
-            parsed_data = parse_resume(extracted_text)
+            # Parse the resume using NLP, within the configured time budget
+            with memory_stage('parse'):
+                parsed_data = parse_resume(extracted_text, time_budget=PARSE_TIME_BUDGET)
+            
+            # Keep the parsed resume searchable by recruiters
+            if CANDIDATE_SEARCH is not None:
+                CANDIDATE_SEARCH.add(parsed_data)
             
             # Get job recommendations based on the parsed resume
-            job_recommendations = get_job_recommendations(parsed_data)
+            filters = get_request_filters(request.form)
+            with memory_stage('recommend'):
+                job_recommendations = get_job_recommendations(parsed_data, filters=filters, depth=RESULTS_DEPTH)
             
-            # Store the results in the session
-            session['parsed_data'] = parsed_data
-            session['job_recommendations'] = job_recommendations
+            # Store the results in the session in compact binary form; the deeper
+            # ranking stays server-side and is paged on demand
+            with memory_stage('session'):
+                session['parsed_data'] = parsed_data.to_bytes()
+                session['job_recommendations'] = job_recommendations.to_bytes()
+                session.pop('result_id', None)
+                session['result_filters'] = filters
+                if job_recommendations.ranking is not None:
+                    session['result_id'] = RESULT_STORE.put(job_recommendations.ranking)
             
             # Redirect to results page
             return redirect(url_for('show_results'))
@@ -93,16 +262,18 @@ def upload_resume():
 def show_results():
     """Display the parsed resume data and job recommendations"""
     # Check if we have parsed data in the session
-    if 'parsed_data' not in session or 'job_recommendations' not in session:
+    parsed_data, job_recommendations = load_session_results()
+    if parsed_data is None:
         flash('No resume data found. Please upload a resume first.', 'warning')
         return redirect(url_for('index'))
     
-    parsed_data = session['parsed_data']
-    job_recommendations = session['job_recommendations']
-    
+    result_id = session.get('result_id')
+    ranking = get_session_ranking(result_id)
     return render_template('results.html', 
                           parsed_data=parsed_data,
-                          job_recommendations=job_recommendations)
+                          job_recommendations=job_recommendations,
+                          result_id=result_id if ranking is not None else None,
+                          result_total=len(ranking) if ranking is not None else 0)
 
 # Error handlers
 @app.errorhandler(404)
@@ -114,12 +285,26 @@ def file_too_large(e):
     flash('The file is too large. Maximum file size is 16MB.', 'danger')
     return redirect(url_for('index'))
 
+@app.errorhandler(AdmissionRejected)
+def server_busy(e):
+    if request.path.startswith('/api/'):
+        resp = make_response(jsonify({'error': 'Server busy, please retry later', 'reason': e.reason}), 503)
+        resp.headers['Access-Control-Allow-Origin'] = '*'
+    else:
+        flash('The server is busy right now. Please try again in a moment.', 'warning')
+        resp = make_response(render_template('index.html'), 503)
+    resp.headers['Retry-After'] = str(e.retry_after)
+    return resp
+
 @app.errorhandler(500)
 def internal_server_error(e):
+    if request.path.startswith('/api/'):
+        return jsonify({'error': 'Internal server error'}), 500
     flash('An internal server error occurred. Please try again later.', 'danger')
     return redirect(url_for('index'))
 
 @app.route('/api/chat', methods=['POST', 'OPTIONS'])
+@admission_controlled(CHAT_ADMISSION, PRIORITY_INTERACTIVE)
 def chat():
     """API endpoint for the career assistant chatbot"""
     # Handle OPTIONS request for CORS preflight
@@ -147,27 +332,25 @@ def chat():
         
         # Get context from session if available
         context = {}
-        if 'parsed_data' in session and 'job_recommendations' in session:
-            parsed_data = session['parsed_data']
-            job_recommendations = session['job_recommendations']
-            
+        parsed_data, job_recommendations = load_session_results()
+        if parsed_data is not None:
             # Add skills from resume
-            if 'skills' in parsed_data:
-                context['skills'] = parsed_data['skills']
+            context['skills'] = parsed_data.skills
                 
             # Add target job information if available from request
             if 'jobIndex' in data and data['jobIndex'] is not None:
                 try:
                     job_index = int(data['jobIndex'])
-                    if 0 <= job_index < len(job_recommendations['jobs']):
-                        selected_job = job_recommendations['jobs'][job_index]
-                        context['job_title'] = selected_job['title']
-                        context['missing_skills'] = selected_job['missing_skills']
+                    if 0 <= job_index < len(job_recommendations.jobs):
+                        selected_job = job_recommendations.jobs[job_index]
+                        context['job_title'] = selected_job.title
+                        context['missing_skills'] = selected_job.missing_skills
                 except (ValueError, IndexError) as e:
                     logging.error(f"Error processing job index: {str(e)}")
         
         # Generate response using ChatGPT
-        response = generate_chatgpt_response(query, context)
+        with memory_stage('chat'):
+            response = generate_chatgpt_response(query, context)
         
         # Create response with CORS headers
         resp = make_response(jsonify({'response': response}))
@@ -183,5 +366,156 @@ def chat():
         resp.headers['Access-Control-Allow-Origin'] = '*'
         return resp
 
+@app.route('/api/catalog', methods=['POST'])
+def update_catalog():
+    """Apply job posting adds, updates and deletes to the live catalog"""
+    if not CATALOG_ADMIN_TOKEN or request.headers.get('X-Admin-Token') != CATALOG_ADMIN_TOKEN:
+        return jsonify({'error': 'Not authorized'}), 403
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with adds, updates and deletes'}), 400
+    
+    try:
+        if 'jobs' in data:
+            # A full job list replaces the catalog, applied as a diff
+            snapshot = JOB_CATALOG.reload(data['jobs'])
+        else:
+            snapshot = JOB_CATALOG.apply_changes(adds=data.get('adds', []),
+                                                 updates=data.get('updates', []),
+                                                 deletes=data.get('deletes', []))
+        if data.get('compact'):
+            snapshot = JOB_CATALOG.compact(force=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'version': snapshot.version, 'jobs': len(snapshot)})
+
+# Text fields of an inline job posting, and the candidate filters, with their allowed types
+SEARCH_JOB_TEXT_FIELDS = ('title', 'company', 'location', 'description', 'industry', 'experience_level')
+SEARCH_FILTER_FIELDS = ('location', 'experience_level')
+
+def search_request_error(job, filters):
+    """Return why an inline job or filters of a candidate search are malformed, or None"""
+    if job is not None:
+        for field in SEARCH_JOB_TEXT_FIELDS:
+            if field in job and not isinstance(job[field], str):
+                return f"job.{field} must be a string"
+        skills = job.get('required_skills', [])
+        if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+            return 'job.required_skills must be a list of strings'
+        if job.get('remote') is not None and not isinstance(job['remote'], bool):
+            return 'job.remote must be a boolean'
+    if filters is not None:
+        if not isinstance(filters, dict):
+            return 'filters must be an object'
+        for field in SEARCH_FILTER_FIELDS:
+            if filters.get(field) is not None and not isinstance(filters[field], str):
+                return f"filters.{field} must be a string"
+    return None
+
+@app.route('/api/candidates/search', methods=['POST'])
+@admission_controlled(PARSE_ADMISSION, PRIORITY_API)
+def search_candidates():
+    """Rank stored candidates for a job posting (given inline or by catalog id)"""
+    if not RECRUITER_API_TOKEN or request.headers.get('X-Recruiter-Token') != RECRUITER_API_TOKEN:
+        return jsonify({'error': 'Not authorized'}), 403
+    if CANDIDATE_SEARCH is None:
+        return jsonify({'error': 'Candidate search is not enabled'}), 503
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with a job or job_id'}), 400
+    
+    if 'job_id' in data:
+        if not isinstance(data['job_id'], (str, int)) or isinstance(data['job_id'], bool):
+            return jsonify({'error': 'job_id must be a string or an integer'}), 400
+        job = JOB_CATALOG.snapshot.get(data['job_id'])
+        if job is None:
+            return jsonify({'error': f"Unknown job id: {data['job_id']}"}), 404
+    elif isinstance(data.get('job'), dict):
+        job = data['job']
+    else:
+        return jsonify({'error': 'Expected a JSON object with a job or job_id'}), 400
+    
+    error = search_request_error(job if isinstance(job, dict) else None, data.get('filters'))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        top_k = max(1, min(int(data.get('top_k', 10)), 100))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    
+    candidates = CANDIDATE_SEARCH.rank(job, top_k, data.get('filters'))
+    return jsonify({'candidates': candidates, 'total': len(CANDIDATE_SEARCH)})
+
+@app.route('/api/results/<result_id>')
+def get_results_page(result_id):
+    """Return one page of the current session's ranked job matches"""
+    if result_id != session.get('result_id'):
+        return jsonify({'error': 'Unknown result id'}), 404
+    ranking = get_session_ranking(result_id)
+    if ranking is None:
+        return jsonify({'error': 'These results have expired. Please upload your resume again.'}), 404
+    
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    sort = request.args.get('sort', 'match')
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    
+    jobs = materialize_page(ranking, offset, limit, sort)
+    return jsonify({
+        'result_id': result_id,
+        'offset': offset,
+        'limit': limit,
+        'sort': sort,
+        'total': len(ranking),
+        'jobs': [job.to_dict() for job in jobs]
+    })
+
+@app.route('/api/health')
+def health():
+    """Report service health, including the cached state of the OpenAI dependency"""
+    llm = get_llm_health()
+    return jsonify({
+        'status': 'ok' if llm['healthy'] else 'degraded',
+        'llm': llm
+    })
+
+@app.route('/api/admin/memory-profile', methods=['GET', 'DELETE'])
+def memory_profile_report():
+    """Aggregated memory profiles per stage; DELETE clears them"""
+    if not CATALOG_ADMIN_TOKEN or request.headers.get('X-Admin-Token') != CATALOG_ADMIN_TOKEN:
+        return jsonify({'error': 'Not authorized'}), 403
+    if request.method == 'DELETE':
+        MEMORY_PROFILER.reset()
+        return jsonify({'reset': True})
+    try:
+        recent = int(request.args.get('recent', 10))
+    except ValueError:
+        return jsonify({'error': 'recent must be an integer'}), 400
+    return jsonify(MEMORY_PROFILER.report(recent))
+
+@app.route('/api/metrics')
+def metrics():
+    """Expose runtime metrics of the in-process services"""
+    return jsonify({
+        'encoder': get_encoder_metrics(),
+        'job_embeddings': get_job_embedding_metrics(),
+        'resume_chunks': get_chunk_cache_metrics(),
+        'ranking_cascade': RANKING_CASCADE.metrics() if RANKING_MODE == 'cascade' else {},
+        'extraction': EXTRACTION_POOL.metrics() if EXTRACTION_POOL is not None else {},
+        'admission': {'parse': PARSE_ADMISSION.metrics(), 'chat': CHAT_ADMISSION.metrics()},
+        'results': RESULT_STORE.metrics(),
+        'llm': get_llm_health(),
+        'answers': get_answer_metrics(),
+        'prompts': get_prompt_metrics()
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
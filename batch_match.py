@@ -0,0 +1,300 @@
+"""
+Offline all-pairs matching of stored candidates against the job catalog.
+
+Computes fresh top-N job matches for every candidate in a CandidateStore,
+e.g. for email digests after a catalog update:
+
+    python batch_match.py --candidates candidates.bin --output digests/ --top-n 10
+
+Candidates are processed in blocks spread across worker processes. Within a
+block, scores are computed against the catalog in job chunks (a sparse skill
+incidence product plus a TF-IDF similarity product) while a running top-N is
+kept per candidate, so memory stays bounded by block size x chunk size.
+Every finished block is written atomically to its own file and its
+candidate count is recorded in the manifest; a rerun skips blocks whose
+recorded count still matches the store, so an interrupted run resumes where
+it stopped and a partly filled last block picks up newly added candidates.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from candidate_index import CandidateStore
+from job_catalog import validate_posting
+from job_recommender import JOB_CATALOG, build_job_text, build_resume_text
+from models import JobPosting, Resume
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Try to import scipy and scikit-learn
+try:
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    SPARSE_AVAILABLE = True
+except ImportError:
+    SPARSE_AVAILABLE = False
+    logger.warning("scipy/scikit-learn not available. Batch matching is disabled")
+
+MANIFEST_NAME = 'manifest.json'
+
+# Matrices shared with worker processes (set by _init_worker)
+_shared: Dict[str, Any] = {}
+
+
+class MatchMatrices:
+    """
+    Job-side matrices and the candidate-side transforms built from them.
+
+    Skill columns and the TF-IDF vocabulary come from the catalog only, so
+    candidates can be vectorized block by block without a global refit.
+    """
+
+    def __init__(self, jobs: Sequence[JobPosting]):
+        self.job_ids = [job.id for job in jobs]
+        self.skill_columns: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, job in enumerate(jobs):
+            for skill in job.required_skills:
+                rows.append(row)
+                cols.append(self.skill_columns.setdefault(skill.lower(), len(self.skill_columns)))
+        width = max(len(self.skill_columns), 1)
+        # Duplicate entries are summed, matching how calculate_skill_match counts job skills
+        self.job_skills = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(jobs), width))
+        self.job_skill_counts = np.array([len(job.required_skills) for job in jobs], dtype=np.float32)
+
+        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.job_text = self.vectorizer.fit_transform([build_job_text(job) for job in jobs])
+
+    def candidate_skills(self, resumes: Sequence[Resume]):
+        """Binary candidate x skill-column matrix"""
+        rows, cols = [], []
+        for row, resume in enumerate(resumes):
+            for column in {self.skill_columns.get(skill.lower()) for skill in resume.skills}:
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+        return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                 shape=(len(resumes), self.job_skills.shape[1]))
+
+    def candidate_text(self, resumes: Sequence[Resume]):
+        """TF-IDF rows of candidate texts in the catalog vocabulary"""
+        return self.vectorizer.transform([build_resume_text(resume) for resume in resumes])
+
+
+def score_block(matrices: MatchMatrices, resumes: Sequence[Resume], top_n: int,
+                job_chunk: int) -> List[List[tuple]]:
+    """
+    Score a block of candidates against every job, keeping the top N each
+
+    Args:
+        matrices: Catalog matrices
+        resumes: Candidates in this block
+        top_n: Matches kept per candidate
+        job_chunk: Jobs scored per step (bounds the dense score block)
+
+    Returns:
+        Per candidate, (job row, combined, skill, semantic) tuples best first
+    """
+    candidate_skills = matrices.candidate_skills(resumes)
+    candidate_text = matrices.candidate_text(resumes)
+    num_jobs = len(matrices.job_ids)
+
+    # Running top-N per candidate: job rows, rounded combined scores and components
+    empty = np.zeros((len(resumes), 0))
+    best_rows = empty.astype(np.int64)
+    best_keys, best_skill, best_semantic = empty, empty, empty
+
+    for start in range(0, num_jobs, job_chunk):
+        stop = min(start + job_chunk, num_jobs)
+        matched = (candidate_skills @ matrices.job_skills[start:stop].T).toarray()
+        counts = matrices.job_skill_counts[start:stop]
+        skill = np.round(np.divide(matched * 100, counts, out=np.zeros_like(matched), where=counts > 0))
+        semantic = (candidate_text @ matrices.job_text[start:stop].T).toarray() * 100
+        combined = skill * 0.7 + semantic * 0.3
+
+        # Merge this chunk into the running top-N; ties go to the earlier job
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, stop), combined.shape)], axis=1)
+        keys = np.concatenate([best_keys, np.round(combined)], axis=1)
+        order = np.lexsort((rows, -keys), axis=1)[:, :top_n]
+        best_rows = np.take_along_axis(rows, order, axis=1)
+        best_keys = np.take_along_axis(keys, order, axis=1)
+        best_skill = np.take_along_axis(np.concatenate([best_skill, skill], axis=1), order, axis=1)
+        best_semantic = np.take_along_axis(np.concatenate([best_semantic, semantic], axis=1), order, axis=1)
+
+    return [[(int(row), 0.7 * skill + 0.3 * semantic, skill, semantic)
+             for row, skill, semantic in zip(rows, skills, semantics)]
+            for rows, skills, semantics in zip(best_rows.tolist(), best_skill.tolist(), best_semantic.tolist())]
+
+
+def _init_worker(matrices: MatchMatrices, top_n: int, job_chunk: int, output_dir: str) -> None:
+    """Receive the shared matrices once per worker process"""
+    _shared.update(matrices=matrices, top_n=top_n, job_chunk=job_chunk, output_dir=output_dir)
+
+
+def _run_block(task: tuple) -> tuple:
+    """Score one block and write it atomically; returns (block, candidates, pairs, seconds)"""
+    block, first_id, resumes = task
+    matrices = _shared['matrices']
+    started = time.perf_counter()
+    results = score_block(matrices, resumes, _shared['top_n'], _shared['job_chunk'])
+
+    path = block_path(_shared['output_dir'], block)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for offset, (resume, matches) in enumerate(zip(resumes, results)):
+            f.write(json.dumps({
+                'candidate_id': first_id + offset,
+                'name': resume.name,
+                'email': resume.email,
+                'matches': [{'job_id': matrices.job_ids[row], 'match_score': round(combined),
+                             'skill_match': int(skill), 'semantic_score': round(semantic)}
+                            for row, combined, skill, semantic in matches],
+            }) + '\n')
+    os.replace(tmp_path, path)
+    return block, len(resumes), len(resumes) * len(matrices.job_ids), time.perf_counter() - started
+
+
+def block_path(output_dir: str, block: int) -> str:
+    """Output file of one block"""
+    return os.path.join(output_dir, f"block-{block:06d}.jsonl")
+
+
+def run_fingerprint(jobs: Sequence[JobPosting], block_size: int, top_n: int) -> str:
+    """Identify the inputs of a run, so blocks from a different catalog are not reused"""
+    digest = hashlib.sha1(f"{block_size}:{top_n}".encode('utf-8'))
+    for job in jobs:
+        digest.update(json.dumps(job.to_dict(), sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def run(jobs: Sequence[JobPosting], store: CandidateStore, output_dir: str, top_n: int = 10,
+        block_size: int = 1000, job_chunk: int = 5000, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compute top-N matches for every stored candidate
+
+    Args:
+        jobs: Job catalog
+        store: Stored candidates
+        output_dir: Directory for block files
+        top_n: Matches per candidate
+        block_size: Candidates per block (unit of work and of resumption)
+        job_chunk: Jobs scored at once within a block
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        Run statistics including throughput in pairs per second
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    fingerprint = run_fingerprint(jobs, block_size, top_n)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    # Candidates written per finished block, by block number
+    completed: Dict[str, int] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('fingerprint') != fingerprint:
+            # Catalog or parameters changed: earlier blocks are stale
+            logger.info("Inputs changed since the last run; discarding previous blocks")
+            for name in os.listdir(output_dir):
+                if name.startswith('block-'):
+                    os.remove(os.path.join(output_dir, name))
+        else:
+            completed = previous.get('blocks', {})
+    for name in os.listdir(output_dir):
+        if '.tmp.' in name:
+            # Partial output of an interrupted block
+            os.remove(os.path.join(output_dir, name))
+
+    def write_manifest():
+        tmp_path = f"{manifest_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'jobs': len(jobs), 'top_n': top_n,
+                       'block_size': block_size, 'blocks': completed}, f)
+        os.replace(tmp_path, manifest_path)
+
+    write_manifest()
+
+    matrices = MatchMatrices(jobs)
+
+    def done(block, resumes):
+        """Whether a block was written with the same candidates it has now"""
+        return (completed.get(str(block)) == len(resumes) and
+                os.path.exists(block_path(output_dir, block)))
+
+    def tasks():
+        """Stream blocks from the store, skipping ones already written"""
+        block, resumes, first_id = 0, [], 0
+        for candidate_id, resume in enumerate(store):
+            if not resumes:
+                first_id = candidate_id
+            resumes.append(resume)
+            if len(resumes) == block_size:
+                if not done(block, resumes):
+                    yield block, first_id, resumes
+                block, resumes = block + 1, []
+        if resumes and not done(block, resumes):
+            yield block, first_id, resumes
+
+    started = time.perf_counter()
+    stats = {'blocks': 0, 'candidates': 0, 'pairs': 0}
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(matrices, top_n, job_chunk, output_dir)) as pool:
+        for block, candidates, pairs, seconds in pool.imap_unordered(_run_block, tasks()):
+            stats['blocks'] += 1
+            stats['candidates'] += candidates
+            stats['pairs'] += pairs
+            completed[str(block)] = candidates
+            write_manifest()
+            logger.info(f"Block {block}: {candidates} candidates, {pairs / max(seconds, 1e-9):,.0f} pairs/s")
+
+    elapsed = time.perf_counter() - started
+    stats['seconds'] = elapsed
+    stats['pairs_per_second'] = stats['pairs'] / elapsed if elapsed else 0.0
+    return stats
+
+
+def load_jobs(path: Optional[str]) -> List[JobPosting]:
+    """Load job postings from a JSON file, or the live catalog if no path is given"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [validate_posting(job) for job in json.load(f)]
+    return JOB_CATALOG.snapshot.jobs()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute top-N job matches for every stored candidate")
+    parser.add_argument('--candidates', default=os.environ.get('CANDIDATE_STORE_PATH'),
+                        help="Candidate store file (default: $CANDIDATE_STORE_PATH)")
+    parser.add_argument('--jobs', help="JSON file of job postings (default: the built-in catalog)")
+    parser.add_argument('--output', required=True, help="Output directory for block files")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--block-size', type=int, default=1000, help="Candidates per block")
+    parser.add_argument('--job-chunk', type=int, default=5000, help="Jobs scored at once per block")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if not SPARSE_AVAILABLE:
+        raise SystemExit("scipy and scikit-learn are required for batch matching")
+    if not args.candidates:
+        parser.error("--candidates is required when CANDIDATE_STORE_PATH is not set")
+
+    stats = run(load_jobs(args.jobs), CandidateStore(args.candidates), args.output,
+                top_n=args.top_n, block_size=args.block_size, job_chunk=args.job_chunk,
+                workers=args.workers)
+    print(f"{stats['candidates']} candidates in {stats['blocks']} blocks, "
+          f"{stats['pairs']:,} pairs in {stats['seconds']:.1f} s "
+          f"({stats['pairs_per_second']:,.0f} pairs/s)")
+
+
+if __name__ == '__main__':
+    main()
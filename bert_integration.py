@@ -1,33 +1,120 @@
 """
 BERT-based model integration for improved resume parsing and job matching
+
+Job postings are encoded once into a JobEmbeddingStore that follows the job
+catalog; the ranking cascade's semantic stage and get_enhanced_job_matches
+score catalog jobs from it. JOB_EMBEDDING_MODE=int8 keeps the quantized codes
+and the exact re-rank rows in memory-mapped files, so it requires
+JOB_EMBEDDING_CACHE_DIR; without it the store falls back to float32 (logged
+at startup and reported as "requested_mode" in the job embedding metrics).
 """
 import logging
-import re
+import os
+import threading
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from array import array
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from encoder_backends import DEFAULT_MODEL_NAME, SENTENCE_TRANSFORMERS_AVAILABLE, create_backend
+from encoding_service import EmbeddingCache, MicroBatchEncoder
+from keyword_index import tokenize
+from models import JobMatch, JobPosting, Resume
+from quantized_embeddings import JobEmbeddingStore, normalize_rows
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Encoder runtime: "torch" (reference), "torch-int8" or "onnx" (see encoder_backends)
+ENCODER_BACKEND = os.environ.get("ENCODER_BACKEND", "torch").lower()
+# Intra-op threads per worker; unset keeps the runtime default
+ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", 0)) or None
+
 # Flag to determine if we can use the BERT model
-try:
-    from sentence_transformers import SentenceTransformer
-    BERT_AVAILABLE = True
+BERT_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE
+if BERT_AVAILABLE:
     logger.info("BERT model is available and will be used for enhanced matching")
     
     # Load the BERT model for embeddings
     try:
-        model = SentenceTransformer('paraphrase-MiniLM-L6-v2')  # Using a smaller model for efficiency
-        logger.info("Successfully loaded BERT model: paraphrase-MiniLM-L6-v2")
+        model = create_backend(ENCODER_BACKEND, DEFAULT_MODEL_NAME, ENCODER_THREADS)  # Using a smaller model for efficiency
+        logger.info(f"Successfully loaded BERT model: {DEFAULT_MODEL_NAME} ({ENCODER_BACKEND} backend)")
     except Exception as e:
-        logger.error(f"Failed to load BERT model: {str(e)}")
-        BERT_AVAILABLE = False
-        
-except ImportError:
-    BERT_AVAILABLE = False
+        logger.error(f"Failed to load {ENCODER_BACKEND} encoder backend: {str(e)}")
+        try:
+            model = create_backend('torch', DEFAULT_MODEL_NAME, ENCODER_THREADS)
+            logger.info(f"Successfully loaded BERT model: {DEFAULT_MODEL_NAME}")
+        except Exception as e:
+            logger.error(f"Failed to load BERT model: {str(e)}")
+            BERT_AVAILABLE = False
+else:
     logger.warning("BERT model not available. Using fallback similarity methods")
 
+# Concurrent encode requests are coalesced into shared batches
+ENCODER_MAX_BATCH_SIZE = int(os.environ.get("ENCODER_MAX_BATCH_SIZE", 32))
+ENCODER_MAX_WAIT_MS = float(os.environ.get("ENCODER_MAX_WAIT_MS", 5))
+
+encoder = None
+if BERT_AVAILABLE:
+    encoder = MicroBatchEncoder(
+        lambda texts: model.encode(texts, batch_size=ENCODER_MAX_BATCH_SIZE),
+        max_batch_size=ENCODER_MAX_BATCH_SIZE,
+        max_wait_ms=ENCODER_MAX_WAIT_MS)
+
+# Resumes are embedded per section and per role; chunk embeddings are cached
+# by text hash so a re-upload only encodes the chunks that changed
+RESUME_CHUNK_CACHE_SIZE = int(os.environ.get("RESUME_CHUNK_CACHE_SIZE", 10000))
+# How chunk similarities combine into one job score: "max" or "mean" (weighted)
+RESUME_CHUNK_AGGREGATION = os.environ.get("RESUME_CHUNK_AGGREGATION", "max").lower()
+# Relative weight of each resume section in the weighted mean
+RESUME_CHUNK_WEIGHTS = {'summary': 1.0, 'experience': 1.0, 'skills': 1.5}
+
+chunk_cache = None
+if BERT_AVAILABLE:
+    chunk_cache = EmbeddingCache(lambda texts: encoder.encode(texts), max_entries=RESUME_CHUNK_CACHE_SIZE)
+
+
+# Job embedding storage: "float32" or "int8" (per-vector scaled, 4x smaller)
+JOB_EMBEDDING_MODE = os.environ.get("JOB_EMBEDDING_MODE", "float32").lower()
+# Directory for the memory-mapped job embedding files. Required in int8 mode:
+# if unset, int8 is downgraded to float32 (see JOB_EMBEDDING_REQUESTED_MODE)
+JOB_EMBEDDING_CACHE_DIR = os.environ.get("JOB_EMBEDDING_CACHE_DIR")
+# In int8 mode, this many top candidates are re-scored with exact float embeddings
+JOB_EMBEDDING_RERANK = int(os.environ.get("JOB_EMBEDDING_RERANK", 50))
+JOB_EMBEDDING_REQUESTED_MODE = JOB_EMBEDDING_MODE
+
+if JOB_EMBEDDING_MODE == 'int8' and not JOB_EMBEDDING_CACHE_DIR:
+    # The exact re-rank rows live in a memory-mapped file; without one they would
+    # have to be held in memory (no saving) or re-encoded on every request
+    logger.warning("JOB_EMBEDDING_MODE=int8 needs JOB_EMBEDDING_CACHE_DIR; using float32 job embeddings")
+    JOB_EMBEDDING_MODE = 'float32'
+
+# Serializes building and updating the store; requests read _job_store without it
+_job_store_lock = threading.Lock()
+# (catalog snapshot version, store, {job id: (row, posting the row was encoded from)})
+_job_store: Optional[Tuple[int, JobEmbeddingStore, Dict[Any, Tuple[int, JobPosting]]]] = None
+# Catalog the store follows (see track_job_catalog)
+_job_catalog = None
+
+
+def get_encoder_metrics() -> Dict[str, Any]:
+    """Return queue depth and batching metrics of the encoding service"""
+    return encoder.metrics() if encoder is not None else {}
+
+
+def get_chunk_cache_metrics() -> Dict[str, Any]:
+    """Return size and hit rate of the resume chunk embedding cache"""
+    return chunk_cache.metrics() if chunk_cache is not None else {}
+
+
+def get_job_embedding_metrics() -> Dict[str, Any]:
+    """Return size and int8 accuracy delta of the cached job embedding store"""
+    current = _job_store
+    if current is None:
+        return {'requested_mode': JOB_EMBEDDING_REQUESTED_MODE}
+    return dict(current[1].metrics(), catalog_version=current[0], requested_mode=JOB_EMBEDDING_REQUESTED_MODE)
+
 
 def get_bert_embeddings(texts: List[str]) -> np.ndarray:
     """
@@ -43,9 +130,8 @@ def get_bert_embeddings(texts: List[str]) -> np.ndarray:
         return np.array([])
     
     try:
-        # Generate embeddings
-        embeddings = model.encode(texts)
-        return embeddings
+        # Generate embeddings, batched together with concurrent requests
+        return encoder.encode(texts)
     except Exception as e:
         logger.error(f"Error generating BERT embeddings: {str(e)}")
         return np.array([])
@@ -86,6 +172,26 @@ def calculate_semantic_similarity(resume_text: str, job_text: str) -> float:
         return 0
 
 
+def get_chunk_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Get BERT embeddings for resume chunks, encoding only chunks not seen before
+    
+    Args:
+        texts: List of chunk texts
+        
+    Returns:
+        Numpy array of embeddings
+    """
+    if not BERT_AVAILABLE or not texts:
+        return np.array([])
+    
+    try:
+        return chunk_cache.encode(texts)
+    except Exception as e:
+        logger.error(f"Error generating chunk embeddings: {str(e)}")
+        return np.array([])
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """
     Calculate cosine similarity between two vectors
@@ -121,79 +227,316 @@ def extract_keywords(text: str, max_keywords: int = 20) -> List[str]:
     Returns:
         List of extracted keywords
     """
-    # Simple implementation - in practice, you'd use BERT or TF-IDF here
-    # Remove special characters and convert to lowercase
-    text = re.sub(r'[^\w\s]', ' ', text.lower())
-    
-    # Split into words
-    words = text.split()
-    
-    # Remove common stop words
-    stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
-                 'be', 'been', 'being', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
-                 'about', 'against', 'between', 'into', 'through', 'during', 'before',
-                 'after', 'above', 'below', 'from', 'up', 'down', 'of', 'off', 'over',
-                 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when',
-                 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
-                 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
-                 'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should',
-                 'now'}
-    
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-    
-    # Count word frequency
-    word_counts = {}
-    for word in filtered_words:
-        if word in word_counts:
-            word_counts[word] += 1
-        else:
-            word_counts[word] = 1
-    
-    # Sort by frequency
-    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+    # Count word frequency (stop words are shared with the catalog keyword index)
+    word_counts = Counter(tokenize(text))
     
     # Return top keywords
-    keywords = [word for word, count in sorted_words[:max_keywords]]
+    keywords = [word for word, count in word_counts.most_common(max_keywords)]
     
     return keywords
 
 
-def get_enhanced_job_matches(resume_data: Dict[str, Any], job_postings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def job_embedding_text(job: JobPosting) -> str:
+    """Text a job posting is embedded from"""
+    return f"{job.title} {job.description} {' '.join(job.required_skills)}"
+
+
+def _job_cache_prefix(version: int) -> Optional[str]:
+    """Path prefix of the int8 store files for a catalog version (one set per worker process)"""
+    if JOB_EMBEDDING_MODE != 'int8':
+        return None
+    return os.path.join(JOB_EMBEDDING_CACHE_DIR, f"jobs-{os.getpid()}-v{version}")
+
+
+def _remove_stale_job_files() -> None:
+    """Delete job embedding files left behind by worker processes that have exited"""
+    if JOB_EMBEDDING_MODE != 'int8' or not os.path.isdir(JOB_EMBEDDING_CACHE_DIR):
+        return
+    for name in os.listdir(JOB_EMBEDDING_CACHE_DIR):
+        parts = name.split('-')
+        if len(parts) < 3 or parts[0] != 'jobs' or not parts[1].isdigit():
+            continue
+        pid = int(parts[1])
+        if pid != os.getpid():
+            try:
+                os.kill(pid, 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except OSError:
+                continue
+        try:
+            os.remove(os.path.join(JOB_EMBEDDING_CACHE_DIR, name))
+        except OSError:
+            pass
+
+
+def build_job_embedding_store(job_texts: List[str], mode: str = None,
+                              cache_prefix: Optional[str] = None) -> Optional[JobEmbeddingStore]:
     """
-    Get enhanced job matches using BERT-based semantic similarity
+    Encode job texts once into a store used for catalog-wide scoring
     
     Args:
-        resume_data: Parsed resume data
-        job_postings: List of job posting dictionaries
+        job_texts: One text per job posting
+        mode: "float32" or "int8" (defaults to JOB_EMBEDDING_MODE)
+        cache_prefix: Path prefix of the memory-mapped files (int8 mode)
         
     Returns:
-        List of job matches with similarity scores
+        JobEmbeddingStore, or None if embeddings are unavailable
     """
-    # Prepare resume text - combine skills, experience, and summary
-    resume_skills = ' '.join(resume_data.get('skills', []))
-    resume_experience = ' '.join([exp.get('description', '') + ' ' + exp.get('title', '') 
-                               for exp in resume_data.get('experience', [])])
-    resume_summary = resume_data.get('summary', '')
+    mode = mode or JOB_EMBEDDING_MODE
+    embeddings = get_bert_embeddings(job_texts)
+    if not job_texts or len(embeddings) != len(job_texts):
+        return None
+    return JobEmbeddingStore(embeddings, mode=mode, cache_prefix=cache_prefix)
+
+
+def get_job_embedding_store(jobs: List[JobPosting]):
+    """
+    Return the current (version, store, rows by job id), building the store on first use
+
+    The store is built from the tracked catalog's snapshot, or from the given
+    jobs when no catalog is tracked, and is then kept up to date by
+    update_job_embedding_store, so requests only read it.
+    """
+    global _job_store
+    current = _job_store
+    if current is not None:
+        return current
+    with _job_store_lock:
+        if _job_store is None:
+            if _job_catalog is not None:
+                snapshot = _job_catalog.snapshot
+                version, source = snapshot.version, snapshot.jobs()
+            else:
+                version, source = 0, jobs
+            _remove_stale_job_files()
+            store = build_job_embedding_store([job_embedding_text(job) for job in source],
+                                              cache_prefix=_job_cache_prefix(version))
+            if store is not None:
+                _job_store = (version, store, {job.id: (row, job) for row, job in enumerate(source)})
+        return _job_store
+
+
+def update_job_embedding_store(added: List[JobPosting], removed: List[JobPosting]) -> None:
+    """
+    Catalog listener: apply a delta to the job embedding store
     
-    resume_text = f"{resume_summary} {resume_experience} {resume_skills}"
+    Only added and updated postings are encoded. The new store replaces the
+    old one with a single assignment, so requests never wait for it, and the
+    old store's files are deleted.
     
-    job_matches = []
+    Args:
+        added: Postings added or updated by the delta
+        removed: Postings removed or replaced by the delta
+    """
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            # Not built yet; the first request builds it from the latest snapshot
+            return
+        old_version, store, rows = _job_store
+        keep = np.ones(len(store), dtype=bool)
+        for job in list(removed) + list(added):
+            entry = rows.get(job.id)
+            if entry is not None:
+                keep[entry[0]] = False
+        if keep.all() and not added:
+            return
+        embeddings = get_bert_embeddings([job_embedding_text(job) for job in added])
+        if len(embeddings) != len(added):
+            # Requests encode the postings the store lacks until the next delta
+            logger.error("Could not encode added jobs; job embedding store left unchanged")
+            return
+        
+        # Listeners of consecutive deltas can see the same snapshot; file names must not repeat
+        version = max(old_version + 1, _job_catalog.snapshot.version if _job_catalog is not None else 0)
+        new_row = np.cumsum(keep) - 1
+        new_rows = {job_id: (int(new_row[row]), job) for job_id, (row, job) in rows.items() if keep[row]}
+        start = int(keep.sum())
+        for offset, job in enumerate(added):
+            new_rows[job.id] = (start + offset, job)
+        new_store = store.updated(keep, np.asarray(embeddings), cache_prefix=_job_cache_prefix(version))
+        _job_store = (version, new_store, new_rows)
+    store.delete_files()
+    logger.info(f"Job embedding store v{version}: {len(added)} encoded, "
+                f"{len(store) - start} removed, {len(new_store)} jobs")
+
+
+def track_job_catalog(catalog) -> None:
+    """Keep the job embedding store in step with a JobCatalog's deltas"""
+    global _job_catalog
+    _job_catalog = catalog
+    catalog.add_listener(update_job_embedding_store)
+
+
+def get_resume_chunks(resume: Resume) -> List[Tuple[str, float]]:
+    """
+    Split a resume into separately embedded chunks
+    
+    The summary, each role and the skill list become one chunk each, so long
+    resumes are not truncated by the encoder's input limit.
     
-    for job in job_postings:
-        # Prepare job text
-        job_skills = ' '.join(job.get('required_skills', []))
-        job_description = job.get('description', '')
-        job_title = job.get('title', '')
+    Args:
+        resume: Parsed resume
         
-        job_text = f"{job_title} {job_description} {job_skills}"
+    Returns:
+        List of (chunk text, weight) pairs
+    """
+    chunks = []
+    if resume.summary.strip():
+        chunks.append((resume.summary.strip(), RESUME_CHUNK_WEIGHTS['summary']))
+    for exp in resume.experience:
+        role_text = f"{exp.title} {exp.description}".strip()
+        if role_text:
+            chunks.append((role_text, RESUME_CHUNK_WEIGHTS['experience']))
+    skills = ' '.join(resume.skills)
+    if skills:
+        chunks.append((skills, RESUME_CHUNK_WEIGHTS['skills']))
+    return chunks
+
+
+def aggregate_chunk_scores(chunk_scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Combine per-chunk similarities into one score per job
+    
+    Args:
+        chunk_scores: Array of shape (chunks, jobs)
+        weights: Weight of each chunk
         
-        # Calculate traditional skill matching score
-        skill_match_score = calculate_skill_match(resume_data.get('skills', []), job.get('required_skills', []))
+    Returns:
+        Array of shape (jobs,)
+    """
+    if RESUME_CHUNK_AGGREGATION == 'mean':
+        return weights @ chunk_scores / weights.sum()
+    return chunk_scores.max(axis=0)
+
+
+def semantic_similarities(resume_data: Any, job_texts: List[str]) -> Optional[np.ndarray]:
+    """
+    BERT similarity of a resume with a small set of job texts (e.g. ranking finalists)
+    
+    Resume chunks and job texts both go through the hash-keyed embedding
+    cache, so finalists that recur across requests are encoded once.
+    
+    Args:
+        resume_data: Parsed resume (Resume record or dictionary)
+        job_texts: Job texts to score
         
-        # Calculate semantic similarity if BERT is available
-        semantic_score = 0
-        if BERT_AVAILABLE:
-            semantic_score = calculate_semantic_similarity(resume_text, job_text)
+    Returns:
+        Similarity scores (0-100) per job text, or None if BERT is unavailable
+    """
+    if not BERT_AVAILABLE:
+        return None
+    chunks = get_resume_chunks(Resume.coerce(resume_data))
+    if not chunks or not job_texts:
+        return np.zeros(len(job_texts))
+    
+    chunk_embeddings = get_chunk_embeddings([text for text, _ in chunks])
+    job_embeddings = get_chunk_embeddings(job_texts)
+    if len(chunk_embeddings) != len(chunks) or len(job_embeddings) != len(job_texts):
+        return None
+    
+    weights = np.array([weight for _, weight in chunks], dtype=np.float32)
+    chunk_scores = normalize_rows(chunk_embeddings) @ normalize_rows(job_embeddings).T
+    return aggregate_chunk_scores(chunk_scores, weights) * 100
+
+
+def job_semantic_similarities(resume_data: Any, jobs: List[JobPosting],
+                              priority: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    BERT similarity of a resume with job postings, read from the job embedding store
+    
+    Catalog postings are scored from their stored embeddings, so they are never
+    re-encoded per request; postings the store lacks (outside the catalog, or
+    changed since its last delta) are encoded through the chunk cache. In int8
+    mode, small sets are scored exactly and large ones approximately, with the
+    top JOB_EMBEDDING_RERANK (by priority, or by semantic score) re-scored exactly.
+    
+    Args:
+        resume_data: Parsed resume (Resume record or dictionary)
+        jobs: Job postings to score
+        priority: Optional per-job score choosing the int8 re-rank candidates
+        
+    Returns:
+        Similarity scores (0-100) per job, or None if BERT is unavailable
+    """
+    if not BERT_AVAILABLE:
+        return None
+    chunks = get_resume_chunks(Resume.coerce(resume_data))
+    if not chunks or not jobs:
+        return np.zeros(len(jobs))
+    current = get_job_embedding_store(jobs)
+    if current is None:
+        return semantic_similarities(resume_data, [job_embedding_text(job) for job in jobs])
+    
+    _, store, store_rows = current
+    chunk_embeddings = get_chunk_embeddings([text for text, _ in chunks])
+    if len(chunk_embeddings) != len(chunks):
+        return None
+    weights = np.array([weight for _, weight in chunks], dtype=np.float32)
+    
+    # Store row of each job, or -1 if the store lacks this version of the posting
+    job_rows = np.full(len(jobs), -1, dtype=np.int64)
+    for index, job in enumerate(jobs):
+        entry = store_rows.get(job.id)
+        if entry is not None and (entry[1] is job or entry[1] == job):
+            job_rows[index] = entry[0]
+    known = np.flatnonzero(job_rows >= 0)
+    # Few jobs (e.g. cascade finalists): exact rows are cheaper than a full-store pass
+    approximate = store.mode == 'int8' and len(known) > JOB_EMBEDDING_RERANK
+    
+    chunk_scores = np.zeros((len(chunks), len(jobs)), dtype=np.float32)
+    if approximate:
+        chunk_scores[:, known] = store.similarities(chunk_embeddings)[:, job_rows[known]]
+    elif len(known):
+        chunk_scores[:, known] = store.exact_similarities(chunk_embeddings, job_rows[known])
+    if len(known) < len(jobs):
+        missing = np.flatnonzero(job_rows < 0)
+        job_embeddings = get_chunk_embeddings([job_embedding_text(jobs[index]) for index in missing])
+        if len(job_embeddings) != len(missing):
+            return None
+        chunk_scores[:, missing] = normalize_rows(chunk_embeddings) @ normalize_rows(job_embeddings).T
+    scores = aggregate_chunk_scores(chunk_scores, weights) * 100
+    
+    if approximate:
+        # Re-rank the best approximate candidates with exact float scores
+        order = scores[known] if priority is None else priority[known] * 0.7 + scores[known] * 0.3
+        rows = known[np.argpartition(-order, JOB_EMBEDDING_RERANK - 1)[:JOB_EMBEDDING_RERANK]]
+        scores[rows] = aggregate_chunk_scores(
+            store.exact_similarities(chunk_embeddings, job_rows[rows]), weights) * 100
+    return scores
+
+
+def get_enhanced_job_matches(resume_data: Any, job_postings: List[Any]) -> List[JobMatch]:
+    """
+    Get enhanced job matches using BERT-based semantic similarity
+    
+    Args:
+        resume_data: Parsed resume (Resume record or dictionary)
+        job_postings: List of JobPosting records or job posting dictionaries
+        
+    Returns:
+        List of job matches with similarity scores
+    """
+    resume = Resume.coerce(resume_data)
+    resume_skill_list = resume.skills
+    resume_skills_lower = {s.lower() for s in resume_skill_list}
+    
+    jobs = [JobPosting.coerce(job) for job in job_postings]
+    
+    # Calculate traditional skill matching scores
+    skill_scores = [calculate_skill_match(resume_skill_list, job.required_skills) for job in jobs]
+    
+    # Semantic similarity from the job embedding store, if BERT is available
+    semantic_scores = job_semantic_similarities(resume, jobs, np.asarray(skill_scores))
+    if semantic_scores is None:
+        semantic_scores = np.zeros(len(jobs), dtype=np.float32)
+    
+    job_matches = []
+    
+    for job, skill_match_score, semantic_score in zip(jobs, skill_scores, semantic_scores.tolist()):
+        job_skill_list = job.required_skills
         
         # Combine scores (70% skill match, 30% semantic similarity)
         # If BERT is not available, use only skill match score
@@ -203,27 +546,26 @@ def get_enhanced_job_matches(resume_data: Dict[str, Any], job_postings: List[Dic
             combined_score = skill_match_score
         
         # Calculate matching and missing skills
-        matching_skills = [skill for skill in job.get('required_skills', []) 
-                          if skill.lower() in [s.lower() for s in resume_data.get('skills', [])]]
-        
-        missing_skills = [skill for skill in job.get('required_skills', []) 
-                         if skill.lower() not in [s.lower() for s in resume_data.get('skills', [])]]
+        matching_skill_ids = array('I')
+        missing_skill_ids = array('I')
+        for skill_id, skill in zip(job.required_skill_ids, job_skill_list):
+            if skill.lower() in resume_skills_lower:
+                matching_skill_ids.append(skill_id)
+            else:
+                missing_skill_ids.append(skill_id)
         
         # Add job to matches
-        job_matches.append({
-            'id': job.get('id'),
-            'title': job.get('title', ''),
-            'company': job.get('company', ''),
-            'location': job.get('location', ''),
-            'description': job.get('description', ''),
-            'match_score': round(combined_score),
-            'matching_skills': matching_skills,
-            'missing_skills': missing_skills,
-            'semantic_score': round(semantic_score) if BERT_AVAILABLE else 0
-        })
+        job_matches.append(JobMatch(
+            job=job,
+            match_score=round(combined_score),
+            skill_match=skill_match_score,
+            semantic_score=round(semantic_score) if BERT_AVAILABLE else 0,
+            matching_skill_ids=matching_skill_ids,
+            missing_skill_ids=missing_skill_ids
+        ))
     
     # Sort by combined score
-    job_matches.sort(key=lambda x: x['match_score'], reverse=True)
+    job_matches.sort(key=lambda x: x.match_score, reverse=True)
     
     return job_matches
 
@@ -0,0 +1,201 @@
+"""
+Compact binary serialization for pipeline records.
+
+The wire format is MessagePack. The C-accelerated ``msgpack`` package is
+used when installed; otherwise a pure-Python implementation of the subset
+we need (nil, bool, int, float, str, bin, array, map) is used. Both produce
+interchangeable bytes.
+"""
+import logging
+import struct
+from typing import Any, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Flag to determine if the msgpack extension is available
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logger.info("msgpack not available. Using the built-in MessagePack encoder")
+
+
+def _pack(obj: Any, out: List[bytes]) -> None:
+    """Append the MessagePack encoding of obj to out"""
+    if obj is None:
+        out.append(b'\xc0')
+    elif obj is True:
+        out.append(b'\xc3')
+    elif obj is False:
+        out.append(b'\xc2')
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(struct.pack('B', obj))
+        elif -32 <= obj < 0:
+            out.append(struct.pack('b', obj))
+        elif 0 <= obj <= 0xff:
+            out.append(struct.pack('BB', 0xcc, obj))
+        elif 0 <= obj <= 0xffff:
+            out.append(struct.pack('>BH', 0xcd, obj))
+        elif 0 <= obj <= 0xffffffff:
+            out.append(struct.pack('>BI', 0xce, obj))
+        elif obj > 0:
+            out.append(struct.pack('>BQ', 0xcf, obj))
+        elif obj >= -0x80:
+            out.append(struct.pack('>Bb', 0xd0, obj))
+        elif obj >= -0x8000:
+            out.append(struct.pack('>Bh', 0xd1, obj))
+        elif obj >= -0x80000000:
+            out.append(struct.pack('>Bi', 0xd2, obj))
+        else:
+            out.append(struct.pack('>Bq', 0xd3, obj))
+    elif isinstance(obj, float):
+        out.append(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(struct.pack('B', 0xa0 | size))
+        elif size <= 0xff:
+            out.append(struct.pack('BB', 0xd9, size))
+        elif size <= 0xffff:
+            out.append(struct.pack('>BH', 0xda, size))
+        else:
+            out.append(struct.pack('>BI', 0xdb, size))
+        out.append(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        size = len(data)
+        if size <= 0xff:
+            out.append(struct.pack('BB', 0xc4, size))
+        elif size <= 0xffff:
+            out.append(struct.pack('>BH', 0xc5, size))
+        else:
+            out.append(struct.pack('>BI', 0xc6, size))
+        out.append(data)
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 16:
+            out.append(struct.pack('B', 0x90 | size))
+        elif size <= 0xffff:
+            out.append(struct.pack('>BH', 0xdc, size))
+        else:
+            out.append(struct.pack('>BI', 0xdd, size))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 16:
+            out.append(struct.pack('B', 0x80 | size))
+        elif size <= 0xffff:
+            out.append(struct.pack('>BH', 0xde, size))
+        else:
+            out.append(struct.pack('>BI', 0xdf, size))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+# (struct format, size) for fixed-width types, keyed by type byte
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+# Size prefix format for variable-length types, keyed by type byte
+_LENGTHS = {
+    0xc4: ('>B', 1), 0xc5: ('>H', 2), 0xc6: ('>I', 4),
+    0xd9: ('>B', 1), 0xda: ('>H', 2), 0xdb: ('>I', 4),
+    0xdc: ('>H', 2), 0xdd: ('>I', 4), 0xde: ('>H', 2), 0xdf: ('>I', 4),
+}
+
+
+def _unpack(data: bytes, offset: int) -> Tuple[Any, int]:
+    """Decode one MessagePack value starting at offset"""
+    code = data[offset]
+    offset += 1
+
+    if code <= 0x7f:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if code == 0xc0:
+        return None, offset
+    if code == 0xc2:
+        return False, offset
+    if code == 0xc3:
+        return True, offset
+    if code in _FIXED:
+        fmt, size = _FIXED[code]
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+
+    if 0xa0 <= code <= 0xbf:
+        kind, size = 'str', code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, size = 'array', code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, size = 'map', code & 0x0f
+    elif code in _LENGTHS:
+        fmt, width = _LENGTHS[code]
+        size = struct.unpack_from(fmt, data, offset)[0]
+        offset += width
+        kind = ('bin' if code <= 0xc6 else 'str' if code <= 0xdb
+                else 'array' if code <= 0xdd else 'map')
+    else:
+        raise ValueError(f"Unsupported MessagePack type byte 0x{code:02x}")
+
+    if kind == 'str':
+        return data[offset:offset + size].decode('utf-8'), offset + size
+    if kind == 'bin':
+        return bytes(data[offset:offset + size]), offset + size
+    if kind == 'array':
+        items = []
+        for _ in range(size):
+            item, offset = _unpack(data, offset)
+            items.append(item)
+        return items, offset
+    result = {}
+    for _ in range(size):
+        key, offset = _unpack(data, offset)
+        result[key], offset = _unpack(data, offset)
+    return result, offset
+
+
+def packb(obj: Any) -> bytes:
+    """
+    Serialize a value to MessagePack bytes
+
+    Args:
+        obj: None, bool, int, float, str, bytes, or lists/tuples/dicts of those
+
+    Returns:
+        Encoded bytes
+    """
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(obj, use_bin_type=True)
+    out: List[bytes] = []
+    _pack(obj, out)
+    return b''.join(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """
+    Deserialize MessagePack bytes produced by packb
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Decoded value (arrays decode as lists)
+    """
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, offset = _unpack(data, 0)
+    if offset != len(data):
+        raise ValueError("Extra data after MessagePack value")
+    return value
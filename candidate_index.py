@@ -0,0 +1,380 @@
+"""
+Reverse search: rank stored candidates for a job posting.
+
+Parsed resumes are appended to a CandidateStore file as length-prefixed
+binary records. CandidateIndex holds a sparse candidate x skill incidence
+matrix, a TF-IDF matrix of resume texts and a few structured fields, so a
+job is scored against every candidate with two sparse matrix products and
+the same 70/30 skill/semantic blend as get_job_recommendations. Candidates
+added since the index was built sit in a small append-only CandidateDelta
+scored alongside it until the next rebuild.
+"""
+import logging
+import os
+import struct
+import threading
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import JobPosting, Resume, SKILLS
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Try to import scipy and scikit-learn
+try:
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    SPARSE_AVAILABLE = True
+except ImportError:
+    SPARSE_AVAILABLE = False
+    logger.warning("scipy/scikit-learn not available. Candidate search is disabled")
+
+# Record length prefix in the candidate store file
+_RECORD_HEADER = struct.Struct('>I')
+
+# Share of candidates added since the last build that triggers a rebuild
+REBUILD_THRESHOLD = 0.2
+# Rows the delta segment may hold before a rebuild, whatever the index size
+CANDIDATE_DELTA_MAX_ROWS = int(os.environ.get("CANDIDATE_DELTA_MAX_ROWS", 20000))
+
+
+class CandidateStore:
+    """
+    Append-only file of parsed resumes.
+
+    Each record is a 4-byte big-endian length followed by Resume.to_bytes().
+    A truncated trailing record (e.g. after a crash mid-write) is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, resume: Resume) -> None:
+        """Append one parsed resume to the store"""
+        data = resume.to_bytes()
+        with self._lock, open(self.path, 'ab') as f:
+            f.write(_RECORD_HEADER.pack(len(data)) + data)
+
+    def __iter__(self) -> Iterator[Resume]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                size, = _RECORD_HEADER.unpack(header)
+                data = f.read(size)
+                if len(data) < size:
+                    logger.warning(f"Ignoring truncated record at the end of {self.path}")
+                    return
+                try:
+                    yield Resume.from_bytes(data)
+                except ValueError as e:
+                    logger.warning(f"Skipping unreadable candidate record: {str(e)}")
+
+
+class CandidateIndex:
+    """
+    Matrices over a fixed list of candidates.
+
+    The index is immutable; candidates added after it was built go to a
+    CandidateDelta that is scored together with it until the next rebuild
+    refits TF-IDF over everyone.
+
+    Args:
+        resumes: Parsed resumes, indexed by position
+        text_fn: Builds the semantic matching text of a resume
+        level_fn: Returns the experience level of a resume
+    """
+
+    def __init__(self, resumes: Sequence[Resume], text_fn: Callable[[Resume], str],
+                 level_fn: Callable[[Resume], str]):
+        self.text_fn = text_fn
+        self.level_fn = level_fn
+        self.resumes = list(resumes)
+        self.skill_columns: Dict[str, int] = {}
+        self.vectorizer = None
+        self.text_matrix = None
+
+        self.skill_matrix = _incidence([_skill_row(resume, self.skill_columns) for resume in self.resumes],
+                                       len(self.skill_columns))
+        texts = [text_fn(resume) for resume in self.resumes]
+        if any(text.strip() for text in texts):
+            try:
+                self.vectorizer = TfidfVectorizer(stop_words='english')
+                self.text_matrix = self.vectorizer.fit_transform(texts)
+            except ValueError:
+                # Only stop words in the corpus
+                self.vectorizer = None
+        self.locations = [resume.location.lower() for resume in self.resumes]
+        self.levels = [level_fn(resume) for resume in self.resumes]
+
+    def __len__(self):
+        return len(self.resumes)
+
+    def rank(self, job: JobPosting, top_k: int = 10, filters: Optional[Dict[str, Any]] = None,
+             delta: Optional['CandidateDelta'] = None) -> List[Dict[str, Any]]:
+        """
+        Rank candidates for a job posting
+
+        Args:
+            job: The job posting
+            top_k: Number of candidates to return
+            filters: Optional 'location' (substring) and 'experience_level'
+            delta: Candidates added since this index was built, scored after
+                it; candidate ids continue from len(self)
+
+        Returns:
+            Candidate dictionaries, best match first
+        """
+        # Rows appended to the delta while this search runs are left out
+        delta_size = len(delta) if delta is not None else 0
+        segments = [(self, len(self), self.skill_matrix, self.text_matrix)]
+        if delta_size:
+            segments.append((delta, delta_size) + delta.matrices(delta_size))
+        total = len(self) + delta_size
+        if not total:
+            return []
+        job_skills = [skill.lower() for skill in job.required_skills]
+        query = None
+        if self.vectorizer is not None:
+            job_text = job.title + " " + job.description + " " + " ".join(job.required_skills)
+            query = self.vectorizer.transform([job_text])
+
+        skill_parts, semantic_parts, mask_parts = [], [], []
+        for segment, size, skill_matrix, text_matrix in segments:
+            # Skill match: share of the job's skill list each candidate has
+            skill_scores = np.zeros(size, dtype=np.float64)
+            if job_skills and skill_matrix is not None:
+                weights = np.zeros(skill_matrix.shape[1], dtype=np.float32)
+                for skill in job_skills:
+                    column = segment.skill_columns.get(skill)
+                    if column is not None and column < len(weights):
+                        weights[column] += 1
+                skill_scores = np.round(skill_matrix @ weights / len(job_skills) * 100)
+            skill_parts.append(skill_scores)
+
+            # Semantic match: TF-IDF cosine similarity against the candidate corpus
+            semantic_scores = np.zeros(size, dtype=np.float64)
+            if query is not None and text_matrix is not None:
+                semantic_scores = np.asarray((text_matrix @ query.T).todense()).ravel() * 100
+            semantic_parts.append(semantic_scores)
+            mask_parts.append(_candidate_mask(segment.locations[:size], segment.levels[:size], filters))
+
+        skill_scores = np.concatenate(skill_parts)
+        semantic_scores = np.concatenate(semantic_parts)
+        combined = skill_scores * 0.7 + semantic_scores * 0.3 if query is not None else skill_scores
+
+        mask = np.concatenate(mask_parts) if mask_parts[0] is not None else None
+        positions = np.flatnonzero(mask) if mask is not None else np.arange(total)
+        # Same ordering as get_job_recommendations: rounded score, then position.
+        # Everything tied with the k-th best rounded score is kept before sorting.
+        rounded = np.round(combined[positions])
+        if top_k < len(positions):
+            kth = -np.partition(-rounded, top_k - 1)[top_k - 1]
+            keep = rounded >= kth
+            positions, rounded = positions[keep], rounded[keep]
+        positions = positions[np.lexsort((positions, -rounded))][:top_k].tolist()
+
+        job_skill_ids = list(zip(job.required_skill_ids, job_skills))
+        results = []
+        for position in positions:
+            segment, row = (self, position) if position < len(self) else (delta, position - len(self))
+            resume = segment.resumes[row]
+            candidate_skills = {skill.lower() for skill in resume.skills}
+            matching = [skill_id for skill_id, skill in job_skill_ids if skill in candidate_skills]
+            missing = [skill_id for skill_id, skill in job_skill_ids if skill not in candidate_skills]
+            results.append({
+                'candidate_id': position,
+                'name': resume.name,
+                'email': resume.email,
+                'location': resume.location,
+                'experience_level': segment.levels[row],
+                'total_experience': resume.total_experience,
+                'match_score': round(combined[position]),
+                'skill_match': int(skill_scores[position]),
+                'semantic_score': round(semantic_scores[position]),
+                'matching_skills': SKILLS.decode(matching),
+                'missing_skills': SKILLS.decode(missing),
+            })
+        return results
+
+
+class CandidateDelta:
+    """
+    Append-only segment of candidates added since the base index was built.
+
+    Adding a candidate costs only its own row: its text is transformed with
+    the base index's TF-IDF vocabulary and its skills get columns in the
+    segment's own skill map. Searches read the first ``len(delta)`` rows, so
+    appends never block them; the segment's matrices are extended with the
+    new rows when a search first needs them.
+
+    Args:
+        base: The index this segment extends
+    """
+
+    def __init__(self, base: CandidateIndex):
+        self.base = base
+        self.resumes: List[Resume] = []
+        self.locations: List[str] = []
+        self.levels: List[str] = []
+        self.skill_columns: Dict[str, int] = {}
+        self._skill_rows: List[List[int]] = []
+        self._text_rows = []
+        self._lock = threading.Lock()
+        # (rows materialized, skill matrix, text matrix)
+        self._matrices = (0, None, None)
+
+    def __len__(self):
+        return len(self.resumes)
+
+    def append(self, resume: Resume) -> None:
+        """Add one candidate; callers serialize appends"""
+        self._skill_rows.append(_skill_row(resume, self.skill_columns))
+        if self.base.vectorizer is not None:
+            self._text_rows.append(self.base.vectorizer.transform([self.base.text_fn(resume)]))
+        self.locations.append(resume.location.lower())
+        self.levels.append(self.base.level_fn(resume))
+        # Appended last: a row is visible to searches once its resume is
+        self.resumes.append(resume)
+
+    def matrices(self, count: int) -> Tuple[Any, Any]:
+        """Skill and text matrices of the first count rows"""
+        with self._lock:
+            done, skill_matrix, text_matrix = self._matrices
+            if done < count:
+                width = len(self.skill_columns)
+                new_rows = _incidence(self._skill_rows[done:count], width)
+                skill_matrix = new_rows if skill_matrix is None else sparse.vstack(
+                    [_widen(skill_matrix, width), new_rows], format='csr')
+                if self._text_rows:
+                    new_text = sparse.vstack(self._text_rows[done:count], format='csr')
+                    text_matrix = new_text if text_matrix is None else sparse.vstack(
+                        [text_matrix, new_text], format='csr')
+                self._matrices = (count, skill_matrix, text_matrix)
+                done = count
+        if done > count:
+            return skill_matrix[:count], text_matrix[:count] if text_matrix is not None else None
+        return skill_matrix, text_matrix
+
+
+def _skill_row(resume: Resume, columns: Dict[str, int]) -> List[int]:
+    """Sorted skill columns of a resume, growing the column map as needed"""
+    return sorted({columns.setdefault(skill.lower(), len(columns)) for skill in resume.skills})
+
+
+def _incidence(rows: Sequence[Sequence[int]], width: int):
+    """Binary CSR matrix with the given column indices per row"""
+    indptr = array('q', [0])
+    indices = array('q')
+    for row in rows:
+        indices.extend(row)
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.frombuffer(indices, dtype=np.int64),
+         np.frombuffer(indptr, dtype=np.int64)),
+        shape=(len(rows), max(width, 1)))
+
+
+def _candidate_mask(locations: Sequence[str], levels: Sequence[str],
+                    filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """Boolean mask of candidates passing location/experience_level filters (case-insensitive)"""
+    if not filters:
+        return None
+    mask = np.ones(len(locations), dtype=bool)
+    location = (filters.get('location') or '').strip().lower()
+    if location:
+        mask &= np.array([location in value for value in locations], dtype=bool)
+    level = (filters.get('experience_level') or '').strip().lower()
+    if level:
+        mask &= np.array([value.lower() == level for value in levels], dtype=bool)
+    return mask
+
+
+def _widen(matrix, width: int):
+    """Return a CSR matrix padded with empty columns up to width"""
+    return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], max(width, 1)))
+
+
+class CandidateSearch:
+    """
+    Candidate store plus its current index and delta segment.
+
+    New candidates are added to the store and appended to the delta, so an
+    upload costs O(1) in the number of stored candidates and searches never
+    block. Once the delta reaches REBUILD_THRESHOLD of the index (or
+    CANDIDATE_DELTA_MAX_ROWS), the index is rebuilt over everyone in a
+    background thread, refitting TF-IDF, and the delta starts over.
+    """
+
+    def __init__(self, store: CandidateStore, text_fn: Callable[[Resume], str],
+                 level_fn: Callable[[Resume], str]):
+        self.store = store
+        self.text_fn = text_fn
+        self.level_fn = level_fn
+        self._write_lock = threading.Lock()
+        self._rebuilding = False
+        index = CandidateIndex(list(store), text_fn, level_fn)
+        # Swapped as one tuple so a search never sees a new index with an old delta
+        self._segments = (index, CandidateDelta(index))
+        logger.info(f"Loaded {len(index)} candidates from {store.path}")
+
+    @property
+    def index(self) -> CandidateIndex:
+        return self._segments[0]
+
+    def __len__(self):
+        index, delta = self._segments
+        return len(index) + len(delta)
+
+    def add(self, resume: Resume) -> int:
+        """
+        Store a parsed resume and make it searchable
+
+        Returns:
+            The candidate id
+        """
+        with self._write_lock:
+            self.store.append(resume)
+            index, delta = self._segments
+            delta.append(resume)
+            candidate_id = len(index) + len(delta) - 1
+            limit = min(REBUILD_THRESHOLD * max(len(index), 1), CANDIDATE_DELTA_MAX_ROWS)
+            if not self._rebuilding and len(delta) > limit:
+                self._rebuilding = True
+                threading.Thread(target=self._rebuild, name='candidate-rebuild', daemon=True).start()
+        return candidate_id
+
+    def _rebuild(self) -> None:
+        """Refit the index over all candidates, then start a delta with any added meanwhile"""
+        try:
+            index, delta = self._segments
+            resumes = index.resumes + delta.resumes[:len(delta)]
+            rebuilt = CandidateIndex(resumes, self.text_fn, self.level_fn)
+            with self._write_lock:
+                # Only a rebuild replaces the segments, so this delta is the one copied above
+                delta = self._segments[1]
+                new_delta = CandidateDelta(rebuilt)
+                for resume in delta.resumes[len(resumes) - len(index):]:
+                    new_delta.append(resume)
+                self._segments = (rebuilt, new_delta)
+            logger.info(f"Rebuilt candidate index over {len(rebuilt)} candidates")
+        except Exception as e:
+            logger.error(f"Error rebuilding candidate index: {str(e)}")
+        finally:
+            self._rebuilding = False
+
+    def rank(self, job: Any, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Rank stored candidates for a JobPosting or job posting dictionary"""
+        index, delta = self._segments
+        return index.rank(JobPosting.coerce(job), top_k, filters, delta)
@@ -0,0 +1,214 @@
+"""
+Circuit breaker for calls to a remote dependency.
+
+A CircuitBreaker watches the outcome and latency of recent calls. When too
+many of them fail or are slow it opens, and further calls raise
+CircuitOpen at once instead of waiting for the dependency to time out.
+After a cool-down it lets a few trial calls through (half-open); if they
+succeed it closes again, otherwise it stays open for another cool-down.
+
+The breaker also keeps the dependency's health (state, error and slow-call
+rates, last error) so callers can report it without making a call.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling the dependency while the circuit is open.
+
+    Attributes:
+        name: Name of the breaker
+        retry_after: Seconds until trial calls are let through again
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry after {retry_after:.1f} s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure- and latency-based circuit breaker.
+
+    Args:
+        name: Name used in logs and health reports
+        window_size: Number of recent calls the rates are computed over
+        min_calls: Calls needed in the window before the circuit can open
+        failure_rate: Share of failed calls that opens the circuit
+        slow_call_seconds: Calls taking longer than this count as slow
+        slow_call_rate: Share of slow calls that opens the circuit
+        open_seconds: Cool-down before trial calls are let through
+        half_open_trials: Successful trial calls needed to close again
+        ignore_exceptions: Exception types that are re-raised without
+            counting against the dependency (e.g. invalid requests)
+    """
+
+    def __init__(self, name: str, window_size: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_seconds: float = 10.0,
+                 slow_call_rate: float = 0.8, open_seconds: float = 30.0,
+                 half_open_trials: int = 2, ignore_exceptions: Tuple[Type[BaseException], ...] = ()):
+        self.name = name
+        self.min_calls = max(1, int(min_calls))
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_trials = max(1, int(half_open_trials))
+        self.ignore_exceptions = tuple(ignore_exceptions)
+        self._lock = threading.Lock()
+        # (failed, slow) of recent calls while closed
+        self._window: deque = deque(maxlen=max(self.min_calls, int(window_size)))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+        # Incremented on every half-open period; trial results from an earlier one are ignored
+        self._half_open_generation = 0
+        self._latency_ms = 0.0
+        self._last_error: Optional[str] = None
+        self._last_success_at: Optional[float] = None
+        self._last_failure_at: Optional[float] = None
+        self._metrics = {'calls': 0, 'failures': 0, 'slow_calls': 0,
+                         'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit past its cool-down reports half-open"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_generation += 1
+            self._trials_in_flight = 0
+            self._trial_successes = 0
+            logger.info(f"Circuit '{self.name}' half-open: letting trial calls through")
+        return self._state
+
+    def _open(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        self._metrics['opened'] += 1
+        logger.warning(f"Circuit '{self.name}' opened ({reason}) for {self.open_seconds:.0f} s")
+
+    def _before_call(self) -> Optional[int]:
+        """Admit a call or raise CircuitOpen; returns the half-open generation of a trial call"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return None
+            if state == HALF_OPEN and self._trials_in_flight < self.half_open_trials - self._trial_successes:
+                self._trials_in_flight += 1
+                return self._half_open_generation
+            self._metrics['rejected'] += 1
+            retry_after = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)) if state == OPEN else 1.0
+            raise CircuitOpen(self.name, retry_after)
+
+    def _record(self, trial: Optional[int], failed: bool, elapsed: float,
+                error: Optional[BaseException] = None) -> None:
+        slow = elapsed > self.slow_call_seconds
+        now = time.time()
+        with self._lock:
+            self._metrics['calls'] += 1
+            self._metrics['failures'] += int(failed)
+            self._metrics['slow_calls'] += int(slow)
+            self._latency_ms = 0.8 * self._latency_ms + 0.2 * elapsed * 1000 if self._metrics['calls'] > 1 else elapsed * 1000
+            if failed:
+                self._last_error = f"{type(error).__name__}: {error}"
+                self._last_failure_at = now
+            else:
+                self._last_success_at = now
+
+            if trial is not None:
+                if trial != self._half_open_generation or self._state != HALF_OPEN:
+                    # A trial of an earlier half-open period finished late; the
+                    # current period's in-flight count and successes are not its
+                    return
+                self._trials_in_flight -= 1
+                if failed or slow:
+                    self._open('trial call failed' if failed else 'trial call slow')
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_trials:
+                        self._state = CLOSED
+                        self._window.clear()
+                        logger.info(f"Circuit '{self.name}' closed")
+                return
+
+            if self._state != CLOSED:
+                # A call admitted before the circuit opened finished late
+                return
+            self._window.append((failed, slow))
+            if len(self._window) < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._window if f) / len(self._window)
+            slow_calls = sum(1 for _, s in self._window if s) / len(self._window)
+            if failures >= self.failure_rate:
+                self._open(f"{failures:.0%} of recent calls failed")
+            elif slow_calls >= self.slow_call_rate:
+                self._open(f"{slow_calls:.0%} of recent calls took over {self.slow_call_seconds:.0f} s")
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call func through the breaker
+
+        Raises:
+            CircuitOpen: If the circuit is open (func is not called)
+            Exception: Whatever func raises
+        """
+        trial = self._before_call()
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except self.ignore_exceptions:
+            # The dependency answered; the request itself was at fault
+            self._record(trial, False, time.perf_counter() - started)
+            raise
+        except Exception as e:
+            self._record(trial, True, time.perf_counter() - started, e)
+            raise
+        self._record(trial, False, time.perf_counter() - started)
+        return result
+
+    def last_call_age(self) -> Optional[float]:
+        """Seconds since the last call finished, or None before the first"""
+        with self._lock:
+            last = max(self._last_success_at or 0.0, self._last_failure_at or 0.0)
+        return time.time() - last if last else None
+
+    def health(self) -> Dict[str, Any]:
+        """State, recent error and slow-call rates, latency and last error"""
+        with self._lock:
+            state = self._current_state()
+            window = len(self._window)
+            return {
+                'name': self.name,
+                'state': state,
+                'healthy': state == CLOSED and not (self._last_failure_at and (
+                    self._last_success_at or 0) < self._last_failure_at),
+                'recent_calls': window,
+                'failure_rate': sum(1 for f, _ in self._window if f) / window if window else 0.0,
+                'slow_call_rate': sum(1 for _, s in self._window if s) / window if window else 0.0,
+                'avg_latency_ms': self._latency_ms,
+                'retry_after': max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0,
+                'last_error': self._last_error,
+                'last_success_at': self._last_success_at,
+                'last_failure_at': self._last_failure_at,
+                **self._metrics,
+            }
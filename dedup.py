@@ -0,0 +1,181 @@
+"""
+Near-duplicate job posting detection with MinHash and LSH banding.
+
+Each posting's ``title + description + required_skills`` is split into word
+shingles and summarized by a MinHash signature. Signatures are cut into
+bands; postings sharing a band bucket are candidate duplicates, confirmed
+when their estimated Jaccard similarity reaches the threshold, and merged
+with union-find over the live postings. Ingest is a single pass: each new posting is only compared
+with the postings already in its buckets.
+"""
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from keyword_index import job_text, tokenize
+from models import JobPosting
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Collapse near-duplicate postings into one recommendation (JOB_DEDUP=0 disables)
+DEDUP_ENABLED = os.environ.get("JOB_DEDUP", "1").lower() not in ("0", "false", "no")
+
+# Estimated Jaccard similarity above which two postings are duplicates
+DEDUP_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", 0.8))
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 similarity almost always share a bucket
+NUM_BANDS = 16
+# Members compared per bucket, bounding work on very common buckets
+MAX_BUCKET_COMPARISONS = 32
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hash the distinct word shingles of a text"""
+    words = tokenize(text)
+    if len(words) < size:
+        shingles = {' '.join(words)} if words else set()
+    else:
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.array([zlib.crc32(s.encode('utf-8')) % _MERSENNE_PRIME for s in shingles], dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature of a text
+
+    Returns:
+        uint32 array of NUM_PERMUTATIONS minimum hash values
+    """
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return np.full(NUM_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint32)
+    # (a * x + b) mod p for every permutation and shingle; a * x < 2**62 fits in uint64
+    values = (_PERM_A[:, np.newaxis] * hashes[np.newaxis, :] + _PERM_B[:, np.newaxis]) % _MERSENNE_PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """
+    LSH buckets and confirmed duplicate pairs over catalog positions.
+
+    Positions are appended as postings are ingested. Dead positions (deleted
+    or replaced postings) are dropped from the buckets as they are met and
+    are left out when clusters are formed, so a removed posting never keeps
+    two live postings in one cluster. The catalog rebuilds the index on
+    compaction.
+    """
+
+    def __init__(self, job_postings: Sequence[JobPosting] = (), threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.rows_per_band = NUM_PERMUTATIONS // NUM_BANDS
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(NUM_BANDS)]
+        self.signatures = np.zeros((0, NUM_PERMUTATIONS), dtype=np.uint32)
+        # Confirmed near-duplicate pairs (earlier position first)
+        self.pairs: List[Tuple[int, int]] = []
+        self.add(job_postings)
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, job_postings: Iterable[JobPosting], live: Optional[np.ndarray] = None) -> None:
+        """
+        Append postings, pairing each with the near-duplicates already ingested
+
+        Args:
+            job_postings: New postings, in position order after the existing ones
+            live: Live mask over all positions including the new ones; dead
+                positions are removed from the buckets instead of compared
+        """
+        job_postings = list(job_postings)
+        if not job_postings:
+            return
+        start = len(self)
+        new_signatures = np.stack([minhash_signature(job_text(job)) for job in job_postings])
+        self.signatures = np.concatenate([self.signatures, new_signatures])
+
+        rows = self.rows_per_band
+        paired = 0
+        for offset, signature in enumerate(new_signatures):
+            position = start + offset
+            compared = set()
+            for band, buckets in enumerate(self.buckets):
+                key = signature[band * rows:(band + 1) * rows].tobytes()
+                members = buckets.setdefault(key, [])
+                if live is not None and not all(live[other] for other in members):
+                    members[:] = [other for other in members if live[other]]
+                for other in members[:MAX_BUCKET_COMPARISONS]:
+                    if other in compared:
+                        continue
+                    compared.add(other)
+                    if np.mean(self.signatures[other] == signature) >= self.threshold:
+                        self.pairs.append((other, position))
+                        paired += 1
+                members.append(position)
+        if paired:
+            logger.info(f"Found {paired} near-duplicate pairs among new postings")
+
+    def clusters(self, live: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Cluster assignment of every position given the live mask
+
+        Clusters are the connected components of the confirmed pairs whose
+        postings are both live.
+
+        Args:
+            live: Boolean mask of live positions
+
+        Returns:
+            'root': cluster id per position (its earliest member);
+            'canonical': mask of live positions that represent their cluster
+                (the earliest live member); 'canonical_of': canonical position
+                per position; 'similar_count': other live members per position
+        """
+        size = len(live)
+        parent = np.arange(size)
+
+        def find(position):
+            root = position
+            while parent[root] != root:
+                root = parent[root]
+            while parent[position] != root:
+                parent[position], position = root, parent[position]
+            return root
+
+        for a, b in self.pairs:
+            if live[a] and live[b]:
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    # The earlier posting stays the root
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+        roots = parent
+        while True:
+            next_roots = roots[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+
+        positions = np.arange(size)
+        canonical_by_root = np.full(size, size, dtype=np.int64)
+        np.minimum.at(canonical_by_root, roots[live], positions[live])
+        live_members = np.bincount(roots[live], minlength=size)
+
+        canonical_of = canonical_by_root[roots]
+        canonical = live & (canonical_of == positions)
+        return {
+            'root': roots,
+            'canonical': canonical,
+            'canonical_of': canonical_of,
+            'similar_count': np.maximum(live_members[roots] - 1, 0),
+        }
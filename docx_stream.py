@@ -0,0 +1,161 @@
+"""
+Streaming DOCX text extraction.
+
+Reads ``word/document.xml`` and the header and footer parts straight from
+the zip archive with iterparse, yielding the text of paragraphs, table
+cells and text boxes as their closing tags arrive. Each finished element
+is cleared and detached from its parent, so memory stays flat however
+large the document is, and no python-docx object model is built.
+"""
+import logging
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Iterator, List
+from xml.etree.ElementTree import iterparse
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+_PARAGRAPH = _W + 'p'
+_TABLE_CELL = _W + 'tc'
+_TEXT = _W + 't'
+_TEXTBOX = _W + 'txbxContent'
+_FALLBACK = _MC + 'Fallback'
+# Elements discarded as soon as they are read
+_BLOCKS = {_PARAGRAPH, _TABLE_CELL, _W + 'tr', _W + 'tbl'}
+# Run-level elements that stand for whitespace or characters
+_BREAKS = {_W + 'tab': '\t', _W + 'br': '\n', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+
+_HEADER_FOOTER = re.compile(r'^word/(header|footer)\d*\.xml$')
+
+
+@dataclass
+class DocxBlock:
+    """
+    One piece of document text with a structure hint.
+
+    ``kind`` is 'heading', 'list_item', 'paragraph', 'table_cell' or
+    'textbox'; ``part`` is 'header', 'body' or 'footer'.
+    """
+    text: str
+    kind: str
+    part: str
+    style: str = ''
+
+
+def _paragraph_kind(paragraph, style: str) -> str:
+    if style.lower().startswith(('heading', 'title')):
+        return 'heading'
+    properties = paragraph.find(_W + 'pPr')
+    if properties is not None and properties.find(_W + 'numPr') is not None:
+        return 'list_item'
+    return 'paragraph'
+
+
+def _paragraph_style(paragraph) -> str:
+    style = paragraph.find(f'{_W}pPr/{_W}pStyle')
+    return style.get(_W + 'val', '') if style is not None else ''
+
+
+def iter_part_blocks(stream, part: str) -> Iterator[DocxBlock]:
+    """
+    Yield the text blocks of one WordprocessingML part
+
+    Args:
+        stream: File object over the part's XML
+        part: 'header', 'body' or 'footer'
+    """
+    stack = []
+    # Text of every open paragraph (text boxes nest paragraphs) and table cell
+    paragraphs: List[List[str]] = []
+    cells: List[List[str]] = []
+    textbox_depth = 0
+    fallback_depth = 0
+
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            stack.append(elem)
+            if tag == _FALLBACK:
+                # Legacy copy of content already read from mc:Choice
+                fallback_depth += 1
+            elif fallback_depth:
+                pass
+            elif tag == _PARAGRAPH:
+                paragraphs.append([])
+            elif tag == _TEXTBOX:
+                textbox_depth += 1
+            elif tag == _TABLE_CELL:
+                cells.append([])
+            continue
+
+        stack.pop()
+        if fallback_depth:
+            if tag == _FALLBACK:
+                fallback_depth -= 1
+        elif tag == _TEXT:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or '')
+        elif tag in _BREAKS:
+            if paragraphs:
+                paragraphs[-1].append(_BREAKS[tag])
+        elif tag == _PARAGRAPH:
+            text = ''.join(paragraphs.pop()).strip()
+            if text:
+                if cells and not textbox_depth:
+                    cells[-1].append(text)
+                else:
+                    style = _paragraph_style(elem)
+                    kind = 'textbox' if textbox_depth else _paragraph_kind(elem, style)
+                    yield DocxBlock(text, kind, part, style)
+        elif tag == _TABLE_CELL:
+            text = ' '.join(cells.pop())
+            if text:
+                yield DocxBlock(text, 'table_cell', part)
+        elif tag == _TEXTBOX:
+            textbox_depth -= 1
+
+        if tag in _BLOCKS or len(stack) <= 2:
+            # Drop finished blocks (and anything directly under the body) so
+            # the tree never grows past the open elements
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+
+def iter_docx_blocks(file_path: str) -> Iterator[DocxBlock]:
+    """
+    Yield the text blocks of a DOCX file: headers, then the body, then footers
+
+    Identical header or footer text (e.g. the same header on first and
+    following pages) is yielded once.
+
+    Raises:
+        zipfile.BadZipFile: If the file is not a zip archive
+        KeyError: If the archive has no word/document.xml
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        names = archive.namelist()
+        extra_parts = sorted(name for name in names if _HEADER_FOOTER.match(name))
+        parts = ([(name, 'header') for name in extra_parts if 'header' in name] +
+                 [('word/document.xml', 'body')] +
+                 [(name, 'footer') for name in extra_parts if 'footer' in name])
+        seen = set()
+        for name, part in parts:
+            with archive.open(name) as stream:
+                for block in iter_part_blocks(stream, part):
+                    if part != 'body':
+                        if block.text in seen:
+                            continue
+                        seen.add(block.text)
+                    yield block
+
+
+def read_docx_text(file_path: str) -> str:
+    """Text of a DOCX file, one block per line"""
+    return '\n'.join(block.text for block in iter_docx_blocks(file_path))
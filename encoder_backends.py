@@ -0,0 +1,244 @@
+"""
+Pluggable CPU inference backends for the sentence embedding model.
+
+``torch``       stock SentenceTransformer (the reference embeddings)
+``torch-int8``  SentenceTransformer with Linear layers dynamically quantized to int8
+``onnx``        the transformer exported to ONNX, dynamically quantized to int8 and
+                run with ONNX Runtime; mean pooling is done in numpy
+
+Every backend exposes ``encode(texts, batch_size)`` like SentenceTransformer.
+Run ``python encoder_backends.py --backend onnx`` to check parity with the
+reference embeddings and compare latency.
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Flag to determine if the reference model can be loaded
+try:
+    from sentence_transformers import SentenceTransformer
+    import torch
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    logger.warning("sentence-transformers not available. Encoder backends are disabled")
+
+# Flag to determine if ONNX Runtime is available
+try:
+    import onnxruntime
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+    logger.info("onnxruntime not available. The onnx encoder backend is disabled")
+
+DEFAULT_MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+ENCODER_BACKENDS = ('torch', 'torch-int8', 'onnx')
+
+# Where exported and quantized ONNX models are kept between runs
+ONNX_MODEL_DIR = os.environ.get(
+    "ENCODER_ONNX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_models'))
+
+# Texts used by the parity check when none are given
+PARITY_TEXTS = [
+    "Senior Python developer with experience in Flask, Django and PostgreSQL",
+    "Data scientist skilled in machine learning, pandas and statistical modeling",
+    "Led a team of five engineers building React and TypeScript front ends",
+    "Managed AWS infrastructure with Terraform, Docker and Kubernetes",
+    "Entry-level marketing coordinator",
+    "Python",
+]
+
+
+class SentenceTransformerBackend:
+    """Reference backend: stock PyTorch eager inference"""
+
+    name = 'torch'
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, threads: Optional[int] = None):
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name, device='cpu')
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """PyTorch backend with Linear layers dynamically quantized to int8"""
+
+    name = 'torch-int8'
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, threads: Optional[int] = None):
+        super().__init__(model_name, threads)
+        self.model = torch.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime backend running a dynamically int8-quantized export.
+
+    The export is done once from the SentenceTransformer's transformer module
+    and cached in ONNX_MODEL_DIR; the tokenizer is reused from the same model.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, threads: Optional[int] = None,
+                 model_dir: str = ONNX_MODEL_DIR):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+        reference = SentenceTransformer(model_name, device='cpu')
+        self.tokenizer = reference.tokenizer
+        self.max_seq_length = reference.max_seq_length
+        pooling = reference[1]
+        if not getattr(pooling, 'pooling_mode_mean_tokens', False):
+            raise ValueError(f"{model_name} does not use mean pooling")
+        self.normalize = any(type(module).__name__ == 'Normalize' for module in reference)
+
+        quantized_path = os.path.join(model_dir, f"{model_name.replace('/', '_')}-int8.onnx")
+        if not os.path.exists(quantized_path):
+            self._export(reference, model_dir, quantized_path)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            quantized_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _export(self, reference, model_dir: str, quantized_path: str) -> None:
+        """Export the transformer to ONNX and quantize its weights to int8"""
+        os.makedirs(model_dir, exist_ok=True)
+        float_path = quantized_path.replace('-int8.onnx', '.onnx')
+        sample = self.tokenizer(["hello world"], return_tensors='pt')
+        names = ['input_ids', 'attention_mask', 'token_type_ids']
+        names = [name for name in names if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in names + ['last_hidden_state']}
+
+        started = time.perf_counter()
+        with torch.no_grad():
+            torch.onnx.export(reference[0].auto_model, tuple(sample[name] for name in names), float_path,
+                              input_names=names, output_names=['last_hidden_state'],
+                              dynamic_axes=dynamic_axes, opset_version=14)
+        # Write to a temporary name so a crash never leaves a half-written model behind
+        tmp_path = quantized_path + '.tmp'
+        quantize_dynamic(float_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, quantized_path)
+        logger.info(f"Exported int8 ONNX encoder to {quantized_path} in "
+                    f"{time.perf_counter() - started:.1f} s")
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors='np')
+            feed = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = tokens['attention_mask'][..., np.newaxis].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+            batches.append(embeddings.astype(np.float32))
+        return np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+
+
+def create_backend(name: str = 'torch', model_name: str = DEFAULT_MODEL_NAME,
+                   threads: Optional[int] = None):
+    """
+    Load an encoder backend
+
+    Args:
+        name: One of ENCODER_BACKENDS
+        model_name: SentenceTransformer model to load
+        threads: Intra-op threads per worker (None keeps the runtime default)
+
+    Returns:
+        Backend exposing encode(texts, batch_size)
+
+    Raises:
+        ValueError: If the backend name is unknown
+        RuntimeError: If the backend's runtime is not installed
+    """
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        raise RuntimeError("sentence-transformers is not installed")
+    backends = {
+        'torch': SentenceTransformerBackend,
+        'torch-int8': QuantizedTorchBackend,
+        'onnx': OnnxBackend,
+    }
+    if name not in backends:
+        raise ValueError(f"Unknown encoder backend: {name}")
+    return backends[name](model_name, threads=threads)
+
+
+def check_parity(backend, reference, texts: List[str] = None, min_cosine: float = 0.98) -> Dict[str, float]:
+    """
+    Compare a backend's embeddings against the reference backend
+
+    Args:
+        backend: Backend under test
+        reference: Reference backend (usually SentenceTransformerBackend)
+        texts: Texts to embed (defaults to PARITY_TEXTS)
+        min_cosine: Lowest acceptable per-text cosine similarity
+
+    Returns:
+        Dictionary with min/mean cosine similarity, max absolute error and
+        whether the backend passed
+    """
+    texts = texts or PARITY_TEXTS
+    expected = np.asarray(reference.encode(texts), dtype=np.float32)
+    actual = np.asarray(backend.encode(texts), dtype=np.float32)
+    cosines = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1))
+    return {
+        'min_cosine': float(cosines.min()),
+        'mean_cosine': float(cosines.mean()),
+        'max_abs_error': float(np.abs(expected - actual).max()),
+        'passed': bool(cosines.min() >= min_cosine),
+    }
+
+
+def _time_encode(backend, texts: List[str], repeats: int) -> float:
+    """Average milliseconds per encode call"""
+    backend.encode(texts)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        backend.encode(texts)
+    return (time.perf_counter() - started) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check an encoder backend against the reference embeddings")
+    parser.add_argument('--backend', choices=ENCODER_BACKENDS, default='onnx')
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--threads', type=int, default=None, help="Intra-op threads")
+    parser.add_argument('--repeats', type=int, default=20, help="Timed encode calls per backend")
+    parser.add_argument('--min-cosine', type=float, default=0.98)
+    args = parser.parse_args()
+
+    reference = create_backend('torch', args.model, args.threads)
+    backend = create_backend(args.backend, args.model, args.threads)
+    report = check_parity(backend, reference, min_cosine=args.min_cosine)
+    report['reference_ms'] = _time_encode(reference, PARITY_TEXTS, args.repeats)
+    report['backend_ms'] = _time_encode(backend, PARITY_TEXTS, args.repeats)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    raise SystemExit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
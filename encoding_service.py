@@ -0,0 +1,246 @@
+"""
+In-process micro-batching service for sentence embedding requests.
+
+Concurrent callers each submit a handful of texts. A single worker thread
+collects requests for up to ``max_wait_ms`` or until ``max_batch_size`` texts
+are queued, encodes them as one length-sorted batch, and scatters the rows
+back to the callers. EmbeddingCache sits in front of it so unchanged texts
+are never encoded twice.
+"""
+import asyncio
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchEncoder:
+    """
+    Coalesces encode calls from many threads into batched model calls.
+
+    Args:
+        encode_fn: Function encoding a list of texts into a 2-D array
+        max_batch_size: Maximum number of texts per model call
+        max_wait_ms: How long to wait for more requests before running a batch
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[List[str], Future, float]]" = queue.Queue()
+        # Request that did not fit in the previous batch (worker thread only)
+        self._carry = None
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'requests': 0,
+            'texts': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'total_wait_ms': 0.0,
+            'total_encode_ms': 0.0,
+        }
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use (after any fork)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='encoder-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for encoding
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Future resolving to an array with one embedding row per text
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.array([]))
+            return future
+        self._ensure_worker()
+        self._queue.put((list(texts), future, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._metrics_lock:
+            self._metrics['requests'] += 1
+            self._metrics['texts'] += len(texts)
+            self._metrics['max_queue_depth'] = max(self._metrics['max_queue_depth'], depth)
+        return future
+
+    def encode(self, texts: List[str], timeout: float = None) -> np.ndarray:
+        """Encode texts, blocking until their batch has run"""
+        return self.submit(texts).result(timeout=timeout)
+
+    async def encode_async(self, texts: List[str]) -> np.ndarray:
+        """Encode texts from asyncio code without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _collect(self) -> List[Tuple[List[str], Future, float]]:
+        """Block for one request, then gather more until the batch is full or the wait expires"""
+        if self._carry is not None:
+            batch, self._carry = [self._carry], None
+        else:
+            batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request[0]) > self.max_batch_size:
+                # Requests are never split; this one starts the next batch
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: collect, encode as one batch, scatter results"""
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = [text for request_texts, _, _ in batch for text in request_texts]
+
+            # Length-sorted order keeps similarly sized texts together, minimizing padding
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            try:
+                sorted_embeddings = np.asarray(self.encode_fn([texts[i] for i in order]))
+                embeddings = np.empty_like(sorted_embeddings)
+                embeddings[order] = sorted_embeddings
+            except Exception as e:
+                logger.error(f"Error encoding batch of {len(texts)} texts: {str(e)}")
+                with self._metrics_lock:
+                    self._metrics['errors'] += 1
+                for _, future, _ in batch:
+                    if not future.cancelled():
+                        future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            offset = 0
+            wait_ms = 0.0
+            for request_texts, future, queued_at in batch:
+                if not future.cancelled():
+                    future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+                wait_ms += (started - queued_at) * 1000
+
+            with self._metrics_lock:
+                self._metrics['batches'] += 1
+                self._metrics['total_wait_ms'] += wait_ms
+                self._metrics['total_encode_ms'] += (finished - started) * 1000
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue depth and batching statistics"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        batches = metrics['batches'] or 1
+        requests = metrics['requests'] or 1
+        metrics.update({
+            'queue_depth': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'avg_batch_texts': metrics['texts'] / batches,
+            'avg_wait_ms': metrics.pop('total_wait_ms') / requests,
+            'avg_encode_ms': metrics.pop('total_encode_ms') / batches,
+        })
+        return metrics
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of embeddings keyed by a hash of the text.
+
+    Only texts missing from the cache are sent to the encoder, so re-encoding
+    a lightly edited document costs only its changed chunks.
+
+    Args:
+        encode_fn: Function encoding a list of texts into a 2-D array
+        max_entries: Maximum number of cached embeddings
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_entries: int = 10000):
+        self.encode_fn = encode_fn
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Cache key for a text"""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Return one embedding row per text, encoding only uncached texts
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            2-D array of embeddings in input order
+        """
+        if not texts:
+            return np.array([])
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = embedding
+            self._hits += sum(1 for key in keys if key in found)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            embeddings = np.asarray(self.encode_fn(list(missing.values())))
+            found.update(zip(missing.keys(), embeddings))
+            with self._lock:
+                self._misses += len(missing)
+                for key in missing:
+                    self._entries[key] = found[key]
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return np.stack([found[key] for key in keys])
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return cache size and hit statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
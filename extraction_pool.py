@@ -0,0 +1,414 @@
+"""
+Resume text extraction in sandboxed, resource-limited helper processes.
+
+PDF and DOCX parsing runs in a small pool of pre-started worker processes
+instead of the web process, so a malformed or adversarial document can
+only take down a disposable worker. Each worker runs with an address-space
+rlimit and a per-file CPU-time rlimit; the parent adds a wall-clock timeout
+and kills workers that exceed it. Workers are recycled after a number of
+files or once their resident memory has grown past a limit.
+
+Workers are separate interpreters started from this file, talking to the
+parent over their stdin/stdout with length-prefixed pickle frames, so they
+never import the web app, spaCy or the models.
+"""
+import argparse
+import logging
+import os
+import pickle
+import queue
+import select
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from docx_stream import read_docx_text
+from utils import clean_text
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# resource is POSIX-only; without it workers run without rlimits
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Worker processes (0 extracts in the web process)
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", 2))
+# Wall-clock limit per file, in seconds
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT", 20))
+# CPU-time limit per file, in seconds
+EXTRACTION_CPU_SECONDS = int(os.environ.get("EXTRACTION_CPU_SECONDS", 10))
+# Address-space limit per worker, in MB
+EXTRACTION_MEMORY_MB = int(os.environ.get("EXTRACTION_MEMORY_MB", 1024))
+# Files handled by a worker before it is replaced
+EXTRACTION_MAX_FILES = int(os.environ.get("EXTRACTION_MAX_FILES", 200))
+# Resident memory growth (MB) over a worker's baseline that triggers recycling
+EXTRACTION_MAX_RSS_GROWTH_MB = int(os.environ.get("EXTRACTION_MAX_RSS_GROWTH_MB", 200))
+
+# Frame length prefix on the worker pipes
+_FRAME_HEADER = struct.Struct('>I')
+
+
+class UnsupportedFormatError(ValueError):
+    """The file extension is not one read_document can extract"""
+
+
+def read_document(file_path: str, file_extension: str) -> str:
+    """
+    Extract and clean the text of a PDF, DOCX or TXT file
+
+    Raises:
+        UnsupportedFormatError: If the extension is not supported
+        Exception: Whatever the underlying parser raises on a bad file
+    """
+    extension = file_extension.lower()
+    if extension == 'pdf':
+        from PyPDF2 import PdfReader
+        text = ''
+        reader = PdfReader(file_path)
+        for page in reader.pages:
+            text += page.extract_text() + '\n'
+        return clean_text(text)
+    if extension == 'docx':
+        # Streams paragraphs, tables, text boxes, headers and footers from the zip
+        return clean_text(read_docx_text(file_path))
+    if extension == 'txt':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return clean_text(f.read())
+    raise UnsupportedFormatError(f"Unsupported file extension: {file_extension}")
+
+
+@dataclass
+class ExtractionResult:
+    """Outcome of extracting one file; ``error`` names the failure reason"""
+    file_path: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    worker_pid: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _write_frame(stream, payload: Any) -> None:
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_FRAME_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_frame(stream) -> Any:
+    """Read one frame; raises EOFError if the other side went away"""
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        raise EOFError("pipe closed")
+    size, = _FRAME_HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("pipe closed mid-frame")
+    return pickle.loads(data)
+
+
+def _current_rss_kb() -> int:
+    """Resident set size of this process in KB"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, but still grows with leaks
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if RESOURCE_AVAILABLE else 0
+
+
+def _worker_main(cpu_seconds: int, memory_mb: int) -> None:
+    """Serve extraction requests from stdin until it is closed"""
+    # Frames go to a private copy of stdout; stray prints from parsers go to stderr
+    requests = os.fdopen(os.dup(0), 'rb')
+    replies = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+
+    if RESOURCE_AVAILABLE and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            file_path, file_extension = _read_frame(requests)
+        except EOFError:
+            return
+        if RESOURCE_AVAILABLE and cpu_seconds:
+            # RLIMIT_CPU counts the whole process, so move the soft limit past the time used so far
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = int(usage.ru_utime + usage.ru_stime) + 1
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+        try:
+            reply = {'text': read_document(file_path, file_extension), 'error': None}
+        except MemoryError:
+            reply = {'text': None, 'error': 'memory_limit'}
+        except UnsupportedFormatError as e:
+            reply = {'text': None, 'error': f"unsupported: {str(e)}"}
+        except Exception as e:
+            reply = {'text': None, 'error': f"parse_error: {type(e).__name__}: {str(e)}"}
+        reply['rss_kb'] = _current_rss_kb()
+        _write_frame(replies, reply)
+        if reply['error'] == 'memory_limit':
+            # The heap may be fragmented or half-built; let the parent start a fresh worker
+            return
+
+
+class _Worker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, cpu_seconds: int, memory_mb: int):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker',
+             '--cpu-seconds', str(cpu_seconds), '--memory-mb', str(memory_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.files = 0
+        self.baseline_rss_kb = None
+        self.rss_kb = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def extract(self, file_path: str, file_extension: str, timeout: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Run one file through the worker
+
+        Returns:
+            (text, error); after any error other than a parse or
+            unsupported-format failure the worker must be discarded
+        """
+        self.files += 1
+        try:
+            _write_frame(self.process.stdin, (file_path, file_extension))
+        except (BrokenPipeError, OSError):
+            return None, self._exit_reason()
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            self.kill()
+            return None, 'timeout'
+        try:
+            reply = _read_frame(self.process.stdout)
+        except (EOFError, pickle.UnpicklingError):
+            return None, self._exit_reason()
+        self.rss_kb = reply['rss_kb']
+        if self.baseline_rss_kb is None:
+            self.baseline_rss_kb = self.rss_kb
+        return reply['text'], reply['error']
+
+    def _exit_reason(self) -> str:
+        """Name the reason a worker died mid-file"""
+        try:
+            returncode = self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            return 'crashed'
+        if returncode == -signal.SIGXCPU:
+            return 'cpu_limit'
+        return f"crashed: exit status {returncode}"
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def retire(self) -> None:
+        """Close stdin so the worker exits after its current file"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self) -> None:
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+class ExtractionPool:
+    """
+    Pool of sandboxed extraction workers.
+
+    Workers start on first use and are replaced at once whenever one times out,
+    crashes, hits a limit, has handled ``max_files`` files or has grown
+    ``max_rss_growth_mb`` above its memory after the first file.
+
+    Args:
+        workers: Number of worker processes
+        timeout: Wall-clock limit per file in seconds
+        cpu_seconds: CPU-time limit per file in seconds
+        memory_mb: Address-space limit per worker in MB
+        max_files: Files per worker before it is recycled
+        max_rss_growth_mb: Resident memory growth that triggers recycling
+    """
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT,
+                 cpu_seconds: int = EXTRACTION_CPU_SECONDS, memory_mb: int = EXTRACTION_MEMORY_MB,
+                 max_files: int = EXTRACTION_MAX_FILES,
+                 max_rss_growth_mb: int = EXTRACTION_MAX_RSS_GROWTH_MB):
+        self.size = max(1, int(workers))
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_files = max_files
+        self.max_rss_growth_kb = max_rss_growth_mb * 1024
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            'files': 0,
+            'failed': 0,
+            'failures': {},
+            'workers_started': 0,
+            'workers_recycled': 0,
+            'total_ms': 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        """Start the workers on first use in this process (after any fork)"""
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                for _ in range(self.size):
+                    self._idle.put(self._spawn())
+                self._started = True
+
+    def _spawn(self) -> Optional[_Worker]:
+        """Start a worker; it imports its parsers while waiting for the first file"""
+        try:
+            worker = _Worker(self.cpu_seconds, self.memory_mb)
+        except OSError as e:
+            logger.error(f"Could not start extraction worker: {str(e)}")
+            return None
+        with self._metrics_lock:
+            self._metrics['workers_started'] += 1
+        return worker
+
+    def extract(self, file_path: str, file_extension: str) -> ExtractionResult:
+        """
+        Extract the text of one file in a worker, blocking until a worker is free
+
+        Returns:
+            ExtractionResult with the text, or the failure reason in ``error``
+        """
+        self._ensure_started()
+        worker = self._idle.get()
+        started = time.perf_counter()
+        try:
+            if worker is None or not worker.alive():
+                worker = self._spawn()
+                if worker is None:
+                    raise RuntimeError("no extraction worker available")
+            text, error = worker.extract(file_path, file_extension, self.timeout)
+            pid = worker.pid
+            reusable = worker.alive() and (error is None or error.startswith(('parse_error', 'unsupported')))
+            if reusable and (worker.files >= self.max_files or
+                             worker.rss_kb - (worker.baseline_rss_kb or 0) > self.max_rss_growth_kb):
+                logger.info(f"Recycling extraction worker {pid} after {worker.files} files "
+                            f"({worker.rss_kb // 1024} MB resident)")
+                reusable = False
+                with self._metrics_lock:
+                    self._metrics['workers_recycled'] += 1
+            if not reusable:
+                if worker.alive():
+                    worker.retire()
+                else:
+                    worker.kill()
+                # Start the replacement now so the next file does not wait for its imports
+                worker = self._spawn()
+        except Exception as e:
+            # Spawning failed or the pipe broke in an unexpected way
+            logger.error(f"Extraction worker failure: {str(e)}")
+            if worker is not None:
+                worker.kill()
+            text, error, pid, worker = None, f"crashed: {str(e)}", None, None
+        finally:
+            self._idle.put(worker)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._metrics_lock:
+            self._metrics['files'] += 1
+            self._metrics['total_ms'] += elapsed_ms
+            if error is not None:
+                reason = error.split(':', 1)[0]
+                self._metrics['failed'] += 1
+                self._metrics['failures'][reason] = self._metrics['failures'].get(reason, 0) + 1
+        if error is not None:
+            logger.warning(f"Extraction of {file_path} failed: {error}")
+        return ExtractionResult(file_path, text, error, elapsed_ms, pid)
+
+    def extract_many(self, files: Iterable[Tuple[str, str]]) -> Iterator[ExtractionResult]:
+        """
+        Extract many files across the pool
+
+        Args:
+            files: (file path, extension) pairs
+
+        Yields:
+            ExtractionResult objects in completion order
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.extract, path, extension) for path, extension in files]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def metrics(self) -> Dict[str, Any]:
+        """File counts, failure reasons, worker churn and mean latency"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            metrics['failures'] = dict(self._metrics['failures'])
+            files = metrics['files'] or 1
+            metrics['avg_ms'] = metrics.pop('total_ms') / files
+            return metrics
+
+    def close(self) -> None:
+        """Stop all idle workers"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.retire()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract resume text in sandboxed worker processes")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--cpu-seconds', type=int, default=EXTRACTION_CPU_SECONDS)
+    parser.add_argument('--memory-mb', type=int, default=EXTRACTION_MEMORY_MB)
+    parser.add_argument('files', nargs='*', help="Files to extract")
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker_main(args.cpu_seconds, args.memory_mb)
+        return
+
+    pool = ExtractionPool(cpu_seconds=args.cpu_seconds, memory_mb=args.memory_mb)
+    try:
+        files = [(path, path.rsplit('.', 1)[-1]) for path in args.files]
+        for result in pool.extract_many(files):
+            status = f"{len(result.text)} chars" if result.ok else result.error
+            print(f"{result.file_path}: {status} ({result.elapsed_ms:.0f} ms)")
+    finally:
+        pool.close()
+    print(pool.metrics())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Vocabulary-free lexical scoring with feature hashing.
+
+Terms are hashed into a fixed number of buckets (with a sign bit, so
+colliding terms tend to cancel rather than add up), giving fixed-width
+sparse vectors that any process can compute independently. Document
+frequencies are kept per bucket and updated incrementally as postings are
+added and removed, so there is no vocabulary to fit, store or refit.
+"""
+import logging
+import os
+import threading
+import zlib
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from keyword_index import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Number of hash buckets (a power of two); 2**18 keeps the DF table at 1 MB
+HASHED_FEATURES = int(os.environ.get("HASHED_FEATURES", 2 ** 18))
+
+# Sparse vector: sorted bucket indices and their values
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+
+class HashedFeatureSpace:
+    """
+    Hashed term vectors plus incrementally maintained document frequencies.
+
+    Args:
+        n_features: Number of hash buckets (rounded up to a power of two)
+    """
+
+    def __init__(self, n_features: int = HASHED_FEATURES):
+        self.n_features = 1 << max(int(n_features) - 1, 1).bit_length()
+        self.doc_freq = np.zeros(self.n_features, dtype=np.int32)
+        self.num_docs = 0
+        self._lock = threading.Lock()
+
+    def term_counts(self, text: str) -> SparseVector:
+        """
+        Hash the terms of a text into signed bucket counts
+
+        Args:
+            text: Input text
+
+        Returns:
+            (indices, counts) with sorted, unique indices
+        """
+        mask = self.n_features - 1
+        buckets = []
+        signs = []
+        for term in tokenize(text or ''):
+            # crc32 is stable across processes, unlike hash()
+            code = zlib.crc32(term.encode('utf-8'))
+            buckets.append(code & mask)
+            signs.append(-1.0 if code & 0x80000000 else 1.0)
+        if not buckets:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices, inverse = np.unique(np.array(buckets, dtype=np.int64), return_inverse=True)
+        counts = np.zeros(len(indices), dtype=np.float32)
+        np.add.at(counts, inverse, signs)
+        return indices, counts
+
+    def add_documents(self, texts: Iterable[str]) -> None:
+        """Count texts (e.g. new postings) into the document frequencies"""
+        self._update(texts, 1)
+
+    def remove_documents(self, texts: Iterable[str]) -> None:
+        """Discount texts (e.g. deleted postings) from the document frequencies"""
+        self._update(texts, -1)
+
+    def _update(self, texts: Iterable[str], delta: int) -> None:
+        vectors = [self.term_counts(text)[0] for text in texts]
+        with self._lock:
+            for indices in vectors:
+                self.doc_freq[indices] += delta
+            self.num_docs += delta * len(vectors)
+
+    def tfidf(self, vector: SparseVector) -> SparseVector:
+        """
+        Weight signed term counts by smoothed IDF and L2-normalize
+
+        Args:
+            vector: Output of term_counts
+
+        Returns:
+            Normalized (indices, weights)
+        """
+        indices, counts = vector
+        if not len(indices):
+            return vector
+        idf = np.log((1 + self.num_docs) / (1 + self.doc_freq[indices])) + 1
+        weights = counts * idf.astype(np.float32)
+        norm = float(np.linalg.norm(weights))
+        return indices, (weights / norm if norm else weights)
+
+    def cosine(self, a: SparseVector, b: SparseVector) -> float:
+        """Cosine similarity of two TF-IDF weighted vectors (0-1)"""
+        _, left, right = np.intersect1d(a[0], b[0], assume_unique=True, return_indices=True)
+        if not len(left):
+            return 0.0
+        return max(0.0, float(np.dot(a[1][left], b[1][right])))
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """
+        Hashed TF-IDF cosine similarity of two texts
+
+        Returns:
+            Similarity score (0-100)
+        """
+        return self.cosine(self.tfidf(self.term_counts(text1)),
+                           self.tfidf(self.term_counts(text2))) * 100
+
+
+# Shared feature space; job_recommender feeds it the catalog's postings
+FEATURE_SPACE = HashedFeatureSpace()
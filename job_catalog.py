@@ -0,0 +1,363 @@
+"""
+Hot-reloadable job catalog with incremental index deltas
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models import JobPosting
+from skill_index import SkillIndex
+from job_filters import JobFilterIndex
+from keyword_index import KeywordIndex
+from dedup import DEDUP_ENABLED, DuplicateIndex
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+REQUIRED_POSTING_FIELDS = ('id', 'title', 'description', 'required_skills')
+
+# Fraction of dead or appended positions that makes compaction worthwhile
+COMPACTION_THRESHOLD = 0.2
+
+
+def validate_posting(job: Any) -> JobPosting:
+    """
+    Check a job posting has the fields the indexes rely on
+
+    Args:
+        job: JobPosting or job posting dictionary
+
+    Returns:
+        The posting as a JobPosting record
+
+    Raises:
+        ValueError: If a required field is missing or malformed
+    """
+    if isinstance(job, JobPosting):
+        return job
+    if not isinstance(job, dict):
+        raise ValueError("Job posting must be an object")
+    missing = [field for field in REQUIRED_POSTING_FIELDS if field not in job]
+    if missing:
+        raise ValueError(f"Job posting is missing fields: {', '.join(missing)}")
+    if not isinstance(job['required_skills'], list):
+        raise ValueError(f"Job {job['id']}: required_skills must be a list")
+    return JobPosting.from_dict(job)
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the catalog and its indexes.
+
+    A request takes one snapshot and uses it throughout, so a concurrent
+    reload never changes the data under it. Positions are stable for the
+    life of a snapshot; deleted and replaced postings stay in the indexes
+    but are masked out by ``live``. When deduplication is on, one posting
+    per near-duplicate cluster is offered for scoring: the earliest one that
+    matches the request's filters, so a filtered search still finds a repost
+    whose cluster's canonical copy is filtered out (e.g. in another city).
+    """
+
+    def __init__(self, postings: List[Optional[JobPosting]], skill_index: SkillIndex,
+                 filter_index: JobFilterIndex, keyword_index: KeywordIndex, live: np.ndarray,
+                 positions_by_id: Dict[Any, int], derived: Dict[int, Dict],
+                 version: int, base_size: int, clusters: Optional[Dict[str, np.ndarray]] = None):
+        self.postings = postings
+        self.skill_index = skill_index
+        self.filter_index = filter_index
+        self.keyword_index = keyword_index
+        self.live = live
+        self.positions_by_id = positions_by_id
+        self.derived = derived
+        self.version = version
+        self.base_size = base_size
+        self.num_live = int(live.sum())
+        self.clusters = clusters
+        # Positions offered for scoring: live, and canonical within their cluster
+        self.scorable = clusters['canonical'] if clusters is not None else live
+        # None means every position qualifies, which lets callers skip masking
+        self._live_positions = None if int(self.scorable.sum()) == len(postings) else \
+            np.flatnonzero(self.scorable).astype(np.int32)
+
+    def __len__(self):
+        return self.num_live
+
+    @property
+    def delta_ratio(self) -> float:
+        """Share of positions that compaction would remove or fold in"""
+        total = len(self.postings)
+        if not total:
+            return 0.0
+        return ((total - self.num_live) + (total - self.base_size)) / total
+
+    def get(self, job_id: Any) -> Optional[JobPosting]:
+        """Return the live posting with a given id"""
+        position = self.positions_by_id.get(job_id)
+        return self.postings[position] if position is not None else None
+
+    def jobs(self) -> List[JobPosting]:
+        """Return all live postings in position order"""
+        return [job for job in self.postings if job is not None]
+
+    def candidate_positions(self, filters: Optional[Dict] = None) -> Optional[np.ndarray]:
+        """
+        Return the live positions matching the filters
+
+        Args:
+            filters: Request filters understood by JobFilterIndex
+
+        Returns:
+            Sorted positions, or None when every position qualifies
+        """
+        positions = self.filter_index.matching_positions(filters)
+        if positions is None:
+            return self._live_positions
+        if self._live_positions is None:
+            return positions
+        positions = positions[self.live[positions]]
+        if self.clusters is None or not len(positions):
+            return positions
+        # Collapse clusters among the matching postings only; positions are
+        # sorted, so the first match of each cluster is its earliest member
+        _, first = np.unique(self.clusters['root'][positions], return_index=True)
+        return positions[np.sort(first)]
+
+    def cluster_info(self, position: int) -> Tuple[Any, int]:
+        """
+        Return the near-duplicate cluster of a posting
+
+        Returns:
+            (cluster id, number of other live postings in the cluster); the
+            cluster id is the job id of the cluster's canonical posting
+        """
+        if self.clusters is None:
+            return self.postings[position].id, 0
+        canonical = self.postings[self.clusters['canonical_of'][position]]
+        return (canonical.id if canonical is not None else self.postings[position].id,
+                int(self.clusters['similar_count'][position]))
+
+    def derived_value(self, position: int, key: str, compute: Callable[[JobPosting], Any]) -> Any:
+        """
+        Return per-job derived state (e.g. extracted keywords), computing it once
+
+        Derived values are carried across deltas and compaction, so a posting
+        is only processed again when it is added or updated.
+        """
+        values = self.derived.setdefault(position, {})
+        if key not in values:
+            values[key] = compute(self.postings[position])
+        return values[key]
+
+
+class JobCatalog:
+    """
+    Owns the current CatalogSnapshot and applies changes to it.
+
+    Adds, updates and deletes are applied as deltas: new postings are appended
+    to copies of only the affected posting lists and bitmaps, removed ones are
+    masked out. The new snapshot is then swapped in with a single reference
+    assignment, so readers never block. Compaction periodically rebuilds the
+    indexes from live postings to drop masked positions.
+    """
+
+    def __init__(self, job_postings: List[Any],
+                 seniority_fn: Callable[[JobPosting], str],
+                 industry_fn: Callable[[JobPosting], str],
+                 dedup: bool = DEDUP_ENABLED):
+        self.seniority_fn = seniority_fn
+        self.industry_fn = industry_fn
+        self.dedup = dedup
+        # Near-duplicate clusters; grows with every delta, rebuilt on compaction
+        self._duplicates: Optional[DuplicateIndex] = None
+        self._write_lock = threading.Lock()
+        self._compaction_thread = None
+        self._listeners: List[Callable[[List[JobPosting], List[JobPosting]], None]] = []
+        self._snapshot = self._build([validate_posting(job) for job in job_postings], {}, 0)
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """The current catalog snapshot"""
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[List[JobPosting], List[JobPosting]], None]) -> None:
+        """
+        Register a callback for incrementally maintained state outside the snapshot
+
+        The listener is called as listener(added, removed) after each delta is
+        published; updated postings appear in both lists.
+        """
+        self._listeners.append(listener)
+
+    def _build(self, postings: List[JobPosting], derived: Dict[int, Dict], version: int) -> CatalogSnapshot:
+        """Build a snapshot and its indexes from scratch"""
+        live = np.ones(len(postings), dtype=bool)
+        clusters = None
+        if self.dedup:
+            self._duplicates = DuplicateIndex(postings)
+            clusters = self._duplicates.clusters(live)
+        return CatalogSnapshot(
+            postings=list(postings),
+            skill_index=SkillIndex(postings),
+            filter_index=JobFilterIndex(postings, self.seniority_fn, self.industry_fn),
+            keyword_index=KeywordIndex(postings),
+            live=live,
+            positions_by_id={job.id: position for position, job in enumerate(postings)},
+            derived=derived,
+            version=version,
+            base_size=len(postings),
+            clusters=clusters,
+        )
+
+    def apply_changes(self, adds: Iterable[Any] = (), updates: Iterable[Any] = (),
+                      deletes: Iterable[Any] = ()) -> CatalogSnapshot:
+        """
+        Apply adds, updates and deletes as a delta and publish the result
+
+        Args:
+            adds: New job postings (an existing id is treated as an update)
+            updates: Replacement postings, matched by id
+            deletes: Ids of postings to remove
+
+        Returns:
+            The newly published snapshot
+
+        Raises:
+            ValueError: If a posting is malformed
+        """
+        changed = [validate_posting(job) for job in list(adds) + list(updates)]
+        deletes = list(deletes)
+
+        with self._write_lock:
+            current = self._snapshot
+            live = current.live.copy()
+            positions_by_id = dict(current.positions_by_id)
+
+            # Updates mask the old position and append the new version
+            removed = []
+            for job_id in deletes + [job.id for job in changed]:
+                position = positions_by_id.pop(job_id, None)
+                if position is not None:
+                    live[position] = False
+                    removed.append(position)
+
+            # Later changes to the same id win
+            latest = {job.id: job for job in changed}
+            new_postings = list(latest.values())
+            start = len(current.postings)
+            for offset, job in enumerate(new_postings):
+                positions_by_id[job.id] = start + offset
+
+            postings = [job if live[position] else None
+                        for position, job in enumerate(current.postings)] + new_postings
+            live = np.concatenate([live, np.ones(len(new_postings), dtype=bool)])
+            clusters = None
+            if self._duplicates is not None:
+                self._duplicates.add(new_postings, live)
+                clusters = self._duplicates.clusters(live)
+            snapshot = CatalogSnapshot(
+                postings=postings,
+                skill_index=current.skill_index.extended(new_postings) if new_postings else current.skill_index,
+                filter_index=current.filter_index.extended(new_postings) if new_postings else current.filter_index,
+                keyword_index=current.keyword_index.extended(new_postings, removed)
+                if new_postings or removed else current.keyword_index,
+                live=live,
+                positions_by_id=positions_by_id,
+                derived={position: values for position, values in current.derived.items()
+                         if live[position]},
+                version=current.version + 1,
+                base_size=current.base_size,
+                clusters=clusters,
+            )
+            self._snapshot = snapshot
+
+        removed_postings = [current.postings[position] for position in removed]
+        for listener in self._listeners:
+            try:
+                listener(new_postings, removed_postings)
+            except Exception as e:
+                logger.error(f"Error in catalog listener: {str(e)}")
+
+        logger.info(f"Catalog v{snapshot.version}: {len(new_postings)} added/updated, "
+                    f"{len(deletes)} deleted, {len(snapshot)} live jobs")
+        return snapshot
+
+    def reload(self, job_postings: List[Any]) -> CatalogSnapshot:
+        """
+        Replace the catalog contents, applying only the difference as a delta
+
+        Args:
+            job_postings: The complete new list of job postings
+
+        Returns:
+            The newly published snapshot
+        """
+        incoming = {job.id: job for job in map(validate_posting, job_postings)}
+        current = self._snapshot
+        adds, updates = [], []
+        for job_id, job in incoming.items():
+            existing = current.get(job_id)
+            if existing is None:
+                adds.append(job)
+            elif existing != job:
+                updates.append(job)
+        deletes = [job_id for job_id in current.positions_by_id if job_id not in incoming]
+        if not (adds or updates or deletes):
+            return current
+        return self.apply_changes(adds=adds, updates=updates, deletes=deletes)
+
+    def reload_from_file(self, path: str) -> CatalogSnapshot:
+        """Reload the catalog from a JSON file holding a list of job postings"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.reload(json.load(f))
+
+    def compact(self, force: bool = False) -> CatalogSnapshot:
+        """
+        Fold accumulated deltas into freshly built indexes
+
+        Args:
+            force: Compact even if the delta ratio is below the threshold
+
+        Returns:
+            The current snapshot after compaction
+        """
+        with self._write_lock:
+            current = self._snapshot
+            if not force and current.delta_ratio < COMPACTION_THRESHOLD:
+                return current
+
+            started = time.perf_counter()
+            postings, derived = [], {}
+            for position, job in enumerate(current.postings):
+                if job is None:
+                    continue
+                if position in current.derived:
+                    derived[len(postings)] = current.derived[position]
+                postings.append(job)
+
+            snapshot = self._build(postings, derived, current.version + 1)
+            self._snapshot = snapshot
+
+        logger.info(f"Compacted catalog to {len(postings)} jobs in "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return snapshot
+
+    def start_compaction_thread(self, interval: float = 300) -> None:
+        """Compact the catalog in a background thread every ``interval`` seconds"""
+        if self._compaction_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Error compacting job catalog: {str(e)}")
+
+        self._compaction_thread = threading.Thread(target=run, name='catalog-compaction', daemon=True)
+        self._compaction_thread.start()
@@ -0,0 +1,186 @@
+"""
+Bitmap indexes over the job catalog for structured pre-filtering
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models import JobPosting
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Filter names accepted by JobFilterIndex.matching_positions
+FILTER_FIELDS = ('location', 'remote', 'seniority', 'industry')
+
+SENIORITY_LEVELS = ["Entry-level", "Mid-level", "Senior"]
+
+
+def is_remote_friendly(job: JobPosting) -> bool:
+    """Check whether a job posting allows remote work"""
+    if job.remote is not None:
+        return job.remote
+    text = f"{job.location} {job.description}".lower()
+    return 'remote' in text
+
+
+def location_keys(location: str) -> List[str]:
+    """
+    Split a location into the lookup keys it can be filtered by
+
+    "San Francisco, CA" is indexed under "san francisco, ca",
+    "san francisco" and "ca".
+
+    Args:
+        location: Location string from a job posting or a filter
+
+    Returns:
+        List of lowercase keys
+    """
+    location = (location or '').strip().lower()
+    if not location:
+        return []
+    keys = [location]
+    for part in location.split(','):
+        part = part.strip()
+        if part and part not in keys:
+            keys.append(part)
+    return keys
+
+
+class BitmapIndex:
+    """
+    Maps each value of one field to a packed bitmap over job positions
+    """
+
+    def __init__(self, num_jobs: int, values_by_position: Iterable[Iterable[str]]):
+        positions_by_value: Dict[str, List[int]] = {}
+        for position, values in enumerate(values_by_position):
+            for value in values:
+                positions_by_value.setdefault(value, []).append(position)
+
+        self.num_jobs = num_jobs
+        self.bitmaps = {}
+        for value, positions in positions_by_value.items():
+            bits = np.zeros(num_jobs, dtype=bool)
+            bits[positions] = True
+            self.bitmaps[value] = np.packbits(bits)
+
+    def extended(self, num_jobs: int, start: int,
+                 values_by_position: Iterable[Iterable[str]]) -> 'BitmapIndex':
+        """
+        Return a copy of the index with positions from ``start`` onwards added.
+
+        Bitmaps of values that do not occur in the new positions are shared
+        as-is; they may be shorter than ``num_jobs`` and are zero-padded on lookup.
+        """
+        index = BitmapIndex.__new__(BitmapIndex)
+        index.num_jobs = num_jobs
+        index.bitmaps = dict(self.bitmaps)
+
+        positions_by_value: Dict[str, List[int]] = {}
+        for position, values in enumerate(values_by_position, start):
+            for value in values:
+                positions_by_value.setdefault(value, []).append(position)
+
+        for value, positions in positions_by_value.items():
+            bits = np.zeros(num_jobs, dtype=bool)
+            old = self.bitmaps.get(value)
+            if old is not None:
+                old_bits = np.unpackbits(old)[:num_jobs]
+                bits[:len(old_bits)] = old_bits
+            bits[positions] = True
+            index.bitmaps[value] = np.packbits(bits)
+        return index
+
+    def empty(self) -> np.ndarray:
+        """Return a bitmap with no bits set"""
+        return np.zeros((self.num_jobs + 7) // 8, dtype=np.uint8)
+
+    def lookup(self, values: Iterable[str]) -> np.ndarray:
+        """Return the bitmap of jobs having any of the values"""
+        result = self.empty()
+        for value in values:
+            bitmap = self.bitmaps.get(value)
+            if bitmap is not None:
+                result[:len(bitmap)] |= bitmap
+        return result
+
+
+class JobFilterIndex:
+    """
+    Precomputed bitmap indexes for location, remote, seniority and industry filters.
+
+    Filters on different fields are intersected; several values for the same
+    field (e.g. two locations) are unioned. The result is the set of job
+    positions that text scoring should be restricted to.
+    """
+
+    def __init__(self, job_postings: List[JobPosting],
+                 seniority_fn: Callable[[JobPosting], str],
+                 industry_fn: Callable[[JobPosting], str]):
+        num_jobs = len(job_postings)
+        self.num_jobs = num_jobs
+        self.seniority_fn = seniority_fn
+        self.industry_fn = industry_fn
+        self.indexes = {field: BitmapIndex(num_jobs, values)
+                        for field, values in self._field_values(job_postings).items()}
+
+    def _field_values(self, job_postings: List[JobPosting]) -> Dict[str, List[List[str]]]:
+        """Compute the indexed values of every filter field for each job"""
+        return {
+            'location': [location_keys(job.location) for job in job_postings],
+            'remote': [['remote'] if is_remote_friendly(job) else [] for job in job_postings],
+            'seniority': [[self.seniority_fn(job).lower()] for job in job_postings],
+            'industry': [[self.industry_fn(job).lower()] for job in job_postings],
+        }
+
+    def extended(self, new_postings: List[JobPosting]) -> 'JobFilterIndex':
+        """Return a copy of the index with jobs appended after the existing positions"""
+        index = JobFilterIndex.__new__(JobFilterIndex)
+        index.num_jobs = self.num_jobs + len(new_postings)
+        index.seniority_fn = self.seniority_fn
+        index.industry_fn = self.industry_fn
+        index.indexes = {field: self.indexes[field].extended(index.num_jobs, self.num_jobs, values)
+                         for field, values in self._field_values(new_postings).items()}
+        return index
+
+    def matching_positions(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Intersect the bitmaps selected by a set of request filters
+
+        Args:
+            filters: Mapping of filter name to a value or list of values.
+                     ``remote`` takes a boolean. Empty values are ignored.
+
+        Returns:
+            Sorted array of matching job positions, or None if no filter applies
+        """
+        if not filters:
+            return None
+
+        bitmaps = []
+        for field in FILTER_FIELDS:
+            value = filters.get(field)
+            if not value:
+                continue
+            if field == 'remote':
+                keys = ['remote']
+            else:
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                if field == 'location':
+                    # Match on the most specific key of each requested location
+                    keys = [location_keys(v)[0] for v in values if location_keys(v)]
+                else:
+                    keys = [str(v).strip().lower() for v in values]
+            bitmaps.append(self.indexes[field].lookup(keys))
+
+        if not bitmaps:
+            return None
+
+        combined = np.bitwise_and.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0]
+        positions = np.flatnonzero(np.unpackbits(combined, count=self.num_jobs)).astype(np.int32)
+        logger.debug(f"Filters {filters} matched {len(positions)} of {self.num_jobs} jobs")
+        return positions
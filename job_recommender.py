@@ -1,11 +1,20 @@
+import datetime
 import logging
+import os
 import random
 import re
-from collections import Counter
+from array import array
 import numpy as np
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
+from bert_integration import BERT_AVAILABLE, job_semantic_similarities, track_job_catalog
+from hashed_features import FEATURE_SPACE
+from job_catalog import JobCatalog
+from models import Insights, JobMatch, Recommendations, Resume
+from ranking_cascade import CascadeStage, RankingCascade, RunningMean, parse_stage_config
+from result_store import RankedResults
+from text_classifier import INDUSTRY_CLASSIFIER, SENIORITY_CLASSIFIER
 
 # Define variables to track availability
 SPACY_AVAILABLE = False
@@ -40,6 +49,32 @@ except LookupError:
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Lexical similarity backend: "tfidf" (fitted per pair), "hashed" (streaming,
+# vocabulary-free hashed TF-IDF) or "jaccard"
+LEXICAL_SCORING_MODE = os.environ.get("LEXICAL_SCORING_MODE", "tfidf").lower()
+
+# Ranking: "standard" scores every job that can still reach the top K;
+# "cascade" prunes through skill -> lexical -> BERT -> blend stages, each
+# configured as name:max_candidates:max_latency_ms
+RANKING_MODE = os.environ.get("RANKING_MODE", "standard").lower()
+RANKING_CASCADE_STAGES = os.environ.get(
+    "RANKING_CASCADE_STAGES", "skill:2000,lexical:100:50,semantic:20:200,blend")
+# Positions scored between latency budget checks, per stage
+CASCADE_CHUNK_SIZES = {'skill': None, 'lexical': 64, 'semantic': 32, 'blend': None}
+
+def build_ranking_cascade(config):
+    """Build a RankingCascade from a stage list string"""
+    stages = []
+    for name, max_candidates, max_latency_ms in parse_stage_config(config):
+        if name not in CASCADE_CHUNK_SIZES:
+            raise ValueError(f"Unknown cascade stage: {name}")
+        stages.append(CascadeStage(name, max_candidates, max_latency_ms, CASCADE_CHUNK_SIZES[name]))
+    return RankingCascade(stages)
+
+RANKING_CASCADE = build_ranking_cascade(RANKING_CASCADE_STAGES)
+# Mean semantic score of ranked jobs, standing in for it before a stage has measured it
+CASCADE_SEMANTIC_MEAN = RunningMean()
+
 # Load spaCy model for NLP processing (this is our BERT-like model)
 BERT_LIKE_AVAILABLE = False
 nlp = None  # Initialize to avoid unbound variable error
@@ -203,8 +238,16 @@ def calculate_semantic_similarity(text1, text2):
     if not text1 or not text2:
         return 0
     
+    # Hashed TF-IDF against the catalog's streaming document frequencies
+    if LEXICAL_SCORING_MODE == 'hashed':
+        try:
+            return FEATURE_SPACE.similarity(text1, text2)
+        except Exception as e:
+            logger.error(f"Error calculating semantic similarity with hashed features: {str(e)}")
+            # Fall back to the other methods
+    
     # Use scikit-learn if available (better quality)
-    if TF_IDF_AVAILABLE:
+    if TF_IDF_AVAILABLE and LEXICAL_SCORING_MODE != 'jaccard':
         try:
             # Create TF-IDF vectorizer
             vectorizer = TfidfVectorizer(stop_words='english')
@@ -273,29 +316,27 @@ def calculate_skill_match(resume_skills, job_skills):
 
 def get_experience_level(resume_data):
     """Estimate experience level from resume data"""
-    experience = resume_data.get('experience', [])
+    experience = Resume.coerce(resume_data).experience
     
     # Count total years of experience (simplified)
     total_years = 0
+    has_dates = False
+    current_year = datetime.datetime.now().year
     for job in experience:
-        date_range = job.get('date', '')
+        date_range = job.date
         # Look for year ranges like "2018 - 2021" or "2018 - Present"
         years = re.findall(r'20\d\d', date_range)
         if len(years) >= 2:
-            try:
-                start_year = int(years[0])
-                end_year = int(years[1])
-                total_years += (end_year - start_year)
-            except (ValueError, IndexError):
-                pass
+            has_dates = True
+            total_years += int(years[1]) - int(years[0])
         elif len(years) == 1 and 'present' in date_range.lower():
-            try:
-                import datetime
-                start_year = int(years[0])
-                current_year = datetime.datetime.now().year
-                total_years += (current_year - start_year)
-            except (ValueError, IndexError):
-                pass
+            has_dates = True
+            total_years += current_year - int(years[0])
+    
+    # Without usable dates, fall back to seniority signals in job titles
+    if not has_dates:
+        titles = " ".join(job.title for job in experience)
+        return SENIORITY_CLASSIFIER.classify(titles, default="Entry-level")
     
     # Determine experience level
     if total_years < 2:
@@ -308,130 +349,249 @@ def get_experience_level(resume_data):
 def get_relevant_industry(resume_data):
     """Determine relevant industry based on resume content"""
     # Extract text from experience
-    experience_text = " ".join([job.get('description', '') + " " + job.get('title', '') 
-                              for job in resume_data.get('experience', [])])
+    experience_text = " ".join([job.description + " " + job.title
+                              for job in Resume.coerce(resume_data).experience])
     
-    # Define industry keywords
-    industry_keywords = {
-        "Technology": ["software", "tech", "IT", "information technology", "programming", "developer", "web"],
-        "Finance": ["finance", "banking", "investment", "financial", "accounting", "bank"],
-        "Healthcare": ["healthcare", "medical", "hospital", "clinical", "health", "patient"],
-        "Marketing": ["marketing", "advertising", "market research", "branding", "digital marketing"],
-        "Education": ["education", "teaching", "academic", "school", "university", "instructor"],
-        "Manufacturing": ["manufacturing", "production", "assembly", "factory", "industrial"],
-        "Retail": ["retail", "sales", "store", "customer service", "merchandising"]
-    }
+    # Single pass over the text with the compiled industry keywords
+    return INDUSTRY_CLASSIFIER.classify(experience_text)
+
+def get_job_seniority(job):
+    """Estimate the seniority level a job posting is hiring for"""
+    if job.experience_level:
+        return job.experience_level
+    return SENIORITY_CLASSIFIER.classify(job.title)
+
+def get_job_industry(job):
+    """Determine the industry of a job posting from its title and description"""
+    if job.industry:
+        return job.industry
+    return INDUSTRY_CLASSIFIER.classify(job.title + " " + job.description)
+
+# Live job catalog with its skill and filter indexes; reloadable without a restart
+JOB_CATALOG = JobCatalog(SAMPLE_JOB_POSTINGS, get_job_seniority, get_job_industry)
+# The job embedding store applies catalog deltas instead of re-encoding the catalog
+track_job_catalog(JOB_CATALOG)
+
+def build_job_text(job):
+    """Build the text used for semantic matching of a job posting"""
+    return job.title + " " + job.description + " " + " ".join(job.required_skills)
+
+def build_resume_text(resume):
+    """Build the text used for semantic matching of a resume"""
+    resume_text = ""
+    if resume.summary:
+        resume_text += resume.summary + " "
+        
+    # Add experience descriptions
+    for exp in resume.experience:
+        if exp.description:
+            resume_text += exp.description + " "
+        if exp.title:
+            resume_text += exp.title + " "
+            
+    # Add skills
+    return resume_text + " ".join(resume.skills)
+
+def update_lexical_statistics(added, removed):
+    """Keep hashed document frequencies in step with catalog deltas"""
+    FEATURE_SPACE.add_documents(build_job_text(job) for job in added)
+    FEATURE_SPACE.remove_documents(build_job_text(job) for job in removed)
+
+if LEXICAL_SCORING_MODE == 'hashed':
+    update_lexical_statistics(JOB_CATALOG.snapshot.jobs(), [])
+    JOB_CATALOG.add_listener(update_lexical_statistics)
+
+def build_job_match(catalog, position, resume_skills_lower, match_score, skill_match, semantic_score):
+    """Materialize the full match record of one ranked job (skill diff, keywords, cluster)"""
+    job = catalog.postings[position]
+    
+    # Calculate matching/missing skills
+    matching_skill_ids = array('I')
+    missing_skill_ids = array('I')
+    for skill_id, skill in zip(job.required_skill_ids, job.required_skills):
+        if skill.lower() in resume_skills_lower:
+            matching_skill_ids.append(skill_id)
+        else:
+            missing_skill_ids.append(skill_id)
     
-    # Count occurrences of industry keywords
-    industry_counts = Counter()
-    for industry, keywords in industry_keywords.items():
-        for keyword in keywords:
-            if keyword.lower() in experience_text.lower():
-                industry_counts[industry] += 1
+    # Distinctive keywords for this job, precomputed against the catalog IDF
+    job_keywords = catalog.keyword_index.keywords[position]
     
-    # Return the industry with the most hits, default to Technology
-    if industry_counts:
-        return industry_counts.most_common(1)[0][0]
-    return "Technology"
+    # Near-duplicates of this posting were left out of scoring; report them here
+    cluster_id, similar_count = catalog.cluster_info(position)
+    
+    # The match references the catalog posting instead of copying its fields
+    return JobMatch(
+        job=job,
+        match_score=match_score,
+        skill_match=skill_match,
+        semantic_score=semantic_score,
+        matching_skill_ids=matching_skill_ids,
+        missing_skill_ids=missing_skill_ids,
+        key_job_requirements=job_keywords,
+        cluster_id=cluster_id,
+        similar_count=similar_count
+    )
+
+def materialize_page(results, offset=0, limit=10, sort='match'):
+    """Build JobMatch records for one page of stored ranked results
+    
+    Jobs deleted from the catalog since the ranking was computed are skipped.
+    """
+    catalog = JOB_CATALOG.snapshot
+    matches = []
+    for index in results.page(offset, limit, sort).tolist():
+        position = catalog.positions_by_id.get(results.job_ids[index])
+        if position is None or catalog.postings[position] is None:
+            continue
+        matches.append(build_job_match(
+            catalog, position, results.resume_skills,
+            int(results.scores['match'][index]), int(results.scores['skill'][index]),
+            int(results.scores['semantic'][index])))
+    return matches
 
-def get_job_recommendations(resume_data):
-    """Get job recommendations based on parsed resume data with BERT-like semantic matching"""
+def get_job_recommendations(resume_data, top_k=5, filters=None, depth=None):
+    """Get job recommendations based on parsed resume data with BERT-like semantic matching
+    
+    resume_data may be a Resume record or a parse_resume-style dictionary.
+    filters optionally restricts the catalog by 'location', 'remote', 'seniority'
+    and 'industry' before any text scoring runs.
+    With depth, the top `depth` jobs are ranked and returned as compact
+    RankedResults in Recommendations.ranking; only the first top_k are
+    materialized as JobMatch records.
+    """
     try:
+        resume = Resume.coerce(resume_data)
+        rank_k = max(top_k, depth or 0)
+        
         # Extract skills from resume
-        resume_skills = resume_data.get('skills', [])
+        resume_skills = resume.skills
         
         # Prepare resume text for semantic matching
-        resume_text = ""
-        if resume_data.get('summary'):
-            resume_text += resume_data.get('summary') + " "
-            
-        # Add experience descriptions
-        for exp in resume_data.get('experience', []):
-            if exp.get('description'):
-                resume_text += exp.get('description') + " "
-            if exp.get('title'):
-                resume_text += exp.get('title') + " "
-                
-        # Add skills
-        resume_text += " ".join(resume_skills)
+        resume_text = build_resume_text(resume)
         
-        # Calculate match scores for each job
-        job_matches = []
-        for job in SAMPLE_JOB_POSTINGS:
-            # Traditional skill matching
-            skill_match = calculate_skill_match(resume_skills, job['required_skills'])
-            
-            # Semantic matching score
-            job_text = job['title'] + " " + job['description'] + " " + " ".join(job['required_skills'])
-            semantic_score = 0
-            
-            if BERT_LIKE_AVAILABLE:
-                semantic_score = calculate_semantic_similarity(resume_text, job_text)
-                
-            # Combined score (70% skill match, 30% semantic match)
-            if BERT_LIKE_AVAILABLE:
-                combined_score = (skill_match * 0.7) + (semantic_score * 0.3)
+        # One snapshot per request, so a concurrent catalog reload can't change it
+        catalog = JOB_CATALOG.snapshot
+        
+        # Structured pre-filters narrow the candidate jobs before scoring
+        candidates = catalog.candidate_positions(filters)
+        
+        # Skill match for every job in one pass over the inverted index
+        skill_scores = catalog.skill_index.skill_match_scores(resume_skills)
+        semantic_scores = {}
+        
+        # Hashed mode vectorizes the resume once; job term counts are cached per posting
+        resume_vector = None
+        if LEXICAL_SCORING_MODE == 'hashed':
+            resume_vector = FEATURE_SPACE.tfidf(FEATURE_SPACE.term_counts(resume_text))
+        
+        def score_job(position):
+            """Exact combined score (70% skill match, 30% semantic match)"""
+            if not BERT_LIKE_AVAILABLE:
+                return skill_scores[position]
+            if resume_vector is not None:
+                job_vector = catalog.derived_value(
+                    position, 'hashed_terms',
+                    lambda posting: FEATURE_SPACE.term_counts(build_job_text(posting)))
+                semantic_score = FEATURE_SPACE.cosine(resume_vector, FEATURE_SPACE.tfidf(job_vector)) * 100
             else:
-                combined_score = skill_match
+                semantic_score = calculate_semantic_similarity(
+                    resume_text, build_job_text(catalog.postings[position]))
+            semantic_scores[position] = semantic_score
+            return (skill_scores[position] * 0.7) + (semantic_score * 0.3)
+        
+        bert_scores = {}
+        if RANKING_MODE == 'cascade':
+            # Cheap stages prune the candidates before the expensive ones run
+            def semantic_stage(positions):
+                # Catalog jobs are scored from the shared job embedding store
+                similarities = job_semantic_similarities(
+                    resume, [catalog.postings[p] for p in positions])
+                if similarities is None:
+                    return blend_stage(positions)
+                bert_scores.update(zip(positions.tolist(), similarities.tolist()))
+                return skill_scores[positions] * 0.7 + similarities * 0.3
             
-            # Calculate matching/missing skills
-            matching_skills = [skill for skill in job['required_skills'] 
-                              if skill.lower() in [s.lower() for s in resume_skills]]
-            missing_skills = [skill for skill in job['required_skills'] 
-                             if skill.lower() not in [s.lower() for s in resume_skills]]
+            def semantic_estimate(positions):
+                """Semantic term for jobs no stage has scored yet: the mean of those scored"""
+                observed = list(bert_scores.values()) or list(semantic_scores.values())
+                if observed:
+                    return float(np.mean(observed))
+                # Nothing scored yet in this request: the mean of earlier
+                # requests, or else assume the semantic score tracks the skill score
+                return CASCADE_SEMANTIC_MEAN.value(skill_scores[positions])
             
-            # Extract important keywords for this job (BERT-like feature extraction)
-            job_keywords = extract_document_features(job_text)[:5] if BERT_LIKE_AVAILABLE else []
+            def skill_stage(positions):
+                if not BERT_LIKE_AVAILABLE and not BERT_AVAILABLE:
+                    return skill_scores[positions]
+                return skill_scores[positions] * 0.7 + semantic_estimate(positions) * 0.3
             
-            # Add job with match score to the list
-            job_matches.append({
-                'id': job['id'],
-                'title': job['title'],
-                'company': job['company'],
-                'location': job['location'],
-                'description': job['description'],
-                'match_score': round(combined_score),
-                'skill_match': skill_match,  # Original skill match score
-                'semantic_score': round(semantic_score) if BERT_LIKE_AVAILABLE else 0,  # Semantic match score
-                'matching_skills': matching_skills,
-                'missing_skills': missing_skills,
-                'key_job_requirements': job_keywords  # BERT-like extracted features
-            })
+            def blend_stage(positions):
+                # BERT scores replace lexical ones; jobs a stage skipped get the mean
+                measured = bert_scores or semantic_scores
+                if not measured and not BERT_LIKE_AVAILABLE:
+                    return skill_scores[positions]
+                estimates = np.broadcast_to(semantic_estimate(positions), len(positions)).tolist()
+                return np.array([skill_scores[p] * 0.7 + measured.get(p, estimate) * 0.3
+                                 for p, estimate in zip(positions.tolist(), estimates)])
+            
+            scorers = {'skill': skill_stage, 'blend': blend_stage}
+            if BERT_LIKE_AVAILABLE:
+                scorers['lexical'] = lambda positions: np.array([score_job(p) for p in positions.tolist()])
+            if BERT_AVAILABLE:
+                scorers['semantic'] = semantic_stage
+            top_jobs = RANKING_CASCADE.rank(
+                candidates if candidates is not None else np.arange(len(catalog.postings)),
+                rank_k, scorers)
+            CASCADE_SEMANTIC_MEAN.add(list(bert_scores.values()) or list(semantic_scores.values()))
+        else:
+            # Only jobs whose score upper bound can still reach the top K are fully scored
+            top_jobs = catalog.skill_index.top_k(
+                skill_scores, rank_k, score_job,
+                semantic_weight=0.3 if BERT_LIKE_AVAILABLE else 0,
+                candidates=candidates)
+        
+        resume_skills_lower = frozenset(s.lower() for s in resume_skills)
+        ranked = []
+        for position, combined_score in top_jobs:
+            semantic_score = bert_scores.get(position, semantic_scores.get(position, 0))
+            ranked.append((position, round(combined_score),
+                           int(skill_scores[position]),  # Original skill match score
+                           round(semantic_score) if BERT_LIKE_AVAILABLE or position in bert_scores else 0))
+        
+        # Full match records only for the first page
+        job_matches = [build_job_match(catalog, position, resume_skills_lower, match, skill, semantic)
+                       for position, match, skill, semantic in ranked[:top_k]]
         
-        # Sort by match score (descending)
-        job_matches.sort(key=lambda x: x['match_score'], reverse=True)
+        ranking = None
+        if depth:
+            positions, matches, skills, semantics = zip(*ranked) if ranked else ((), (), (), ())
+            ranking = RankedResults([catalog.postings[position].id for position in positions],
+                                    matches, skills, semantics, resume_skills_lower)
         
         # Add experience level and industry insights
-        experience_level = get_experience_level(resume_data)
-        relevant_industry = get_relevant_industry(resume_data)
+        experience_level = get_experience_level(resume)
+        relevant_industry = get_relevant_industry(resume)
         
-        # Get resume keywords using BERT-like extraction
-        resume_keywords = extract_document_features(resume_text)[:10] if BERT_LIKE_AVAILABLE else []
+        # Resume keywords scored against the same catalog IDF table
+        resume_keywords = catalog.keyword_index.extract(resume_text, 10)
         
         # Return top matches and insights
-        return {
-            'jobs': job_matches[:5],  # Return top 5 matches
-            'insights': {
-                'experience_level': experience_level,
-                'relevant_industry': relevant_industry,
-                'top_skills': resume_skills[:5] if resume_skills else [],
-                'skill_count': len(resume_skills),
-                'using_enhanced_matching': BERT_LIKE_AVAILABLE,
-                'extracted_keywords': resume_keywords
-            }
-        }
+        return Recommendations(
+            jobs=job_matches,  # Already limited to the top K matches
+            ranking=ranking,
+            filters={k: v for k, v in (filters or {}).items() if v},
+            insights=Insights(
+                experience_level=experience_level,
+                relevant_industry=relevant_industry,
+                top_skills=resume_skills[:5] if resume_skills else [],
+                skill_count=len(resume_skills),
+                using_enhanced_matching=BERT_LIKE_AVAILABLE,
+                extracted_keywords=resume_keywords
+            )
+        )
     
     except Exception as e:
         logger.error(f"Error generating job recommendations: {str(e)}")
         # Return empty results on error
-        return {
-            'jobs': [],
-            'insights': {
-                'experience_level': 'Unknown',
-                'relevant_industry': 'Unknown',
-                'top_skills': [],
-                'skill_count': 0,
-                'using_enhanced_matching': False,
-                'extracted_keywords': []
-            }
-        }
+        return Recommendations()
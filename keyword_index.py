@@ -0,0 +1,159 @@
+"""
+Corpus-IDF keyword extraction over the job catalog.
+
+Document frequencies are learned once over all postings and the top
+distinctive terms of every job are precomputed, so ``key_job_requirements``
+is a lookup at request time. Resume keywords are scored against the same
+IDF table in one vectorized pass.
+"""
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from models import JobPosting
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Common English words that never make useful keywords
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
+    'about', 'against', 'between', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'from', 'up', 'down', 'of', 'off', 'over',
+    'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when',
+    'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should',
+    'now', 'our', 'you', 'your', 'we', 'they', 'their', 'this', 'that',
+    'these', 'those', 'has', 'have', 'had', 'who', 'what', 'which', 'its',
+    # Job posting boilerplate
+    'experience', 'strong', 'working', 'familiar', 'looking', 'seeking', 'join',
+    'team', 'skills', 'knowledge', 'ability', 'role', 'responsible', 'years',
+})
+
+# Keywords precomputed per job
+JOB_KEYWORDS = 5
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase keyword candidates
+
+    Args:
+        text: Input text
+
+    Returns:
+        Words longer than two characters that are not stop words, in order
+    """
+    words = re.sub(r'[^\w\s]', ' ', text.lower()).split()
+    return [word for word in words if word not in STOP_WORDS and len(word) > 2]
+
+
+class KeywordIndex:
+    """
+    Catalog-wide document frequencies plus the top terms of every posting.
+
+    Positions match the catalog snapshot. Like the other catalog indexes it
+    is extended copy-on-write: ``extended`` returns a new index with updated
+    document frequencies, leaving the current one untouched for readers.
+    Keywords of existing postings are kept as computed until the next
+    compaction rebuilds the index.
+    """
+
+    def __init__(self, job_postings: Sequence[JobPosting], top_k: int = JOB_KEYWORDS):
+        self.top_k = top_k
+        self.vocabulary: Dict[str, int] = {}
+        self.doc_terms: List[np.ndarray] = []
+        self.num_docs = 0
+        doc_freq = self._add_documents(job_postings, np.zeros(0, dtype=np.int32))
+        self._set_doc_freq(doc_freq)
+        self.keywords: List[List[str]] = [self._top_terms(job) for job in job_postings]
+        logger.debug(f"Keyword index built over {self.num_docs} postings, {len(self.vocabulary)} terms")
+
+    def _add_documents(self, job_postings: Iterable[JobPosting], doc_freq: np.ndarray) -> np.ndarray:
+        """Register the distinct terms of each posting, returning updated document frequencies"""
+        vocabulary = self.vocabulary
+        for job in job_postings:
+            term_ids = np.array(sorted({vocabulary.setdefault(term, len(vocabulary))
+                                        for term in tokenize(job_text(job))}), dtype=np.int32)
+            self.doc_terms.append(term_ids)
+            self.num_docs += 1
+            if len(vocabulary) > len(doc_freq):
+                doc_freq = np.concatenate([doc_freq, np.zeros(len(vocabulary) - len(doc_freq), dtype=np.int32)])
+            doc_freq[term_ids] += 1
+        return doc_freq
+
+    def _set_doc_freq(self, doc_freq: np.ndarray) -> None:
+        """Store document frequencies and the smoothed IDF derived from them"""
+        self.doc_freq = doc_freq
+        self.idf = np.log((1 + self.num_docs) / (1 + doc_freq)) + 1
+        # IDF of a term no posting contains
+        self.unseen_idf = math.log(1 + self.num_docs) + 1
+
+    def _top_terms(self, job: JobPosting) -> List[str]:
+        """Highest TF-IDF terms of one posting"""
+        return self.extract(job_text(job), self.top_k)
+
+    def extract(self, text: str, max_keywords: int = 10) -> List[str]:
+        """
+        Rank the terms of a text by TF-IDF against the catalog
+
+        Args:
+            text: Resume or posting text
+            max_keywords: Number of keywords to return
+
+        Returns:
+            Keywords, most distinctive first (ties keep first-occurrence order)
+        """
+        words = tokenize(text)
+        if not words:
+            return []
+        terms = list(dict.fromkeys(words))
+        positions = {term: index for index, term in enumerate(terms)}
+        counts = np.bincount([positions[word] for word in words], minlength=len(terms))
+
+        vocabulary = self.vocabulary
+        ids = np.array([vocabulary.get(term, -1) for term in terms])
+        known = (ids >= 0) & (ids < len(self.idf))
+        idf = np.full(len(terms), self.unseen_idf)
+        idf[known] = self.idf[ids[known]]
+
+        order = np.argsort(-(counts * idf), kind='stable')[:max_keywords]
+        return [terms[index] for index in order]
+
+    def extended(self, new_postings: Sequence[JobPosting],
+                 removed_positions: Iterable[int] = ()) -> 'KeywordIndex':
+        """
+        Return a new index with postings appended and others discounted
+
+        Args:
+            new_postings: Postings appended at the end of the catalog
+            removed_positions: Positions deleted or replaced in this delta
+
+        Returns:
+            KeywordIndex sharing unchanged keyword lists with this one
+        """
+        index = KeywordIndex.__new__(KeywordIndex)
+        index.top_k = self.top_k
+        index.vocabulary = dict(self.vocabulary)
+        index.doc_terms = list(self.doc_terms)
+        index.num_docs = self.num_docs
+
+        doc_freq = self.doc_freq.copy()
+        for position in removed_positions:
+            doc_freq[index.doc_terms[position]] -= 1
+            index.num_docs -= 1
+        doc_freq = index._add_documents(new_postings, doc_freq)
+        index._set_doc_freq(doc_freq)
+        index.keywords = self.keywords + [index._top_terms(job) for job in new_postings]
+        return index
+
+
+def job_text(job: JobPosting) -> str:
+    """Text that keywords are extracted from for a posting"""
+    return job.title + " " + job.description + " " + " ".join(job.required_skills)
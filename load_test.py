@@ -0,0 +1,432 @@
+"""
+Load generator for the web app.
+
+Virtual users upload a synthetic resume (a configurable mix of PDF, DOCX
+and TXT), open the results page and ask the career assistant a few
+questions. Each concurrency level runs for a fixed time and reports
+throughput, latency percentiles and error rates per endpoint, while the
+server's resident memory (including child processes) is sampled.
+
+With --start-server, the app is started locally against the bundled
+mock OpenAI API (mock_openai.py), so runs are offline and repeatable:
+
+    python load_test.py --start-server --concurrency 1,4,16,32 --duration 30
+
+Against an already running server, pass --target and optionally
+--server-pid for memory sampling.
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mock_openai import MockSettings, start_mock_server
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Try to import python-docx for DOCX fixtures
+try:
+    import docx
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+    logger.warning("python-docx not available. DOCX resumes are replaced by TXT")
+
+DEFAULT_SERVER_CMD = (f"{shlex.quote(sys.executable)} -c "
+                      "\"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)\"")
+
+SKILL_POOL = ['Python', 'Java', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL', 'MongoDB',
+              'Docker', 'Kubernetes', 'AWS', 'Azure', 'Machine Learning', 'Pandas', 'TensorFlow',
+              'Git', 'Linux', 'REST', 'GraphQL', 'Agile', 'Scrum', 'Leadership', 'Communication']
+TITLES = ['Software Engineer', 'Data Scientist', 'Backend Developer', 'Frontend Developer',
+          'DevOps Engineer', 'Product Manager', 'Data Analyst', 'ML Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries']
+CHAT_QUERIES = ['How can I improve my resume?', 'Which skills should I learn next?',
+                'How do I prepare for a technical interview?', 'How should I negotiate salary?',
+                'What certifications would help my career?']
+
+
+def synthetic_resume_lines(rng: random.Random) -> List[str]:
+    """Plausible resume text with random skills and roles"""
+    first, last = rng.choice(['Alex', 'Sam', 'Priya', 'Chen', 'Maria']), rng.choice(['Smith', 'Rao', 'Garcia', 'Lee'])
+    skills = rng.sample(SKILL_POOL, rng.randint(4, 10))
+    lines = [f"{first} {last}", f"{first.lower()}.{last.lower()}@example.com", "+1 555 010 2030",
+             "San Francisco, USA", "", "Professional Summary",
+             f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience building "
+             f"products with {', '.join(skills[:3])}.", "", "Experience"]
+    year = 2024
+    for _ in range(rng.randint(1, 4)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} Jan {start} - Dec {year}")
+        lines.extend(f"- Delivered {rng.choice(skills)} work that improved {rng.choice(['latency', 'revenue', 'reliability'])}"
+                     for _ in range(rng.randint(2, 4)))
+        year = start
+    lines += ["", "Skills", ', '.join(skills), "", "Education", "Bachelor of Science in Computer Science"]
+    return lines
+
+
+def write_txt(path: str, lines: Sequence[str]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_docx(path: str, lines: Sequence[str]) -> None:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def write_pdf(path: str, lines: Sequence[str]) -> None:
+    """Write a single-page PDF with one text line per row (Helvetica)"""
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    content = "BT /F1 10 Tf 13 TL 50 770 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    data += b"".join(f"{offset:010d} 00000 n \n".encode('latin-1') for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse a format mix such as "pdf=0.3,docx=0.3,txt=0.4\""""
+    weights = {}
+    for entry in filter(None, (part.strip() for part in mix.split(','))):
+        name, _, weight = entry.partition('=')
+        if name not in ('pdf', 'docx', 'txt'):
+            raise ValueError(f"Unknown resume format: {name}")
+        weights[name] = float(weight or 1)
+    if not DOCX_AVAILABLE and 'docx' in weights:
+        weights['txt'] = weights.get('txt', 0) + weights.pop('docx')
+    return weights
+
+
+def build_corpus(directory: str, count: int, mix: Dict[str, float], seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Write synthetic resumes in the requested format mix
+
+    Returns:
+        List of (path, extension)
+    """
+    rng = random.Random(seed)
+    writers = {'txt': write_txt, 'docx': write_docx, 'pdf': write_pdf}
+    formats, weights = zip(*mix.items())
+    corpus = []
+    for number in range(count):
+        extension = rng.choices(formats, weights)[0]
+        path = os.path.join(directory, f"resume-{number:04d}.{extension}")
+        writers[extension](path, synthetic_resume_lines(rng))
+        corpus.append((path, extension))
+    return corpus
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses, so each request is timed on its own"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class VirtualUser:
+    """One browser-like client with its own session cookie"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method: str, path: str, body: bytes = None,
+                headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers or {})
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            # Non-2xx responses, including the unfollowed redirects
+            return e.code, dict(e.headers), e.read()
+
+    def upload(self, path: str) -> bool:
+        boundary = uuid.uuid4().hex
+        with open(path, 'rb') as f:
+            content = f.read()
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"resume\"; "
+                f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/octet-stream\r\n\r\n"
+                ).encode('utf-8') + content + f"\r\n--{boundary}--\r\n".encode('utf-8')
+        status, headers, _ = self.request('POST', '/upload', body,
+                                          {'Content-Type': f"multipart/form-data; boundary={boundary}"})
+        # Success redirects to the results page; failures flash and redirect to the index
+        return status == 302 and headers.get('Location', '').rstrip('/').endswith('/results')
+
+    def results(self) -> bool:
+        status, _, _ = self.request('GET', '/results')
+        return status == 200
+
+    def chat(self, query: str) -> bool:
+        status, _, body = self.request('POST', '/api/chat', json.dumps({'query': query}).encode('utf-8'),
+                                       {'Content-Type': 'application/json'})
+        return status == 200 and bool(json.loads(body or b'{}').get('response'))
+
+
+class LevelStats:
+    """Latencies and errors per endpoint for one concurrency level"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed_ms)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + int(not ok)
+
+    def summary(self, seconds: float) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for endpoint, values in self.latencies.items():
+            values = sorted(values)
+            result[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': len(values) / seconds,
+                'error_rate': self.errors[endpoint] / len(values),
+                'p50_ms': percentile(values, 50),
+                'p90_ms': percentile(values, 90),
+                'p99_ms': percentile(values, 99),
+                'max_ms': values[-1],
+            }
+        return result
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    """Resident memory of a process and all its descendants in MB (Linux /proc)"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # The command name may contain spaces; fields after it are fixed
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+        pending.extend(children.get(current, []))
+    return total_kb / 1024
+
+
+class RssSampler:
+    """Samples the server's process-tree RSS in a background thread"""
+
+    def __init__(self, pid: Optional[int], interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Tuple[float, float]] = []
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = None
+
+    def start(self) -> 'RssSampler':
+        if self.pid is not None and os.path.isdir('/proc'):
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.samples.append((time.perf_counter() - self._started, process_tree_rss_mb(self.pid)))
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def run_level(base_url: str, corpus: Sequence[Tuple[str, str]], concurrency: int, duration: float,
+              chats_per_upload: int, timeout: float, seed: int = 0) -> Tuple[LevelStats, float]:
+    """
+    Drive the app with a number of concurrent virtual users for a fixed time
+
+    Returns:
+        (statistics, elapsed seconds)
+    """
+    stats = LevelStats()
+    deadline = time.perf_counter() + duration
+
+    def timed(endpoint, call, *args):
+        started = time.perf_counter()
+        try:
+            ok = call(*args)
+        except Exception as e:
+            logger.debug(f"{endpoint} failed: {str(e)}")
+            ok = False
+        stats.record(endpoint, (time.perf_counter() - started) * 1000, ok)
+        return ok
+
+    def user_loop(number):
+        rng = random.Random(seed * 1000 + number)
+        user = VirtualUser(base_url, timeout)
+        while time.perf_counter() < deadline:
+            path, _ = rng.choice(corpus)
+            if not timed('upload', user.upload, path):
+                continue
+            timed('results', user.results)
+            for _ in range(chats_per_upload):
+                if time.perf_counter() >= deadline:
+                    break
+                timed('chat', user.chat, rng.choice(CHAT_QUERIES))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user_loop, args=(number,), daemon=True) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def start_server(command: str, port: int, mock_url: str, startup_timeout: float = 120) -> subprocess.Popen:
+    """Start the app against the mock API and wait until it answers"""
+    env = dict(os.environ, OPENAI_BASE_URL=mock_url, OPENAI_API_KEY='mock')
+    process = subprocess.Popen(shlex.split(command.format(port=port)), env=env,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    deadline = time.perf_counter() + startup_timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2):
+                return process
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError("Server did not start in time")
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'users':>5} {'endpoint':<8} {'req':>6} {'rps':>7} {'err%':>6} "
+          f"{'p50':>7} {'p90':>7} {'p99':>7} {'max':>7} {'rss MB':>7}")
+    for level in report['levels']:
+        rss = f"{level['rss_peak_mb']:.0f}" if level['rss_peak_mb'] is not None else '-'
+        for endpoint, values in sorted(level['endpoints'].items()):
+            print(f"{level['concurrency']:>5} {endpoint:<8} {values['requests']:>6} "
+                  f"{values['throughput_rps']:>7.1f} {values['error_rate'] * 100:>6.1f} "
+                  f"{values['p50_ms']:>7.0f} {values['p90_ms']:>7.0f} {values['p99_ms']:>7.0f} "
+                  f"{values['max_ms']:>7.0f} {rss:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /upload, /results and /api/chat")
+    parser.add_argument('--target', default='http://127.0.0.1:5000', help="Base URL of a running server")
+    parser.add_argument('--server-pid', type=int, help="PID of the running server, for RSS sampling")
+    parser.add_argument('--start-server', action='store_true',
+                        help="Start the app locally against the mock OpenAI API")
+    parser.add_argument('--server-cmd', default=DEFAULT_SERVER_CMD,
+                        help="Command starting the app; {port} is substituted "
+                             "(e.g. \"gunicorn --bind 127.0.0.1:{port} --threads 8 main:app\")")
+    parser.add_argument('--port', type=int, default=5055, help="Port for --start-server")
+    parser.add_argument('--concurrency', default='1,4,16', help="Comma-separated concurrency levels")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds per concurrency level")
+    parser.add_argument('--mix', default='pdf=0.4,docx=0.4,txt=0.2', help="Resume format mix")
+    parser.add_argument('--corpus-size', type=int, default=50, help="Distinct synthetic resumes")
+    parser.add_argument('--chats-per-upload', type=int, default=2)
+    parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument('--mock-latency-ms', type=float, default=500)
+    parser.add_argument('--mock-jitter-ms', type=float, default=200)
+    parser.add_argument('--mock-error-rate', type=float, default=0.0)
+    parser.add_argument('--rss-interval', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the full report (including RSS samples) to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    mock = server = None
+    base_url, server_pid = args.target, args.server_pid
+    if args.start_server:
+        mock = start_mock_server(0, MockSettings(args.mock_latency_ms, args.mock_jitter_ms,
+                                                 error_rate=args.mock_error_rate))
+        server = start_server(args.server_cmd, args.port, f"http://127.0.0.1:{mock.server_port}/v1")
+        base_url, server_pid = f"http://127.0.0.1:{args.port}", server.pid
+
+    report = {'target': base_url, 'duration': args.duration, 'mix': args.mix, 'levels': []}
+    try:
+        with tempfile.TemporaryDirectory(prefix='load-test-') as directory:
+            corpus = build_corpus(directory, args.corpus_size, parse_mix(args.mix), args.seed)
+            for concurrency in levels:
+                logger.info(f"Running {concurrency} concurrent users for {args.duration:.0f} s")
+                sampler = RssSampler(server_pid, args.rss_interval).start()
+                stats, elapsed = run_level(base_url, corpus, concurrency, args.duration,
+                                           args.chats_per_upload, args.timeout, args.seed)
+                sampler.stop()
+                report['levels'].append({
+                    'concurrency': concurrency,
+                    'seconds': elapsed,
+                    'endpoints': stats.summary(elapsed),
+                    'rss_peak_mb': max((rss for _, rss in sampler.samples), default=None),
+                    'rss_samples': sampler.samples,
+                })
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if mock is not None:
+            mock.shutdown()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
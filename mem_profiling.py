@@ -0,0 +1,227 @@
+"""
+Opt-in per-request memory profiling with tracemalloc.
+
+A profiled request takes a tracemalloc snapshot before and after each
+pipeline stage (extraction, parse, recommend, session, chat) and records
+the stage's net retained memory and the call sites that allocated it.
+Results are aggregated per stage across requests and kept for the most
+recent requests, for the admin report.
+
+Tracing is started only while at least one profiled request is running,
+so requests that are not sampled pay nothing, and snapshots stay small
+because only allocations made since tracing started are tracked. With
+concurrent requests, allocations from other threads made during a stage
+are counted in it too; profile at low concurrency for exact attribution.
+Text extraction in sandboxed workers happens in another process and shows
+up only as the result's size.
+"""
+import linecache
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Profile every request ('on'), a sample of requests ('sample') or only on request ('off')
+MEMORY_PROFILING = os.environ.get("MEMORY_PROFILING", "off").lower()
+# Share of requests profiled in 'sample' mode
+MEMORY_PROFILE_SAMPLE_RATE = float(os.environ.get("MEMORY_PROFILE_SAMPLE_RATE", 0.01))
+# Stack frames kept per allocation; 1 is cheapest, more attributes library allocations to our callers
+MEMORY_PROFILE_FRAMES = int(os.environ.get("MEMORY_PROFILE_FRAMES", 1))
+# Call sites reported per stage
+MEMORY_PROFILE_TOP = int(os.environ.get("MEMORY_PROFILE_TOP", 10))
+# Request header that asks for a profile (its value must be the admin token)
+MEMORY_PROFILE_HEADER = 'X-Memory-Profile'
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _rss_kb() -> int:
+    """Resident memory of this process in KiB (0 where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * (os.sysconf('SC_PAGE_SIZE') // 1024)
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _site(stat: tracemalloc.StatisticDiff) -> str:
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class RequestProfile:
+    """
+    Memory measurements of one profiled request.
+
+    Args:
+        label: What was profiled, e.g. the request path
+        top: Call sites recorded per stage
+    """
+
+    def __init__(self, label: str, top: int = MEMORY_PROFILE_TOP):
+        self.label = label
+        self.top = top
+        self.started_at = time.time()
+        self.rss_before_kb = _rss_kb()
+        self.rss_after_kb = self.rss_before_kb
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the memory a block of code retains and where it allocated it"""
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        tracemalloc.reset_peak()
+        current_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            peak = tracemalloc.get_traced_memory()[1]
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            diffs = after.compare_to(before, 'traceback' if MEMORY_PROFILE_FRAMES > 1 else 'lineno')
+            self.stages.append({
+                'stage': name,
+                'net_bytes': sum(diff.size_diff for diff in diffs),
+                'peak_bytes': max(0, peak - current_before),
+                'ms': round(elapsed_ms, 1),
+                'top': [{'site': _site(diff),
+                         'stack': [f"{frame.filename}:{frame.lineno}" for frame in diff.traceback],
+                         'size_diff': diff.size_diff, 'count_diff': diff.count_diff}
+                        for diff in diffs[:self.top] if diff.size_diff],
+            })
+
+    def summary(self) -> str:
+        """Compact per-stage net retained memory, e.g. 'parse=+1.2MB;recommend=+0.3MB'"""
+        return ';'.join(f"{stage['stage']}={stage['net_bytes'] / 1048576:+.2f}MB" for stage in self.stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'rss_delta_kb': self.rss_after_kb - self.rss_before_kb,
+            'stages': self.stages,
+        }
+
+
+class MemoryProfiler:
+    """
+    Decides which requests are profiled and aggregates their reports.
+
+    Args:
+        mode: 'on', 'sample' or 'off' (header-requested profiles only)
+        sample_rate: Share of requests profiled in 'sample' mode
+        token: Value the profile request header must carry; without a
+            token the header is ignored
+        recent: Request reports kept for the admin report
+    """
+
+    def __init__(self, mode: str = MEMORY_PROFILING, sample_rate: float = MEMORY_PROFILE_SAMPLE_RATE,
+                 token: Optional[str] = None, recent: int = 50):
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.token = token
+        self._lock = threading.Lock()
+        self._active = 0
+        # Whether tracing was started here (and so is stopped here)
+        self._tracing = False
+        self._recent: deque = deque(maxlen=recent)
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._profiled = 0
+
+    def should_profile(self, header_value: Optional[str] = None) -> bool:
+        """Whether a request is profiled, given its profile header (if any)"""
+        if header_value is not None and self.token and header_value == self.token:
+            return True
+        if self.mode == 'on':
+            return True
+        return self.mode == 'sample' and random.random() < self.sample_rate
+
+    def begin(self, label: str) -> RequestProfile:
+        """Start profiling a request, starting tracemalloc if it is not running"""
+        with self._lock:
+            if self._active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, MEMORY_PROFILE_FRAMES))
+                self._tracing = True
+            self._active += 1
+        return RequestProfile(label)
+
+    def end(self, profile: RequestProfile) -> None:
+        """Finish a request's profile and add it to the aggregates"""
+        profile.rss_after_kb = _rss_kb()
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+            self._profiled += 1
+            self._recent.append(profile.to_dict())
+            for stage in profile.stages:
+                totals = self._stages.setdefault(stage['stage'], {
+                    'requests': 0, 'net_bytes': 0, 'max_net_bytes': 0, 'max_peak_bytes': 0,
+                    'total_ms': 0.0, 'sites': {}})
+                totals['requests'] += 1
+                totals['net_bytes'] += stage['net_bytes']
+                totals['max_net_bytes'] = max(totals['max_net_bytes'], stage['net_bytes'])
+                totals['max_peak_bytes'] = max(totals['max_peak_bytes'], stage['peak_bytes'])
+                totals['total_ms'] += stage['ms']
+                for site in stage['top']:
+                    site_totals = totals['sites'].setdefault(site['site'], [0, 0])
+                    site_totals[0] += site['size_diff']
+                    site_totals[1] += 1
+        logger.info(f"Memory profile of {profile.label}: {profile.summary()} "
+                    f"(RSS {profile.rss_after_kb - profile.rss_before_kb:+d} KiB)")
+
+    def report(self, recent: int = 10) -> Dict[str, Any]:
+        """Per-stage aggregates with the top call sites, plus recent request reports"""
+        with self._lock:
+            stages = {}
+            for name, totals in self._stages.items():
+                requests = totals['requests']
+                sites = sorted(totals['sites'].items(), key=lambda item: -item[1][0])
+                stages[name] = {
+                    'requests': requests,
+                    'avg_net_bytes': totals['net_bytes'] / requests,
+                    'max_net_bytes': totals['max_net_bytes'],
+                    'max_peak_bytes': totals['max_peak_bytes'],
+                    'avg_ms': totals['total_ms'] / requests,
+                    'top_sites': [{'site': site, 'total_size_diff': size, 'requests': seen}
+                                  for site, (size, seen) in sites[:MEMORY_PROFILE_TOP]],
+                }
+            return {
+                'mode': self.mode,
+                'sample_rate': self.sample_rate,
+                'profiled_requests': self._profiled,
+                'active': self._active,
+                'rss_kb': _rss_kb(),
+                'stages': stages,
+                'recent': list(self._recent)[-recent:] if recent > 0 else [],
+            }
+
+    def reset(self) -> None:
+        """Drop the aggregates and recent reports"""
+        with self._lock:
+            self._recent.clear()
+            self._stages.clear()
+            self._profiled = 0
+
+
+def profile_stage(profile: Optional[RequestProfile], name: str):
+    """Context manager measuring a stage of a profiled request; no-op otherwise"""
+    return profile.stage(name) if profile is not None else nullcontext()
@@ -0,0 +1,163 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests.
+
+Answers ``POST /v1/chat/completions`` with a well-formed completion after
+a configurable delay, and can inject errors. ``GET /v1/models`` answers
+at once, for health checks. Point the app at it with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8400/v1 OPENAI_API_KEY=mock python main.py
+
+Run standalone with ``python mock_openai.py --port 8400 --latency-ms 800``
+or start it in-process with ``start_mock_server``.
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_FILLER = ("Focus on the skills listed in the job description, build small projects that "
+           "show them, and quantify your results on your resume. ").split()
+
+
+class MockSettings:
+    """
+    Behaviour of the mock server.
+
+    Args:
+        latency_ms: Fixed delay before every response
+        jitter_ms: Extra uniformly random delay (0..jitter_ms)
+        per_token_ms: Additional delay per generated token, like streaming generation
+        error_rate: Share of requests answered with HTTP 500
+    """
+
+    def __init__(self, latency_ms: float = 500, jitter_ms: float = 200,
+                 per_token_ms: float = 0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_token_ms = per_token_ms
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+
+def completion(body: Dict[str, Any], request_number: int) -> Dict[str, Any]:
+    """Build a chat.completion response for a request body"""
+    max_tokens = int(body.get('max_tokens') or 150)
+    # Roughly 0.75 words per token, like English text
+    words = [_FILLER[i % len(_FILLER)] for i in range(max(1, int(max_tokens * 0.75)))]
+    prompt_tokens = sum(len(str(message.get('content', '')).split())
+                        for message in body.get('messages', [])) * 4 // 3
+    return {
+        'id': f"chatcmpl-mock-{request_number}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'mock'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': ' '.join(words)},
+            'finish_reason': 'stop',
+        }],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': max_tokens,
+                  'total_tokens': prompt_tokens + max_tokens},
+    }
+
+
+def _make_handler(settings: MockSettings):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if not self.path.rstrip('/').endswith('/models'):
+                self._send(404, {'error': {'message': f"Unknown path {self.path}", 'type': 'invalid_request_error'}})
+                return
+            self._send(200, {'object': 'list', 'data': [
+                {'id': 'gpt-4o', 'object': 'model', 'created': 0, 'owned_by': 'mock'}]})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {'error': {'message': 'Invalid JSON body', 'type': 'invalid_request_error'}})
+                return
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send(404, {'error': {'message': f"Unknown path {self.path}", 'type': 'invalid_request_error'}})
+                return
+
+            with settings.lock:
+                settings.requests += 1
+                number = settings.requests
+                failed = random.random() < settings.error_rate
+                settings.errors += int(failed)
+            delay = settings.latency_ms + random.uniform(0, settings.jitter_ms)
+            if not failed:
+                delay += settings.per_token_ms * int(body.get('max_tokens') or 150)
+            time.sleep(delay / 1000)
+
+            if failed:
+                self._send(500, {'error': {'message': 'Injected mock failure', 'type': 'server_error'}})
+            else:
+                self._send(200, completion(body, number))
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+
+def start_mock_server(port: int = 0, settings: MockSettings = None) -> ThreadingHTTPServer:
+    """
+    Serve the mock API from a background thread
+
+    Args:
+        port: Port to listen on (0 picks a free one; see server.server_port)
+        settings: Latency and error behaviour
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), _make_handler(settings or MockSettings()))
+    server.daemon_threads = True
+    server.settings = settings
+    threading.Thread(target=server.serve_forever, name='mock-openai', daemon=True).start()
+    logger.info(f"Mock OpenAI API listening on http://127.0.0.1:{server.server_port}/v1")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI chat completions API")
+    parser.add_argument('--port', type=int, default=8400)
+    parser.add_argument('--latency-ms', type=float, default=500)
+    parser.add_argument('--jitter-ms', type=float, default=200)
+    parser.add_argument('--per-token-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.port, MockSettings(args.latency_ms, args.jitter_ms,
+                                                       args.per_token_ms, args.error_rate))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
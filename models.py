@@ -1,50 +1,396 @@
-# This file is not being used in the current implementation
-# We're not using a database for this application, but keeping this
-# file to maintain the suggested structure
+"""
+Typed records passed through the resume parsing and job matching pipeline.
 
+Records use ``__slots__`` dataclasses so that large in-memory batches of
+candidates and postings avoid per-instance dict overhead. Skills are stored
+as arrays of ids into a process-wide intern table; names are resolved on
+access. Every record round-trips through a compact positional MessagePack
+encoding (see binary_codec) for the session and batch stores.
+"""
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from binary_codec import packb, unpackb
+
+# Bumped whenever the positional layout of a serialized record changes
+RECORD_FORMAT_VERSION = 3
+
+
+class SkillVocabulary:
+    """Process-wide intern table mapping skill names to small integer ids"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        """Return the id of a skill name, assigning a new one if needed"""
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(name)
+                if skill_id is None:
+                    skill_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = skill_id
+        return skill_id
+
+    def encode(self, names: Iterable[str]) -> array:
+        """Intern a list of skill names into an id array"""
+        return array('I', (self.intern(name) for name in names))
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Resolve an id array back to skill names"""
+        names = self._names
+        return [names[skill_id] for skill_id in ids]
+
+
+SKILLS = SkillVocabulary()
+
+
+@dataclass(slots=True)
+class Experience:
+    """One role from the experience section of a resume"""
+    title: str = ""
+    company: str = ""
+    date: str = ""
+    description: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the experience entry to a dictionary"""
+        return {'title': self.title, 'company': self.company,
+                'date': self.date, 'description': self.description}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Experience':
+        """Build an experience entry from a dictionary"""
+        description = data.get('description', '')
+        if isinstance(description, list):
+            description = '\n'.join(description)
+        return cls(data.get('title', ''), data.get('company', ''),
+                   data.get('date', ''), description)
+
+
+@dataclass(slots=True)
 class Resume:
-    """Class to represent a parsed resume"""
-    def __init__(self, name="", email="", phone="", skills=None, 
-                 education=None, work_experience=None, summary=""):
-        self.name = name
-        self.email = email
-        self.phone = phone
-        self.skills = skills or []
-        self.education = education or []
-        self.work_experience = work_experience or []
-        self.summary = summary
-    
-    def to_dict(self):
-        """Convert the resume object to a dictionary"""
+    """A parsed resume"""
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    linkedin: str = ""
+    github: str = ""
+    summary: str = ""
+    skill_ids: array = field(default_factory=lambda: array('I'))
+    experience: List[Experience] = field(default_factory=list)
+    total_experience: str = ""
+    degrees: List[str] = field(default_factory=list)
+    certifications: List[str] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
+    projects: List[str] = field(default_factory=list)
+    # Fields skipped or computed from partial input under a parsing time budget
+    degraded_fields: List[str] = field(default_factory=list)
+
+    @property
+    def skills(self) -> List[str]:
+        """Skill names in resume order"""
+        return SKILLS.decode(self.skill_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the resume to a JSON-serializable dictionary"""
         return {
             'name': self.name,
             'email': self.email,
             'phone': self.phone,
+            'location': self.location,
+            'linkedin': self.linkedin,
+            'github': self.github,
+            'summary': self.summary,
             'skills': self.skills,
-            'education': self.education,
-            'work_experience': self.work_experience,
-            'summary': self.summary
+            'experience': [exp.to_dict() for exp in self.experience],
+            'total_experience': self.total_experience,
+            'degrees': self.degrees,
+            'certifications': self.certifications,
+            'languages': self.languages,
+            'projects': self.projects,
+            'degraded_fields': self.degraded_fields
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Resume':
+        """Build a resume from a parse_resume-style dictionary"""
+        return cls(
+            name=data.get('name', ''),
+            email=data.get('email', ''),
+            phone=data.get('phone', ''),
+            location=data.get('location', ''),
+            linkedin=data.get('linkedin', ''),
+            github=data.get('github', ''),
+            summary=data.get('summary', '') or '',
+            skill_ids=SKILLS.encode(data.get('skills', [])),
+            experience=[Experience.from_dict(exp) for exp in data.get('experience', [])],
+            total_experience=data.get('total_experience', ''),
+            degrees=list(data.get('degrees', [])),
+            certifications=list(data.get('certifications', [])),
+            languages=list(data.get('languages', [])),
+            projects=list(data.get('projects', [])),
+            degraded_fields=list(data.get('degraded_fields', []))
+        )
+
+    @classmethod
+    def coerce(cls, data: Any) -> 'Resume':
+        """Accept either a Resume or a parse_resume-style dictionary"""
+        return data if isinstance(data, Resume) else cls.from_dict(data or {})
+
+    def to_tuple(self) -> list:
+        """Positional form used by the binary encoding"""
+        return [self.name, self.email, self.phone, self.location, self.linkedin,
+                self.github, self.summary, self.skills,
+                [[exp.title, exp.company, exp.date, exp.description] for exp in self.experience],
+                self.total_experience, self.degrees, self.certifications,
+                self.languages, self.projects, self.degraded_fields]
+
+    @classmethod
+    def from_tuple(cls, values: list) -> 'Resume':
+        """Rebuild a resume from its positional form"""
+        (name, email, phone, location, linkedin, github, summary, skills, experience,
+         total_experience, degrees, certifications, languages, projects, degraded_fields) = values
+        return cls(name, email, phone, location, linkedin, github, summary,
+                   SKILLS.encode(skills), [Experience(*exp) for exp in experience],
+                   total_experience, degrees, certifications, languages, projects, degraded_fields)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the resume to compact binary form"""
+        return packb([RECORD_FORMAT_VERSION, self.to_tuple()])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Resume':
+        """Deserialize a resume produced by to_bytes"""
+        version, values = unpackb(data)
+        _check_version(version)
+        return cls.from_tuple(values)
 
+
+@dataclass(slots=True)
 class JobPosting:
-    """Class to represent a job posting"""
-    def __init__(self, title="", company="", location="", 
-                 description="", required_skills=None, match_score=0):
-        self.title = title
-        self.company = company
-        self.location = location
-        self.description = description
-        self.required_skills = required_skills or []
-        self.match_score = match_score
-    
-    def to_dict(self):
-        """Convert the job posting object to a dictionary"""
+    """A job posting in the catalog"""
+    id: Any = None
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    description: str = ""
+    required_skill_ids: array = field(default_factory=lambda: array('I'))
+    industry: str = ""
+    experience_level: str = ""
+    remote: Optional[bool] = None
+
+    @property
+    def required_skills(self) -> List[str]:
+        """Required skill names in posting order"""
+        return SKILLS.decode(self.required_skill_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job posting to a JSON-serializable dictionary"""
+        data = {
+            'id': self.id,
+            'title': self.title,
+            'company': self.company,
+            'location': self.location,
+            'description': self.description,
+            'required_skills': self.required_skills
+        }
+        if self.industry:
+            data['industry'] = self.industry
+        if self.experience_level:
+            data['experience_level'] = self.experience_level
+        if self.remote is not None:
+            data['remote'] = self.remote
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'JobPosting':
+        """Build a job posting from a dictionary"""
+        remote = data.get('remote')
+        return cls(
+            id=data.get('id'),
+            title=data.get('title', ''),
+            company=data.get('company', ''),
+            location=data.get('location', ''),
+            description=data.get('description', ''),
+            required_skill_ids=SKILLS.encode(data.get('required_skills', [])),
+            industry=data.get('industry', '') or '',
+            experience_level=data.get('experience_level', '') or '',
+            remote=None if remote is None else bool(remote)
+        )
+
+    @classmethod
+    def coerce(cls, data: Any) -> 'JobPosting':
+        """Accept either a JobPosting or a dictionary"""
+        return data if isinstance(data, JobPosting) else cls.from_dict(data)
+
+    def to_tuple(self) -> list:
+        """Positional form used by the binary encoding"""
+        return [self.id, self.title, self.company, self.location, self.description,
+                self.required_skills, self.industry, self.experience_level, self.remote]
+
+    @classmethod
+    def from_tuple(cls, values: list) -> 'JobPosting':
+        """Rebuild a job posting from its positional form"""
+        job_id, title, company, location, description, skills, industry, level, remote = values
+        return cls(job_id, title, company, location, description,
+                   SKILLS.encode(skills), industry, level, remote)
+
+
+@dataclass(slots=True)
+class JobMatch:
+    """
+    A scored job for one resume.
+
+    Posting fields are read through the shared JobPosting rather than copied.
+    """
+    job: JobPosting
+    match_score: int = 0
+    skill_match: int = 0
+    semantic_score: int = 0
+    matching_skill_ids: array = field(default_factory=lambda: array('I'))
+    missing_skill_ids: array = field(default_factory=lambda: array('I'))
+    key_job_requirements: List[str] = field(default_factory=list)
+    # Job id of the canonical posting of this job's near-duplicate cluster
+    cluster_id: Any = None
+    # Number of other live postings collapsed into this match
+    similar_count: int = 0
+
+    @property
+    def id(self) -> Any:
+        return self.job.id
+
+    @property
+    def title(self) -> str:
+        return self.job.title
+
+    @property
+    def company(self) -> str:
+        return self.job.company
+
+    @property
+    def location(self) -> str:
+        return self.job.location
+
+    @property
+    def description(self) -> str:
+        return self.job.description
+
+    @property
+    def matching_skills(self) -> List[str]:
+        return SKILLS.decode(self.matching_skill_ids)
+
+    @property
+    def missing_skills(self) -> List[str]:
+        return SKILLS.decode(self.missing_skill_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the match to the JSON shape used by the templates and API"""
         return {
+            'id': self.id,
             'title': self.title,
             'company': self.company,
             'location': self.location,
             'description': self.description,
-            'required_skills': self.required_skills,
-            'match_score': self.match_score
+            'match_score': self.match_score,
+            'skill_match': self.skill_match,
+            'semantic_score': self.semantic_score,
+            'matching_skills': self.matching_skills,
+            'missing_skills': self.missing_skills,
+            'key_job_requirements': self.key_job_requirements,
+            'cluster_id': self.cluster_id,
+            'similar_count': self.similar_count
         }
+
+    def to_tuple(self) -> list:
+        """Positional form used by the binary encoding"""
+        return [self.job.to_tuple(), self.match_score, self.skill_match, self.semantic_score,
+                self.matching_skills, self.missing_skills, self.key_job_requirements,
+                self.cluster_id, self.similar_count]
+
+    @classmethod
+    def from_tuple(cls, values: list) -> 'JobMatch':
+        """Rebuild a match from its positional form"""
+        (job, match_score, skill_match, semantic_score, matching, missing, keywords,
+         cluster_id, similar_count) = values
+        return cls(JobPosting.from_tuple(job), match_score, skill_match, semantic_score,
+                   SKILLS.encode(matching), SKILLS.encode(missing), keywords, cluster_id, similar_count)
+
+
+@dataclass(slots=True)
+class Insights:
+    """Career insights derived from a resume"""
+    experience_level: str = "Unknown"
+    relevant_industry: str = "Unknown"
+    top_skills: List[str] = field(default_factory=list)
+    skill_count: int = 0
+    using_enhanced_matching: bool = False
+    extracted_keywords: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the insights to a dictionary"""
+        return {
+            'experience_level': self.experience_level,
+            'relevant_industry': self.relevant_industry,
+            'top_skills': self.top_skills,
+            'skill_count': self.skill_count,
+            'using_enhanced_matching': self.using_enhanced_matching,
+            'extracted_keywords': self.extracted_keywords
+        }
+
+    def to_tuple(self) -> list:
+        """Positional form used by the binary encoding"""
+        return [self.experience_level, self.relevant_industry, self.top_skills,
+                self.skill_count, self.using_enhanced_matching, self.extracted_keywords]
+
+    @classmethod
+    def from_tuple(cls, values: list) -> 'Insights':
+        """Rebuild insights from their positional form"""
+        return cls(*values)
+
+
+@dataclass(slots=True)
+class Recommendations:
+    """Ranked job matches plus insights for one resume"""
+    jobs: List[JobMatch] = field(default_factory=list)
+    insights: Insights = field(default_factory=Insights)
+    filters: Dict[str, Any] = field(default_factory=dict)
+    # Compact ranking behind the first page (result_store.RankedResults); not serialized
+    ranking: Any = field(default=None, compare=False, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the recommendations to a JSON-serializable dictionary"""
+        return {
+            'jobs': [job.to_dict() for job in self.jobs],
+            'filters': self.filters,
+            'insights': self.insights.to_dict()
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize the recommendations to compact binary form"""
+        return packb([RECORD_FORMAT_VERSION, [job.to_tuple() for job in self.jobs],
+                      self.insights.to_tuple(), self.filters])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Recommendations':
+        """Deserialize recommendations produced by to_bytes"""
+        version, jobs, insights, filters = unpackb(data)
+        _check_version(version)
+        return cls([JobMatch.from_tuple(job) for job in jobs],
+                   Insights.from_tuple(insights), filters)
+
+
+def _check_version(version: int) -> None:
+    """Reject records written with an incompatible layout"""
+    if version != RECORD_FORMAT_VERSION:
+        raise ValueError(f"Unsupported record format version: {version}")
@@ -0,0 +1,264 @@
+"""
+Token-budgeted prompt assembly for the career assistant chat.
+
+The system prompt starts with a fixed instruction prefix that never varies
+between requests, so the API's prompt caching can reuse it. Session context
+(target job, missing skills, resume skills) follows in a separate message,
+ranked by relevance to the question and cut to a token budget. The
+completion length is chosen from the kind of question asked.
+
+Tokens are counted with tiktoken when it is installed and estimated from
+word and punctuation counts otherwise.
+"""
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Try to import tiktoken
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Tokens allowed for session context in the prompt
+PROMPT_CONTEXT_BUDGET = int(os.environ.get("PROMPT_CONTEXT_BUDGET", 120))
+# Tokens of the user's question sent upstream; longer questions are cut
+PROMPT_MAX_QUERY_TOKENS = int(os.environ.get("PROMPT_MAX_QUERY_TOKENS", 300))
+
+# Identical on every request: keep dynamic content out of it so the prefix caches
+STATIC_PREFIX = (
+    "You are a helpful AI career assistant providing advice on job skills, resume building, "
+    "and career development. Provide specific, actionable advice based on the user's profile "
+    "and their target job when it is given. Be concise: match the length of your answer to "
+    "the question, and use short lists for steps or options."
+)
+
+# Completion tokens by question type
+OUTPUT_TOKENS = {
+    'yes_no': 120,
+    'definition': 150,
+    'advice': 300,
+    'plan': 450,
+}
+
+_QUESTION_TYPES: List[Tuple[str, re.Pattern]] = [
+    ('plan', re.compile(r'\b(plan|roadmap|steps|step by step|schedule|timeline|transition|switch|'
+                        r'career change|prepare for|learning path)\b', re.IGNORECASE)),
+    # "What is Kubernetes?", "define ETL", "what does DevOps mean"
+    ('definition', re.compile(r'^\s*(what\s+(is|are)\s+(an?\s+)?[\w+#.\-]+(\s+[\w+#.\-]+)?\s*\??\s*$|'
+                              r'define\b|meaning of\b|what\s+does\s+.+\s+mean\b)', re.IGNORECASE)),
+    # Short closed questions only: not requests ("can you help me ...") and not
+    # questions that also ask why, how or for trade-offs
+    ('yes_no', re.compile(r'^\s*(?!(can|could|would|will)\s+you\b)(is|are|should|can|could|do|does|did|will|would|am)\b'
+                          r'(?!.*\b(why|how|what|which|explain|detail|trade-?offs?|pros|cons|compare|versus|vs)\b)'
+                          r'(?:\W*\w+){0,11}\W*$', re.IGNORECASE)),
+]
+
+_WORDS = re.compile(r'\w+|[^\w\s]')
+# Question words that say which part of the context matters most
+_LEARNING = re.compile(r'\b(learn|develop|improve|gap|missing|need|lack|course|study|upskill)\w*', re.IGNORECASE)
+_SHOWCASE = re.compile(r'\b(resume|cv|interview|highlight|strength|experience|portfolio|linkedin)\w*',
+                       re.IGNORECASE)
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text for the chat model (estimated without tiktoken)"""
+    global _encoding
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('o200k_base')
+        return len(_encoding.encode(text))
+    # Roughly one token per short word or punctuation mark, plus one per
+    # further four characters of a long word
+    return sum(1 + (len(word) - 1) // 4 for word in _WORDS.findall(text))
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    """Cut text to at most limit tokens"""
+    if count_tokens(text) <= limit:
+        return text
+    if TIKTOKEN_AVAILABLE:
+        return _encoding.decode(_encoding.encode(text)[:limit])
+    kept, used = [], 0
+    for match in _WORDS.finditer(text):
+        word = match.group()
+        used += 1 + (len(word) - 1) // 4
+        if used > limit:
+            break
+        kept.append(match)
+    return text[:kept[-1].end()] if kept else ''
+
+
+def question_type(query: str) -> str:
+    """Classify a question as 'plan', 'definition', 'yes_no' or 'advice'"""
+    for name, pattern in _QUESTION_TYPES:
+        if pattern.search(query):
+            return name
+    return 'advice'
+
+
+@dataclass
+class BuiltPrompt:
+    """Messages and completion limit for one chat request"""
+    messages: List[Dict[str, str]]
+    max_tokens: int
+    question_type: str
+    input_tokens: int
+    # Tokens the prompt would have had with all context and the full question
+    unbounded_tokens: int
+    dropped_items: List[str] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.unbounded_tokens - self.input_tokens
+
+
+class PromptBuilder:
+    """
+    Builds chat prompts within a context token budget.
+
+    Args:
+        context_budget: Tokens allowed for session context
+        max_query_tokens: Tokens of the user's question kept
+        baseline_max_tokens: Completion limit used before this builder, for
+            reporting the output tokens saved
+    """
+
+    def __init__(self, context_budget: int = PROMPT_CONTEXT_BUDGET,
+                 max_query_tokens: int = PROMPT_MAX_QUERY_TOKENS, baseline_max_tokens: int = 300):
+        self.context_budget = context_budget
+        self.max_query_tokens = max_query_tokens
+        self.baseline_max_tokens = baseline_max_tokens
+        self.prefix_tokens = count_tokens(STATIC_PREFIX)
+        self._lock = threading.Lock()
+        self._metrics = {'requests': 0, 'input_tokens': 0, 'input_tokens_saved': 0,
+                         'output_tokens_budgeted': 0, 'output_tokens_saved': 0,
+                         'context_items_dropped': 0, 'by_type': {}}
+
+    @staticmethod
+    def _rank_items(query: str, context: Dict[str, Any]) -> List[Tuple[float, str, str]]:
+        """
+        Context items as (relevance, kind, value), most relevant first
+
+        Items named in the question rank first. Otherwise missing skills
+        lead for questions about learning or gaps, resume skills for
+        questions about presenting oneself, and earlier items in each list
+        (the parser's and the job's order) win ties.
+        """
+        query_words = {word.lower() for word in _WORDS.findall(query)}
+        query_lower = query.lower()
+        learning = bool(_LEARNING.search(query))
+        showcase = bool(_SHOWCASE.search(query))
+        items, seen = [], set()
+        for kind, prior in (('missing_skills', 1.0 + learning), ('skills', 0.8 + showcase)):
+            values = context.get(kind) or []
+            for position, value in enumerate(values):
+                value = str(value)
+                if value.lower() in seen:
+                    continue
+                seen.add(value.lower())
+                words = {word.lower() for word in _WORDS.findall(value)}
+                mentioned = value.lower() in query_lower or bool(words and words <= query_words)
+                overlap = len(words & query_words) / len(words) if words else 0.0
+                # Later list items decay gently so order breaks ties
+                score = 3.0 * mentioned + overlap + prior - position / (10.0 * max(1, len(values)))
+                items.append((score, kind, value))
+        items.sort(key=lambda item: -item[0])
+        return items
+
+    def _context_message(self, query: str, context: Dict[str, Any]) -> Tuple[str, int, List[str]]:
+        """Context text within the budget, its unbounded token count and the dropped items"""
+        job_title = str(context.get('job_title') or '')
+        header = f"Target job: {job_title}\n" if job_title else ''
+        ranked = self._rank_items(query, context)
+        labels = {'missing_skills': "Skills the user needs to develop: ",
+                  'skills': "User's skills: "}
+
+        def render(chosen):
+            # Grouped by kind; each group keeps the ranked order
+            lines = [header.rstrip('\n')] if header else []
+            for kind in ('missing_skills', 'skills'):
+                values = [value for _, item_kind, value in chosen if item_kind == kind]
+                if values:
+                    lines.append(labels[kind] + ', '.join(values))
+            return '\n'.join(lines)
+
+        unbounded = count_tokens(render(ranked))
+        used = count_tokens(header) + sum(count_tokens(label) for label in labels.values())
+        chosen, dropped = [], []
+        for item in ranked:
+            # Each item costs its own tokens plus a separator
+            cost = count_tokens(item[2]) + 1
+            if used + cost <= self.context_budget:
+                chosen.append(item)
+                used += cost
+            else:
+                dropped.append(item[2])
+        return render(chosen), unbounded, dropped
+
+    def build(self, query: str, context: Optional[Dict[str, Any]] = None) -> BuiltPrompt:
+        """
+        Assemble the messages and completion limit for a question
+
+        Args:
+            query: The user's question
+            context: Session context with skills, missing_skills and job_title
+
+        Returns:
+            The prompt, with token counts for it and its unbounded equivalent
+        """
+        kind = question_type(query)
+        max_tokens = OUTPUT_TOKENS[kind]
+        messages = [{'role': 'system', 'content': STATIC_PREFIX}]
+        input_tokens = unbounded_tokens = self.prefix_tokens
+        dropped: List[str] = []
+
+        if context:
+            context_text, unbounded_context, dropped = self._context_message(query, context)
+            if context_text:
+                messages.append({'role': 'system', 'content': context_text})
+                input_tokens += count_tokens(context_text)
+            unbounded_tokens += unbounded_context
+
+        query_tokens = count_tokens(query)
+        user_text = truncate_tokens(query, self.max_query_tokens)
+        messages.append({'role': 'user', 'content': user_text})
+        input_tokens += min(query_tokens, self.max_query_tokens)
+        unbounded_tokens += query_tokens
+
+        prompt = BuiltPrompt(messages, max_tokens, kind, input_tokens, unbounded_tokens, dropped)
+        output_saved = self.baseline_max_tokens - max_tokens
+        with self._lock:
+            self._metrics['requests'] += 1
+            self._metrics['input_tokens'] += input_tokens
+            self._metrics['input_tokens_saved'] += prompt.tokens_saved
+            self._metrics['output_tokens_budgeted'] += max_tokens
+            self._metrics['output_tokens_saved'] += output_saved
+            self._metrics['context_items_dropped'] += len(dropped)
+            self._metrics['by_type'][kind] = self._metrics['by_type'].get(kind, 0) + 1
+        logger.info(f"Prompt for '{kind}' question: {input_tokens} input tokens "
+                    f"({prompt.tokens_saved} saved, {len(dropped)} context items dropped), "
+                    f"max_tokens {max_tokens} (baseline {self.baseline_max_tokens})")
+        return prompt
+
+    def metrics(self) -> Dict[str, Any]:
+        """Input and output token totals and savings, by question type"""
+        with self._lock:
+            requests = self._metrics['requests']
+            return dict(self._metrics,
+                        by_type=dict(self._metrics['by_type']),
+                        avg_input_tokens=self._metrics['input_tokens'] / requests if requests else 0.0,
+                        prefix_tokens=self.prefix_tokens,
+                        tokenizer='tiktoken' if TIKTOKEN_AVAILABLE else 'estimate')
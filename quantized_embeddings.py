@@ -0,0 +1,318 @@
+"""
+Int8-quantized embedding matrices for catalog-wide similarity scoring.
+
+Each row is L2-normalized and stored as int8 codes with one float32 scale,
+so a 384-dim MiniLM embedding takes 388 bytes instead of 1536. Scores are
+computed directly on the codes; callers re-rank their top candidates with
+exact float vectors.
+"""
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Rows dequantized per step when scoring, bounding temporary float memory
+SCORE_BLOCK_ROWS = 16384
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return a float32 copy of matrix with unit-length rows"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+class QuantizedMatrix:
+    """
+    Row-wise symmetric int8 quantization of a float matrix.
+
+    ``row ≈ codes[row] * scales[row]`` with ``scales = max(|row|) / 127``.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    @classmethod
+    def from_float(cls, matrix: np.ndarray) -> 'QuantizedMatrix':
+        """
+        Quantize a float matrix (rows are normalized first)
+
+        Args:
+            matrix: Array of shape (rows, dims)
+
+        Returns:
+            QuantizedMatrix holding int8 codes and per-row scales
+        """
+        matrix = normalize_rows(matrix)
+        scales = np.abs(matrix).max(axis=1) / 127
+        scales[scales == 0] = 1
+        codes = np.clip(np.rint(matrix / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+        return cls(codes, scales.astype(np.float32))
+
+    def save(self, path_prefix: str) -> None:
+        """Write codes and scales next to each other as .npy files"""
+        np.save(f"{path_prefix}.codes.npy", self.codes)
+        np.save(f"{path_prefix}.scales.npy", self.scales)
+
+    @classmethod
+    def load(cls, path_prefix: str, mmap: bool = True) -> 'QuantizedMatrix':
+        """
+        Load a saved matrix, memory-mapping the codes by default
+
+        Memory-mapped codes are shared through the page cache by every
+        worker process on the box instead of being copied into each one.
+        """
+        mode = 'r' if mmap else None
+        return cls(np.load(f"{path_prefix}.codes.npy", mmap_mode=mode),
+                   np.load(f"{path_prefix}.scales.npy"))
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """
+        Approximate dot products of every row with one or more query vectors
+
+        Args:
+            query: Float vector of shape (dims,) or matrix of shape (queries, dims)
+
+        Returns:
+            float32 array of shape (rows,) or (queries, rows)
+        """
+        query = np.asarray(query, dtype=np.float32)
+        result = np.empty((len(self),) + query.shape[:-1], dtype=np.float32)
+        for start in range(0, len(self), SCORE_BLOCK_ROWS):
+            block = self.codes[start:start + SCORE_BLOCK_ROWS]
+            result[start:start + len(block)] = block.astype(np.float32) @ query.T
+        return (result.T * self.scales).astype(np.float32)
+
+    def dequantize(self, rows: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float rows"""
+        return self.codes[rows].astype(np.float32) * self.scales[rows, np.newaxis]
+
+
+class JobEmbeddingStore:
+    """
+    Cosine similarity of a query against every job embedding.
+
+    In ``float32`` mode the normalized matrix is kept as-is. In ``int8`` mode
+    only the quantized codes are scored; the exact float rows used to re-rank
+    the top candidates are saved next to the codes under ``cache_prefix`` and
+    memory-mapped, so they are paged in only for the rows being re-ranked.
+    A store is never modified: ``updated`` returns a new store with rows
+    removed and appended.
+
+    Args:
+        embeddings: Float embeddings of shape (jobs, dims)
+        mode: "float32" or "int8"
+        cache_prefix: Path prefix of the saved codes and float rows (required in int8 mode)
+    """
+
+    def __init__(self, embeddings: np.ndarray, mode: str = 'float32',
+                 cache_prefix: Optional[str] = None):
+        if mode not in ('float32', 'int8'):
+            raise ValueError(f"Unsupported job embedding mode: {mode}")
+        if mode == 'int8' and not cache_prefix:
+            raise ValueError("Int8 job embeddings need a cache_prefix for their exact float rows")
+        self.mode = mode
+        self.cache_prefix = cache_prefix if mode == 'int8' else None
+        # Int8 scoring error measured against float32 when the store was first built
+        self.accuracy: Dict[str, float] = {}
+        normalized = normalize_rows(embeddings)
+
+        if mode == 'float32':
+            self.matrix = normalized
+            self.quantized = None
+            self.float_rows = normalized
+            return
+
+        self.matrix = None
+        self._save_int8(QuantizedMatrix.from_float(normalized), [normalized], normalized.shape)
+
+        # Report the accuracy cost of quantization on a sample of the catalog
+        sample = normalized[:min(32, len(normalized))]
+        if len(sample):
+            self.accuracy = accuracy_report(normalized, self.quantized, sample)
+            logger.info(f"Int8 job embeddings: {self.accuracy}")
+
+    def _save_int8(self, quantized: QuantizedMatrix, float_blocks: Iterable[np.ndarray],
+                   shape: Tuple[int, int]) -> None:
+        """Save the codes and the float rows (written block by block) and memory-map both"""
+        os.makedirs(os.path.dirname(self.cache_prefix) or '.', exist_ok=True)
+        quantized.save(self.cache_prefix)
+        self.quantized = QuantizedMatrix.load(self.cache_prefix, mmap=True)
+        float_path = f"{self.cache_prefix}.float.npy"
+        float_file = np.lib.format.open_memmap(float_path, mode='w+', dtype=np.float32, shape=shape)
+        start = 0
+        for block in float_blocks:
+            float_file[start:start + len(block)] = block
+            start += len(block)
+        float_file.flush()
+        del float_file
+        self.float_rows = np.load(float_path, mmap_mode='r')
+
+    def updated(self, keep: np.ndarray, added: np.ndarray,
+                cache_prefix: Optional[str] = None) -> 'JobEmbeddingStore':
+        """
+        Return a new store without the rows where keep is False and with added rows appended
+
+        Kept rows are copied as they are (in blocks, so a memory-mapped store is
+        never loaded whole); only the added rows are normalized and quantized.
+
+        Args:
+            keep: Boolean mask over the rows of this store
+            added: Float embeddings of the new rows, shape (rows, dims)
+            cache_prefix: Path prefix for the new store's files (int8 mode);
+                must differ from this store's
+
+        Returns:
+            The new store
+        """
+        dims = self.float_rows.shape[1]
+        added = normalize_rows(added) if len(added) else np.zeros((0, dims), dtype=np.float32)
+        if self.quantized is None:
+            return JobEmbeddingStore(np.concatenate([self.matrix[keep], added]), 'float32')
+
+        if not cache_prefix or cache_prefix == self.cache_prefix:
+            raise ValueError("An updated int8 store needs a new cache_prefix")
+        new_rows = QuantizedMatrix.from_float(added)
+        quantized = QuantizedMatrix(np.concatenate([self.quantized.codes[keep], new_rows.codes]),
+                                    np.concatenate([self.quantized.scales[keep], new_rows.scales]))
+
+        def float_blocks():
+            for start in range(0, len(keep), SCORE_BLOCK_ROWS):
+                block_keep = keep[start:start + SCORE_BLOCK_ROWS]
+                yield np.asarray(self.float_rows[start:start + len(block_keep)])[block_keep]
+            yield added
+
+        store = JobEmbeddingStore.__new__(JobEmbeddingStore)
+        store.mode = self.mode
+        store.cache_prefix = cache_prefix
+        store.accuracy = self.accuracy
+        store.matrix = None
+        store._save_int8(quantized, float_blocks(), (len(quantized), dims))
+        return store
+
+    def delete_files(self) -> None:
+        """Remove the saved codes and float rows; existing memory maps stay readable"""
+        if not self.cache_prefix:
+            return
+        for suffix in ('codes', 'scales', 'float'):
+            try:
+                os.remove(f"{self.cache_prefix}.{suffix}.npy")
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self.quantized) if self.quantized is not None else len(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return self.quantized.nbytes if self.quantized is not None else self.matrix.nbytes
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return storage size and the measured accuracy delta"""
+        return {'mode': self.mode, 'jobs': len(self), 'bytes': self.nbytes,
+                'memory_mapped': isinstance(getattr(self.quantized, 'codes', None), np.memmap),
+                'accuracy': self.accuracy}
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity (approximate in int8 mode) of the query with every job
+
+        Args:
+            query: Vector of shape (dims,) or matrix of shape (queries, dims)
+
+        Returns:
+            Array of shape (jobs,) or (queries, jobs)
+        """
+        queries = normalize_rows(query)
+        if self.quantized is not None:
+            scores = self.quantized.dot(queries)
+        else:
+            scores = queries @ self.matrix.T
+        return scores[0] if np.ndim(query) == 1 else scores
+
+    def exact_similarities(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact float cosine similarity of the query (or queries) with selected jobs"""
+        queries = normalize_rows(query)
+        if not len(rows):
+            scores = np.zeros((len(queries), 0), dtype=np.float32)
+        else:
+            scores = queries @ normalize_rows(np.asarray(self.float_rows[rows])).T
+        return scores[0] if np.ndim(query) == 1 else scores
+
+    def search(self, query: np.ndarray, top_k: int, rerank_depth: int = 4) -> Dict[str, np.ndarray]:
+        """
+        Find the top_k most similar jobs
+
+        In int8 mode the quantized scores pick ``top_k * rerank_depth``
+        candidates, which are then re-scored exactly.
+
+        Args:
+            query: Query embedding
+            top_k: Number of results
+            rerank_depth: Candidate multiplier for the exact re-rank
+
+        Returns:
+            Dict with "rows" and "scores", best first
+        """
+        scores = self.similarities(query)
+        depth = min(len(scores), top_k * (rerank_depth if self.quantized is not None else 1))
+        if depth <= 0:
+            return {'rows': np.array([], dtype=np.int64), 'scores': np.array([], dtype=np.float32)}
+        rows = np.argpartition(-scores, depth - 1)[:depth]
+        if self.quantized is not None:
+            candidate_scores = self.exact_similarities(query, rows)
+        else:
+            candidate_scores = scores[rows]
+        order = np.argsort(-candidate_scores, kind='stable')[:top_k]
+        return {'rows': rows[order], 'scores': candidate_scores[order]}
+
+
+def accuracy_report(float_matrix: np.ndarray, quantized: QuantizedMatrix,
+                    queries: np.ndarray, top_k: int = 10) -> Dict[str, float]:
+    """
+    Measure how far int8 scores drift from float32 scores
+
+    Args:
+        float_matrix: Normalized float32 embeddings
+        quantized: The quantized version of float_matrix
+        queries: Query embeddings of shape (queries, dims)
+        top_k: Depth for the recall comparison
+
+    Returns:
+        Mean/max absolute cosine error, top-k recall of the approximate
+        ranking (before re-ranking), and the memory ratio
+    """
+    queries = normalize_rows(queries)
+    errors = []
+    recalls = []
+    k = min(top_k, len(float_matrix))
+    for query in queries:
+        exact = float_matrix @ query
+        approx = quantized.dot(query)
+        errors.append(np.abs(exact - approx))
+        exact_top = set(np.argsort(-exact)[:k])
+        approx_top = set(np.argsort(-approx)[:k])
+        recalls.append(len(exact_top & approx_top) / k if k else 1.0)
+    errors = np.concatenate(errors) if errors else np.zeros(1)
+    return {
+        'mean_abs_error': float(errors.mean()),
+        'max_abs_error': float(errors.max()),
+        f'recall_at_{k}': float(np.mean(recalls)) if recalls else 1.0,
+        'memory_ratio': float_matrix.nbytes / max(quantized.nbytes, 1),
+    }
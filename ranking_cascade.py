@@ -0,0 +1,187 @@
+"""
+Multi-stage ranking: cheap scorers prune the candidate set before expensive ones run.
+
+A cascade is a list of stages. Each stage re-scores the candidates that
+survived the previous stage, keeps its best ``max_candidates`` and hands
+them on. Every stage returns an estimate of the final combined score on the
+same 0-100 scale: a stage that does not compute a term of the blend (the
+skill stage has no semantic score yet) fills it in with the mean of that
+term, so a stage that runs out of its latency budget can leave the
+remaining candidates with their previous score without ranking them below
+the candidates it did score.
+
+The cascade records, per stage, how often it changed the final top-K
+relative to the stage before it; stages that rarely change anything are
+candidates for a smaller budget.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class RunningMean:
+    """Thread-safe mean of the values seen so far, e.g. semantic scores across requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = 0.0
+        self._count = 0
+
+    def add(self, values: Sequence[float]) -> None:
+        with self._lock:
+            self._total += float(np.sum(values))
+            self._count += len(values)
+
+    def value(self, default: Optional[float] = None) -> Optional[float]:
+        """The mean, or default before any value was added"""
+        with self._lock:
+            return self._total / self._count if self._count else default
+
+
+class CascadeStage:
+    """
+    Budget of one ranking stage; the scorer itself is supplied per request.
+
+    Args:
+        name: Stage name used in the configuration and metrics
+        max_candidates: Candidates kept after this stage (None keeps all)
+        max_latency_ms: Time budget for scoring (None is unlimited)
+        chunk_size: Positions scored per call, so the budget is checked between chunks
+    """
+
+    def __init__(self, name: str, max_candidates: Optional[int] = None,
+                 max_latency_ms: Optional[float] = None, chunk_size: Optional[int] = None):
+        self.name = name
+        self.max_candidates = max_candidates
+        self.max_latency_ms = max_latency_ms
+        self.chunk_size = chunk_size
+
+
+def parse_stage_config(config: str) -> List[Tuple[str, Optional[int], Optional[float]]]:
+    """
+    Parse a stage list such as "skill:2000,lexical:100:50,semantic:20:200,blend"
+
+    Each entry is name[:max_candidates[:max_latency_ms]].
+
+    Returns:
+        List of (name, max_candidates, max_latency_ms)
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    stages = []
+    for entry in filter(None, (part.strip() for part in config.split(','))):
+        parts = entry.split(':')
+        if len(parts) > 3 or not parts[0]:
+            raise ValueError(f"Invalid cascade stage: {entry}")
+        max_candidates = int(parts[1]) if len(parts) > 1 and parts[1] else None
+        max_latency_ms = float(parts[2]) if len(parts) > 2 and parts[2] else None
+        stages.append((parts[0], max_candidates, max_latency_ms))
+    return stages
+
+
+def _ranked(positions: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Order by rounded score, ties by position (same as SkillIndex.top_k)"""
+    return np.lexsort((positions, -np.round(scores)))
+
+
+class RankingCascade:
+    """
+    Runs stages in order and keeps per-stage metrics.
+
+    Args:
+        stages: Stages in execution order
+        track_top: Size of the top list compared between stages
+    """
+
+    def __init__(self, stages: Sequence[CascadeStage], track_top: int = 5):
+        self.stages = list(stages)
+        self.track_top = track_top
+        self._lock = threading.Lock()
+        self._metrics = {stage.name: {'runs': 0, 'candidates': 0, 'scored': 0, 'over_budget': 0,
+                                      'total_ms': 0.0, 'top_changed': 0}
+                         for stage in self.stages}
+
+    def rank(self, positions: np.ndarray, top_k: int,
+             scorers: Dict[str, Callable[[np.ndarray], np.ndarray]]) -> List[Tuple[int, float]]:
+        """
+        Rank candidate positions through every stage
+
+        Args:
+            positions: Candidate positions
+            top_k: Number of results
+            scorers: Stage name -> function mapping positions to combined
+                scores (0-100); stages without a scorer are skipped
+
+        Returns:
+            List of (position, combined score), best first
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        scores = np.zeros(len(positions), dtype=np.float64)
+        previous_top = None
+        stats = []
+
+        for stage in self.stages:
+            score_fn = scorers.get(stage.name)
+            if score_fn is None:
+                continue
+            started = time.perf_counter()
+            candidates = len(positions)
+            deadline = started + stage.max_latency_ms / 1000 if stage.max_latency_ms is not None else None
+            chunk = stage.chunk_size or max(len(positions), 1)
+            scored = 0
+            over_budget = False
+            new_scores = scores.copy()
+            for start in range(0, len(positions), chunk):
+                if deadline is not None and start and time.perf_counter() > deadline:
+                    over_budget = True
+                    break
+                batch = positions[start:start + chunk]
+                new_scores[start:start + len(batch)] = score_fn(batch)
+                scored += len(batch)
+
+            order = _ranked(positions, new_scores)
+            if stage.max_candidates is not None:
+                order = order[:max(stage.max_candidates, top_k)]
+            positions, scores = positions[order], new_scores[order]
+
+            top = positions[:min(self.track_top, top_k)].tolist()
+            stats.append((stage.name, candidates, scored, over_budget,
+                          (time.perf_counter() - started) * 1000,
+                          previous_top is not None and top != previous_top))
+            previous_top = top
+
+        with self._lock:
+            for name, candidates, scored, over_budget, elapsed_ms, changed in stats:
+                metrics = self._metrics[name]
+                metrics['runs'] += 1
+                metrics['candidates'] += candidates
+                metrics['scored'] += scored
+                metrics['over_budget'] += int(over_budget)
+                metrics['total_ms'] += elapsed_ms
+                metrics['top_changed'] += int(changed)
+
+        return list(zip(positions[:top_k].tolist(), scores[:top_k].tolist()))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-stage run counts, latency and how often each stage changed the top list"""
+        with self._lock:
+            result = {}
+            for stage in self.stages:
+                metrics = dict(self._metrics[stage.name])
+                runs = metrics['runs'] or 1
+                metrics.update({
+                    'max_candidates': stage.max_candidates,
+                    'max_latency_ms': stage.max_latency_ms,
+                    'avg_ms': metrics.pop('total_ms') / runs,
+                    f'top{self.track_top}_change_rate': metrics['top_changed'] / runs,
+                })
+                result[stage.name] = metrics
+            return result
@@ -0,0 +1,115 @@
+"""
+Compact ranked recommendation results, paged on demand.
+
+A RankedResults keeps only the ranked job ids and their three scores as
+arrays, plus the resume skills needed to rebuild a match. Full JobMatch
+records (matching/missing skills, keywords, cluster info) are built by
+job_recommender.materialize_page for the page actually requested.
+ResultStore holds recent results in memory, least recently used first out.
+It is per process: with several workers, a worker that lacks a session's
+results re-ranks them from the parsed resume (see app.get_session_ranking).
+"""
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Sequence
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Jobs ranked and kept per result (the first page is a prefix of this)
+RESULTS_DEPTH = int(os.environ.get("RESULTS_DEPTH", 50))
+# Results kept in memory across all sessions
+RESULT_STORE_SIZE = int(os.environ.get("RESULT_STORE_SIZE", 2000))
+
+SORT_KEYS = ('match', 'skill', 'semantic')
+
+
+class RankedResults:
+    """
+    Ranked job ids with match, skill and semantic scores.
+
+    Args:
+        job_ids: Job ids in rank order (best match first)
+        match_scores: Combined scores, rounded for display
+        skill_scores: Skill match scores
+        semantic_scores: Semantic scores as displayed (0 when unavailable)
+        resume_skills: Lowercased resume skills, for matching/missing skills
+    """
+
+    def __init__(self, job_ids: Sequence[Any], match_scores: Sequence[float], skill_scores: Sequence[float],
+                 semantic_scores: Sequence[float], resume_skills: FrozenSet[str]):
+        self.job_ids = list(job_ids)
+        self.scores = {
+            'match': np.asarray(match_scores, dtype=np.int16),
+            'skill': np.asarray(skill_scores, dtype=np.int16),
+            'semantic': np.asarray(semantic_scores, dtype=np.int16),
+        }
+        self.resume_skills = resume_skills
+        self._orders: Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def order(self, sort: str = 'match') -> np.ndarray:
+        """Rank indices ordered by a score, ties kept in match order"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if sort == 'match':
+            return np.arange(len(self))
+        if sort not in self._orders:
+            # Stable sort on the negated score keeps the match order among ties
+            self._orders[sort] = np.argsort(-self.scores[sort].astype(np.int32), kind='stable')
+        return self._orders[sort]
+
+    def page(self, offset: int = 0, limit: int = 10, sort: str = 'match') -> np.ndarray:
+        """Rank indices of one page"""
+        return self.order(sort)[max(offset, 0):max(offset, 0) + max(limit, 0)]
+
+
+class ResultStore:
+    """
+    In-memory LRU of ranked results keyed by random result ids.
+
+    Args:
+        max_entries: Results kept before the least recently used is dropped
+    """
+
+    def __init__(self, max_entries: int = RESULT_STORE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self._results: "OrderedDict[str, RankedResults]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {'stored': 0, 'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def put(self, results: RankedResults, result_id: Optional[str] = None) -> str:
+        """Store results under result_id (a new random id if None) and return the id"""
+        result_id = result_id or uuid.uuid4().hex
+        with self._lock:
+            self._results[result_id] = results
+            self._results.move_to_end(result_id)
+            self._metrics['stored'] += 1
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+                self._metrics['evicted'] += 1
+        return result_id
+
+    def get(self, result_id: Optional[str]) -> Optional[RankedResults]:
+        """Return stored results, or None if unknown or evicted"""
+        with self._lock:
+            results = self._results.get(result_id) if result_id else None
+            if results is None:
+                self._metrics['misses'] += 1
+                return None
+            self._results.move_to_end(result_id)
+            self._metrics['hits'] += 1
+            return results
+
+    def metrics(self) -> Dict[str, Any]:
+        """Entry count, hit/miss and eviction counts"""
+        with self._lock:
+            return dict(self._metrics, entries=len(self._results), max_entries=self.max_entries)
@@ -1,14 +1,14 @@
 import os
 import re
+import time
 import logging
 import spacy
 from datetime import datetime
 from dateutil import parser as date_parser
-from PyPDF2 import PdfReader
-import docx
 import nltk
 from nltk.tokenize import word_tokenize, sent_tokenize
-from utils import clean_text
+from extraction_pool import read_document
+from models import SKILLS, Experience, Resume
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +26,17 @@ except OSError:
     os.system("python -m spacy download en_core_web_sm")
     nlp = spacy.load("en_core_web_sm")
 
+# Per-upload parsing budget in seconds; stages past the deadline are skipped or truncated
+PARSE_TIME_BUDGET = float(os.environ.get("PARSE_TIME_BUDGET", 0)) or None
+# Characters scanned for contact details when parsing under a budget
+CONTACT_SCAN_CHARS = 5000
+# Characters of skill keyword scan between deadline checks
+SKILL_SCAN_CHUNK_CHARS = 32768
+# Initial estimate of spaCy throughput, refined after every NER run
+NER_CHARS_PER_SECOND = float(os.environ.get("NER_CHARS_PER_SECOND", 50000))
+# NER is skipped when the remaining budget covers fewer characters than this
+NER_MIN_CHARS = 500
+
 # Regex patterns
 EMAIL_REGEX = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
 PHONE_REGEX = re.compile(r'(\+\d{1,3}[-\s]?)?\(?\d{2,4}\)?[-\s]?\d{3,5}[-\s]?\d{4}')
@@ -45,38 +56,73 @@ COMMON_SKILLS = [
     "agile", "scrum", "critical thinking", "time management", "creativity",
     "git", "api", "rest", "graphql", "microservices", "linux", "unix", "bash"
 ]
+# All skill patterns in one pass; the lookahead also finds skills that overlap others
+SKILLS_REGEX = re.compile(r'(?=(' + '|'.join(r'\b' + re.escape(skill) + r'\b' for skill in COMMON_SKILLS) + r'))')
+
+# Date ranges that start a role in the experience section, e.g. "Jan 2020 - Present"
+EXPERIENCE_DATE_REGEX = re.compile(r'(Jan(uary)?|Feb(ruary)?|Mar(ch)?|Apr(il)?|May|Jun(e)?|Jul(y)?|Aug(ust)?|Sep(tember)?|Oct(ober)?|Nov(ember)?|Dec(ember)?)[\s,]*\d{4}[-–—to\s]*(Jan(uary)?|Feb(ruary)?|Mar(ch)?|Apr(il)?|May|Jun(e)?|Jul(y)?|Aug(ust)?|Sep(tember)?|Oct(ober)?|Nov(ember)?|Dec(ember)?|\d{4}|present|current|now)?', re.IGNORECASE)
 
 # Degree and Cert patterns
 DEGREE_KEYWORDS = ['bachelor', 'master', 'b.sc', 'b.tech', 'm.sc', 'm.tech', 'mba', 'phd']
 CERTIFICATION_KEYWORDS = ['certified', 'certification', 'completed course', 'diploma']
 
+class Deadline:
+    """
+    Time budget shared by the stages of one parse.
+
+    Stages ask for the remaining time and record the fields they had to skip
+    or truncate; without a budget the deadline never expires.
+    """
+
+    def __init__(self, budget=None):
+        self.expires_at = time.perf_counter() + budget if budget else None
+        self.degraded = []
+
+    def remaining(self):
+        """Seconds left (infinite without a budget)"""
+        if self.expires_at is None:
+            return float('inf')
+        return max(self.expires_at - time.perf_counter(), 0.0)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def degrade(self, field, reason):
+        """Record a field that was skipped or computed from partial input"""
+        if field not in self.degraded:
+            self.degraded.append(field)
+        logging.warning(f"Resume field '{field}' degraded: {reason}")
+
 def extract_text_from_resume(file_path, file_extension):
+    """Extract text in this process; the web app uses the sandboxed ExtractionPool instead"""
     try:
-        if file_extension.lower() == 'pdf':
-            text = ''
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                text += page.extract_text() + '\n'
-            return clean_text(text)
-        elif file_extension.lower() == 'docx':
-            doc = docx.Document(file_path)
-            return clean_text('\n'.join(para.text for para in doc.paragraphs))
-        elif file_extension.lower() == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return clean_text(f.read())
-        else:
-            logging.error(f"Unsupported file extension: {file_extension}")
-            return None
+        return read_document(file_path, file_extension)
     except Exception as e:
         logging.error(f"Failed to extract text from {file_path}: {e}")
         return None
 
-def extract_contact_info(text):
-    email = EMAIL_REGEX.search(text)
-    phone = PHONE_REGEX.search(text)
-    linkedin = LINKEDIN_REGEX.search(text)
-    github = GITHUB_REGEX.search(text)
-    location = LOCATION_REGEX.search(text)
+def _search_anchored(pattern, text, anchor, window=200):
+    """Search text for pattern only around occurrences of a literal anchor"""
+    position = text.find(anchor)
+    while position != -1:
+        match = pattern.search(text, max(0, position - window), position + window)
+        if match:
+            return match
+        position = text.find(anchor, position + 1)
+    return None
+
+def extract_contact_info(text, deadline=None):
+    # Contact details sit in the header, so only it is fully scanned when parsing
+    # under a budget. Email, LinkedIn and GitHub have literal anchors ('@',
+    # 'linkedin.com', 'github.com'), so the rest of the text is still searched
+    # for them cheaply; phone and location are taken from the header only.
+    scan = text[:CONTACT_SCAN_CHARS] if deadline is not None and deadline.expires_at is not None else text
+    rest = text[len(scan):]
+    email = EMAIL_REGEX.search(scan) or (rest and _search_anchored(EMAIL_REGEX, rest, '@'))
+    phone = PHONE_REGEX.search(scan)
+    linkedin = LINKEDIN_REGEX.search(scan) or (rest and _search_anchored(LINKEDIN_REGEX, rest, 'linkedin.com'))
+    github = GITHUB_REGEX.search(scan) or (rest and _search_anchored(GITHUB_REGEX, rest, 'github.com'))
+    location = LOCATION_REGEX.search(scan)
     
     lines = text.splitlines()
     potential_name = next((line for line in lines if line.strip()), "")
@@ -92,17 +138,51 @@ def extract_contact_info(text):
         'location': location.group(0) if location else ""
     }
 
-def extract_skills(text):
+def extract_skill_keywords(text, deadline=None):
+    text_lower = text.lower()
+    found = set()
+    start = 0
+    # Scan in chunks ending at line breaks (no skill spans one) so a budget can stop the scan
+    while start < len(text_lower):
+        end = text_lower.find('\n', start + SKILL_SCAN_CHUNK_CHARS)
+        end = len(text_lower) if end == -1 else end
+        found.update(match.group(1) for match in SKILLS_REGEX.finditer(text_lower, start, end))
+        start = end
+        if deadline is not None and start < len(text_lower) and deadline.expired():
+            deadline.degrade('skills', f"keyword scan stopped after {start} of {len(text_lower)} characters")
+            break
+    return [skill.title() for skill in COMMON_SKILLS if skill in found]
+
+def extract_skill_entities(text, found_skills, deadline=None):
+    """Add skills recognized by spaCy NER, truncating the text to fit the remaining budget"""
+    global NER_CHARS_PER_SECOND
     text_lower = text.lower()
-    found_skills = [skill.title() for skill in COMMON_SKILLS if re.search(r'\b' + re.escape(skill) + r'\b', text_lower)]
+    if deadline is not None:
+        limit = deadline.remaining() * NER_CHARS_PER_SECOND
+        if limit < min(NER_MIN_CHARS, len(text_lower)):
+            deadline.degrade('skills', "no time left for entity recognition")
+            return found_skills
+        if limit < len(text_lower):
+            text_lower = text_lower[:int(limit)]
+            deadline.degrade('skills', f"entity recognition limited to the first {len(text_lower)} characters")
     
+    started = time.perf_counter()
     doc = nlp(text_lower)
+    elapsed = time.perf_counter() - started
+    if elapsed > 0 and len(text_lower) >= NER_MIN_CHARS:
+        # Smoothed throughput estimate for sizing the next truncation
+        NER_CHARS_PER_SECOND = 0.8 * NER_CHARS_PER_SECOND + 0.2 * len(text_lower) / elapsed
+    
     for ent in doc.ents:
         if ent.label_ in {"ORG", "PRODUCT"}:
             if ent.text.strip().lower() in COMMON_SKILLS and ent.text.title() not in found_skills:
                 found_skills.append(ent.text.title())
-    
-    return sorted(set(found_skills))
+    return found_skills
+
+def extract_skills(text, deadline=None):
+    """Keyword and entity skills of a text; both passes share the deadline"""
+    found_skills = extract_skill_keywords(text, deadline)
+    return sorted(set(extract_skill_entities(text, found_skills, deadline)))
 
 def extract_education(text):
     education = []
@@ -130,7 +210,7 @@ def extract_projects(text):
             projects.append(line.strip())
     return projects
 
-def extract_experience(text):
+def extract_experience(text, deadline=None):
     experience = []
     lines = text.splitlines()
     in_experience_section = False
@@ -139,9 +219,12 @@ def extract_experience(text):
     experience_keywords = [
         'experience', 'employment', 'work history', 'professional experience', 'career', 'job history'
     ]
-    date_pattern = r'(Jan(uary)?|Feb(ruary)?|Mar(ch)?|Apr(il)?|May|Jun(e)?|Jul(y)?|Aug(ust)?|Sep(tember)?|Oct(ober)?|Nov(ember)?|Dec(ember)?)[\s,]*\d{4}[-–—to\s]*(Jan(uary)?|Feb(ruary)?|Mar(ch)?|Apr(il)?|May|Jun(e)?|Jul(y)?|Aug(ust)?|Sep(tember)?|Oct(ober)?|Nov(ember)?|Dec(ember)?|\d{4}|present|current|now)?'
 
-    for line in lines:
+    for index, line in enumerate(lines):
+        # Checking the clock every line would cost more than the scan itself
+        if deadline is not None and index % 64 == 0 and deadline.expired():
+            deadline.degrade('experience', f"scan stopped after {index} of {len(lines)} lines")
+            break
         line = line.strip()
         if not line:
             continue
@@ -151,11 +234,11 @@ def extract_experience(text):
             continue
         
         if in_experience_section:
-            if re.search(date_pattern, line, re.IGNORECASE):
+            date_match = EXPERIENCE_DATE_REGEX.search(line)
+            if date_match:
                 if current_exp:
                     experience.append(current_exp)
-                title_company_part = re.split(date_pattern, line, flags=re.IGNORECASE)[0].strip()
-                date_match = re.search(date_pattern, line, re.IGNORECASE)
+                title_company_part = line[:date_match.start()].strip()
                 
                 position, company = (title_company_part.split(',', 1) + [""])[:2]
                 current_exp = {
@@ -177,9 +260,12 @@ def extract_experience(text):
 
     return experience
 
-def calculate_total_experience(experience):
+def calculate_total_experience(experience, deadline=None):
     total_months = 0
-    for exp in experience:
+    for index, exp in enumerate(experience):
+        if deadline is not None and deadline.expired():
+            deadline.degrade('total_experience', f"dates of {len(experience) - index} roles not parsed")
+            break
         date_range = exp.get('date', '').lower()
         dates = re.split(r'[-–—to\s]+', date_range)
         try:
@@ -217,22 +303,60 @@ def extract_summary(text):
 
     return summary
 
-def parse_resume(text):
-    contact_info = extract_contact_info(text)
-    experience = extract_experience(text)
-    return {
-        'name': contact_info['name'],
-        'email': contact_info['email'],
-        'phone': contact_info['phone'],
-        'location': contact_info['location'],
-        'linkedin': contact_info['linkedin'],
-        'github': contact_info['github'],
-        'summary': extract_summary(text),
-        'skills': extract_skills(text),
-        'experience': experience,
-        'total_experience': calculate_total_experience(experience),
-        'degrees': extract_education(text),
-        'certifications': extract_certifications(text),
-        'languages': extract_languages(text),
-        'projects': extract_projects(text)
-    }
+def parse_resume(text, time_budget=None):
+    """
+    Parse resume text into a Resume record
+
+    Args:
+        text: Extracted resume text
+        time_budget: Optional budget in seconds. Cheap extractors run first;
+            fuzzy date parsing and NER are cut short or skipped once the
+            budget is spent, and the affected fields are listed in
+            Resume.degraded_fields.
+
+    Returns:
+        The parsed Resume
+    """
+    deadline = Deadline(time_budget)
+    
+    def stage(field, extract, default):
+        """Run a cheap extractor unless the budget is already spent"""
+        if deadline.expired():
+            deadline.degrade(field, "time budget exhausted")
+            return default
+        return extract()
+    
+    # Cheap line and regex scans first; skills right after contact details,
+    # since job matching depends on them
+    contact_info = extract_contact_info(text, deadline)
+    skills = stage('skills', lambda: extract_skill_keywords(text, deadline), [])
+    summary = stage('summary', lambda: extract_summary(text), "")
+    experience = stage('experience', lambda: extract_experience(text, deadline), [])
+    degrees = stage('degrees', lambda: extract_education(text), [])
+    certifications = stage('certifications', lambda: extract_certifications(text), [])
+    languages = stage('languages', lambda: extract_languages(text), [])
+    projects = stage('projects', lambda: extract_projects(text), [])
+    
+    # Expensive stages: fuzzy date parsing, then NER over as much text as the budget allows
+    total_experience = calculate_total_experience(experience, deadline)
+    skills = sorted(set(extract_skill_entities(text, skills, deadline)))
+    
+    if deadline.degraded:
+        logging.info(f"Parsed resume with degraded fields: {', '.join(deadline.degraded)}")
+    return Resume(
+        name=contact_info['name'],
+        email=contact_info['email'],
+        phone=contact_info['phone'],
+        location=contact_info['location'],
+        linkedin=contact_info['linkedin'],
+        github=contact_info['github'],
+        summary=summary,
+        skill_ids=SKILLS.encode(skills),
+        experience=[Experience.from_dict(exp) for exp in experience],
+        total_experience=total_experience,
+        degrees=degrees,
+        certifications=certifications,
+        languages=languages,
+        projects=projects,
+        degraded_fields=deadline.degraded
+    )
@@ -0,0 +1,195 @@
+"""
+Inverted skill index used to prune the job catalog before full scoring
+"""
+import heapq
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models import JobPosting
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+EMPTY_POSTING = np.array([], dtype=np.int32)
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """
+    Lowercase and de-duplicate a list of skills, keeping first-seen order
+
+    Args:
+        skills: Skill names as they appear in a resume or job posting
+
+    Returns:
+        List of unique lowercase skill names
+    """
+    seen = {}
+    for skill in skills or []:
+        if skill:
+            seen.setdefault(skill.strip().lower(), None)
+    return list(seen)
+
+
+class SkillIndex:
+    """
+    Maps each lowercase skill to a posting list of job positions.
+
+    Job positions are indices into the job list the index was built from.
+    Posting lists are sorted, duplicate-free numpy int32 arrays so that
+    unions and intersections are plain vectorized set operations.
+    """
+
+    def __init__(self, job_postings: List[JobPosting]):
+        postings: Dict[str, List[int]] = {}
+        skill_counts = np.zeros(len(job_postings), dtype=np.int32)
+
+        for position, job in enumerate(job_postings):
+            job_skills = normalize_skills(job.required_skills)
+            skill_counts[position] = len(job_skills)
+            for skill in job_skills:
+                # Positions are visited in increasing order, so lists stay sorted
+                postings.setdefault(skill, []).append(position)
+
+        self.num_jobs = len(job_postings)
+        self.skill_counts = skill_counts
+        self.postings = {skill: np.array(positions, dtype=np.int32)
+                         for skill, positions in postings.items()}
+
+    def extended(self, new_postings: List[JobPosting]) -> 'SkillIndex':
+        """
+        Return a copy of the index with jobs appended after the existing positions.
+
+        Only the posting lists of skills required by the new jobs are copied;
+        every other list is shared with this index, which stays unchanged.
+
+        Args:
+            new_postings: Job postings to append, in position order
+
+        Returns:
+            New SkillIndex covering the old and new positions
+        """
+        index = SkillIndex.__new__(SkillIndex)
+        appended: Dict[str, List[int]] = {}
+        new_counts = np.zeros(len(new_postings), dtype=np.int32)
+
+        for offset, job in enumerate(new_postings):
+            job_skills = normalize_skills(job.required_skills)
+            new_counts[offset] = len(job_skills)
+            for skill in job_skills:
+                appended.setdefault(skill, []).append(self.num_jobs + offset)
+
+        index.num_jobs = self.num_jobs + len(new_postings)
+        index.skill_counts = np.concatenate([self.skill_counts, new_counts])
+        index.postings = dict(self.postings)
+        for skill, positions in appended.items():
+            # New positions are larger than any existing one, so lists stay sorted
+            index.postings[skill] = np.concatenate([
+                self.postings.get(skill, EMPTY_POSTING), np.array(positions, dtype=np.int32)])
+        return index
+
+    def posting_list(self, skill: str) -> np.ndarray:
+        """Return the sorted job positions requiring a skill"""
+        return self.postings.get(skill.strip().lower(), EMPTY_POSTING)
+
+    def union(self, skills: Iterable[str]) -> np.ndarray:
+        """Return the sorted job positions requiring any of the skills"""
+        lists = [self.posting_list(skill) for skill in normalize_skills(skills)]
+        lists = [posting for posting in lists if len(posting)]
+        if not lists:
+            return EMPTY_POSTING
+        return np.unique(np.concatenate(lists))
+
+    def intersection(self, skills: Iterable[str]) -> np.ndarray:
+        """Return the sorted job positions requiring all of the skills"""
+        lists = [self.posting_list(skill) for skill in normalize_skills(skills)]
+        if not lists:
+            return EMPTY_POSTING
+        # Intersect the shortest lists first so the running result shrinks fast
+        lists.sort(key=len)
+        result = lists[0]
+        for posting in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def skill_match_scores(self, resume_skills: Iterable[str]) -> np.ndarray:
+        """
+        Calculate the skill match score of every job in one vectorized pass
+
+        Args:
+            resume_skills: List of skills from the resume
+
+        Returns:
+            Array of match percentages (0-100), one per job position
+        """
+        scores = np.zeros(self.num_jobs, dtype=np.float64)
+        lists = [self.posting_list(skill) for skill in normalize_skills(resume_skills)]
+        lists = [posting for posting in lists if len(posting)]
+        if not lists:
+            return scores
+
+        overlap = np.bincount(np.concatenate(lists), minlength=self.num_jobs)
+        has_skills = self.skill_counts > 0
+        scores[has_skills] = np.round(overlap[has_skills] / self.skill_counts[has_skills] * 100)
+        return scores
+
+    def top_k(self, skill_scores: np.ndarray, k: int,
+              score_fn: Callable[[int], float],
+              skill_weight: float = 0.7, semantic_weight: float = 0.3,
+              max_semantic: float = 100,
+              candidates: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Find the k best jobs, fully scoring only those that can still reach the top k.
+
+        Jobs are visited in decreasing order of their score upper bound
+        (``skill_weight * skill + semantic_weight * max_semantic``). Once the
+        bound of the next job rounds below the current k-th best score, no
+        remaining job can enter the result and the scan stops early.
+
+        Args:
+            skill_scores: Skill match score per job position
+            k: Number of jobs to return
+            score_fn: Computes the exact combined score for a job position
+            skill_weight: Weight of the skill match in the combined score
+            semantic_weight: Weight of the semantic score in the combined score
+            max_semantic: Highest value the semantic score can take
+            candidates: Optional job positions to restrict the search to
+
+        Returns:
+            List of (job position, combined score) sorted best first
+        """
+        if k <= 0:
+            return []
+        if candidates is None:
+            candidates = np.arange(self.num_jobs, dtype=np.int32)
+        if not len(candidates):
+            return []
+
+        bounds = skill_weight * skill_scores[candidates] + semantic_weight * max_semantic
+        # Stable sort keeps catalog order among equal bounds
+        order = candidates[np.argsort(-bounds, kind='stable')]
+
+        # Min-heap keyed like the final ranking: rounded score, then catalog order
+        heap: List[Tuple[int, int, float]] = []
+        scored = 0
+        for position in order:
+            position = int(position)
+            if len(heap) == k:
+                bound = skill_weight * skill_scores[position] + semantic_weight * max_semantic
+                if round(bound) < heap[0][0]:
+                    break
+            score = score_fn(position)
+            scored += 1
+            entry = (round(score), -position, score)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        logger.debug(f"Skill index scored {scored} of {len(candidates)} candidate jobs")
+        ranked = sorted(heap, reverse=True)
+        return [(-neg_position, score) for _, neg_position, score in ranked]
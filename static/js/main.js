@@ -16,6 +16,11 @@ document.addEventListener('DOMContentLoaded', function() {
     const sendMessage = document.getElementById('sendMessage');
     const chatMessages = document.getElementById('chatMessages');
     const jobSelect = document.getElementById('jobSelect');
+    
+    // Job recommendation paging elements
+    const jobAccordion = document.getElementById('jobAccordion');
+    const loadMoreJobs = document.getElementById('loadMoreJobs');
+    const jobSort = document.getElementById('jobSort');
 
     // Debug message to check if the script is loading
     console.log('ResuMatch JS loaded successfully');
@@ -220,6 +225,133 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Load more job recommendations from the paginated results endpoint
+    if (jobAccordion && loadMoreJobs) {
+        const pageSize = 10;
+        const resultId = loadMoreJobs.dataset.resultId;
+        const total = parseInt(loadMoreJobs.dataset.total);
+        let offset = parseInt(loadMoreJobs.dataset.offset);
+        const loadMoreError = document.getElementById('loadMoreError');
+        
+        function escapeHtml(value) {
+            const div = document.createElement('div');
+            div.textContent = value == null ? '' : String(value);
+            return div.innerHTML;
+        }
+        
+        function badges(values, className) {
+            return (values || []).map(value => `<span class="badge ${className} me-2 mb-2">${escapeHtml(value)}</span>`).join('');
+        }
+        
+        // Same markup as the server-rendered accordion items in results.html
+        function renderJob(job, index) {
+            const id = `job-more-${index}`;
+            const similar = job.similar_count
+                ? `<span class="badge bg-secondary ms-2" title="Similar postings not shown separately">+${job.similar_count} similar</span>` : '';
+            const semantic = job.semantic_score > 0 ? `
+                <div class="mb-2">
+                    <span class="badge bg-light text-dark p-2">${job.semantic_score}%</span>
+                    <small class="text-muted ms-1">Semantic Match</small>
+                </div>` : '';
+            const keywords = (job.key_job_requirements || []).length ? `
+                <div class="row mb-3">
+                    <div class="col-md-12">
+                        <h5 class="h6 mb-2"><i class="fas fa-key text-info me-2"></i>AI-Identified Key Requirements</h5>
+                        <div class="d-flex flex-wrap">${badges(job.key_job_requirements, 'bg-secondary')}</div>
+                    </div>
+                </div>` : '';
+            
+            const item = document.createElement('div');
+            item.className = 'accordion-item bg-body-tertiary border-0 mb-3';
+            item.innerHTML = `
+                <h2 class="accordion-header">
+                    <button class="accordion-button collapsed bg-body-secondary" type="button"
+                            data-bs-toggle="collapse" data-bs-target="#${id}" aria-expanded="false" aria-controls="${id}">
+                        <div class="d-flex w-100 justify-content-between align-items-center">
+                            <span>${escapeHtml(job.title)} at ${escapeHtml(job.company)} ${similar}</span>
+                            <span class="badge bg-info ms-2">${job.match_score}% match</span>
+                        </div>
+                    </button>
+                </h2>
+                <div id="${id}" class="accordion-collapse collapse" data-bs-parent="#jobAccordion">
+                    <div class="accordion-body">
+                        <p><i class="fas fa-map-marker-alt text-info me-2"></i>${escapeHtml(job.location)}</p>
+                        <p>${escapeHtml(job.description)}</p>
+                        <div class="row mt-3 mb-3">
+                            <div class="col-md-12">
+                                <h5 class="h6 mb-2"><i class="fas fa-chart-bar text-info me-2"></i>Match Score Breakdown</h5>
+                                <div class="d-flex flex-wrap align-items-center">
+                                    <div class="me-4 mb-2">
+                                        <span class="badge bg-info p-2">${job.match_score}%</span>
+                                        <small class="text-muted ms-1">Overall</small>
+                                    </div>
+                                    <div class="me-4 mb-2">
+                                        <span class="badge bg-light text-dark p-2">${job.skill_match}%</span>
+                                        <small class="text-muted ms-1">Skill Match</small>
+                                    </div>${semantic}
+                                </div>
+                            </div>
+                        </div>${keywords}
+                        <div class="row mt-3">
+                            <div class="col-md-6">
+                                <h5 class="h6 mb-2"><i class="fas fa-check-circle text-success me-2"></i>Matching Skills</h5>
+                                <div class="d-flex flex-wrap">${badges(job.matching_skills, 'bg-success')}</div>
+                            </div>
+                            <div class="col-md-6">
+                                <h5 class="h6 mb-2"><i class="fas fa-times-circle text-danger me-2"></i>Missing Skills</h5>
+                                <div class="d-flex flex-wrap">${badges(job.missing_skills, 'bg-danger')}</div>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+            return item;
+        }
+        
+        function showLoadError(message) {
+            if (loadMoreError) {
+                loadMoreError.textContent = message;
+                loadMoreError.classList.toggle('d-none', !message);
+            }
+        }
+        
+        async function loadPage(sort, replace) {
+            loadMoreJobs.disabled = true;
+            showLoadError('');
+            try {
+                const start = replace ? 0 : offset;
+                const limit = replace ? Math.max(offset, pageSize) : pageSize;
+                const response = await fetch(`/api/results/${resultId}?offset=${start}&limit=${limit}&sort=${sort}`);
+                const data = await response.json().catch(() => ({}));
+                if (!response.ok || !data.jobs) {
+                    throw new Error(data.error || 'Could not load more jobs. Please try again.');
+                }
+                if (replace) {
+                    jobAccordion.innerHTML = '';
+                }
+                data.jobs.forEach((job, i) => jobAccordion.appendChild(renderJob(job, start + i)));
+                offset = start + limit;
+            } catch (error) {
+                // Keep the button usable so the user can retry
+                console.error('Error loading job recommendations:', error);
+                showLoadError(error.message);
+            }
+            loadMoreJobs.disabled = offset >= total;
+            loadMoreJobs.style.display = offset >= total ? 'none' : '';
+        }
+        
+        loadMoreJobs.addEventListener('click', function() {
+            loadPage(jobSort ? jobSort.value : 'match', false);
+        });
+        
+        if (jobSort) {
+            // Re-sorting reloads as many jobs as are already shown
+            jobSort.addEventListener('change', function() {
+                loadPage(this.value, true);
+            });
+        }
+    }
+    
     // Career Assistant Chat functionality
     if (chatInput && sendMessage && chatMessages) {
         console.log('Chat elements found, setting up chat functionality');
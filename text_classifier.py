@@ -0,0 +1,158 @@
+"""
+Compiled keyword classifiers for industry and seniority labels.
+
+Label vocabularies live in classifier_config.json. Each classifier compiles
+all of its terms into a single word-bounded regular expression, so a text is
+scanned once regardless of how many labels and terms are configured.
+"""
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_CONFIG_PATH = os.environ.get(
+    "CLASSIFIER_CONFIG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classifier_config.json'))
+
+
+def _compile_terms(terms: List[str], flags: int = 0) -> Optional[re.Pattern]:
+    """Compile terms into one alternation that only matches whole words"""
+    if not terms:
+        return None
+    # Longest first so multi-word terms win over their prefixes
+    alternation = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(r'(?<!\w)(?:' + alternation + r')(?!\w)', flags)
+
+
+class KeywordClassifier:
+    """
+    Weighted keyword classifier over a fixed set of labels.
+
+    A label's score is the sum of the weights of its distinct terms found in
+    the text. Terms match on word boundaries and are case-insensitive unless
+    listed under ``case_sensitive_terms`` (e.g. "IT", which would otherwise
+    match the pronoun "it").
+    """
+
+    def __init__(self, labels: Dict[str, Dict], default: str):
+        self.default = default
+        self.labels = list(labels)
+        # term -> [(label, weight)], keyed lowercase for case-insensitive terms
+        self._weights: Dict[str, List[Tuple[str, float]]] = {}
+        self._case_sensitive_weights: Dict[str, List[Tuple[str, float]]] = {}
+
+        for label, spec in labels.items():
+            for term, weight in spec.get('terms', {}).items():
+                self._weights.setdefault(term.lower(), []).append((label, float(weight)))
+            for term, weight in spec.get('case_sensitive_terms', {}).items():
+                self._case_sensitive_weights.setdefault(term, []).append((label, float(weight)))
+
+        self._pattern = _compile_terms(list(self._weights), re.IGNORECASE)
+        self._case_sensitive_pattern = _compile_terms(list(self._case_sensitive_weights))
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'KeywordClassifier':
+        """Build a classifier from one section of the classifier config"""
+        return cls(config['labels'], config.get('default', ''))
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Score every label against a text in a single pass per pattern
+
+        Args:
+            text: Text to classify
+
+        Returns:
+            Mapping of label to score, for labels with at least one hit
+        """
+        if not text:
+            return {}
+
+        hits = set()
+        if self._pattern is not None:
+            hits = {m.group(0).lower() for m in self._pattern.finditer(text)}
+        case_hits = set()
+        if self._case_sensitive_pattern is not None:
+            case_hits = {m.group(0) for m in self._case_sensitive_pattern.finditer(text)}
+
+        scores: Dict[str, float] = {}
+        for term in hits:
+            for label, weight in self._weights[term]:
+                scores[label] = scores.get(label, 0) + weight
+        for term in case_hits:
+            for label, weight in self._case_sensitive_weights[term]:
+                scores[label] = scores.get(label, 0) + weight
+        return scores
+
+    def classify(self, text: str, default: Optional[str] = None) -> str:
+        """
+        Return the highest-scoring label for a text
+
+        Ties are broken by the order labels appear in the config.
+
+        Args:
+            text: Text to classify
+            default: Label to return when nothing matches (defaults to the config default)
+
+        Returns:
+            The winning label
+        """
+        scores = self.scores(text)
+        if not scores:
+            return self.default if default is None else default
+        return max(self.labels, key=lambda label: (scores.get(label, 0), -self.labels.index(label)))
+
+
+def load_classifiers(path: str = CLASSIFIER_CONFIG_PATH) -> Dict[str, KeywordClassifier]:
+    """
+    Load and compile every classifier defined in a config file
+
+    Args:
+        path: Path to the JSON classifier config
+
+    Returns:
+        Mapping of classifier name (e.g. "industry") to compiled classifier
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return {name: KeywordClassifier.from_config(section) for name, section in config.items()}
+
+
+CLASSIFIERS = load_classifiers()
+INDUSTRY_CLASSIFIER = CLASSIFIERS['industry']
+SENIORITY_CLASSIFIER = CLASSIFIERS['seniority']
+
+
+def classify_job(job: Dict) -> Dict:
+    """
+    Return a copy of a job posting with industry and seniority labels filled in
+
+    Labels already present on the posting are kept.
+    """
+    labeled = dict(job)
+    if not labeled.get('industry'):
+        labeled['industry'] = INDUSTRY_CLASSIFIER.classify(
+            f"{job.get('title', '')} {job.get('description', '')}")
+    if not labeled.get('experience_level'):
+        labeled['experience_level'] = SENIORITY_CLASSIFIER.classify(job.get('title', ''))
+    return labeled
+
+
+def classify_catalog(job_postings: List[Dict]) -> List[Dict]:
+    """Precompute industry and seniority labels for a whole job catalog"""
+    return [classify_job(job) for job in job_postings]
+
+
+if __name__ == '__main__':
+    # Offline labeling: python text_classifier.py jobs.json > labeled_jobs.json
+    if len(sys.argv) != 2:
+        print("Usage: python text_classifier.py <jobs.json>", file=sys.stderr)
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        json.dump(classify_catalog(json.load(f)), sys.stdout, indent=2)
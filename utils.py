@@ -55,9 +55,9 @@ def truncate_text(text, max_length=100):
     truncated = text[:max_length].rsplit(' ', 1)[0]
     return truncated + "..."
 
-def calculate_profile_completeness(resume_data):
+def calculate_profile_completeness(resume):
     """Calculate how complete a resume profile is based on key components"""
-    if not resume_data:
+    if not resume:
         return 0
     
     # Define weights for different resume components
@@ -75,36 +75,36 @@ def calculate_profile_completeness(resume_data):
     score = 0
     
     # Check basic fields
-    if resume_data.get('name'):
+    if resume.name:
         score += component_weights['name']
     
-    if resume_data.get('email'):
+    if resume.email:
         score += component_weights['email']
     
-    if resume_data.get('phone'):
+    if resume.phone:
         score += component_weights['phone']
     
-    if resume_data.get('summary'):
-        summary_length = len(resume_data['summary'])
+    if resume.summary:
+        summary_length = len(resume.summary)
         if summary_length > 200:
             score += component_weights['summary']
         else:
             score += (summary_length / 200) * component_weights['summary']
     
     # Check skills
-    skills = resume_data.get('skills', [])
-    if skills:
-        skill_score = min(len(skills) / 10, 1) * component_weights['skills']
+    skill_count = len(resume.skill_ids)
+    if skill_count:
+        skill_score = min(skill_count / 10, 1) * component_weights['skills']
         score += skill_score
     
     # Check education
-    education = resume_data.get('education', [])
+    education = resume.degrees
     if education:
         edu_score = min(len(education), 2) / 2 * component_weights['education']
         score += edu_score
     
     # Check experience
-    experience = resume_data.get('experience', [])
+    experience = resume.experience
     if experience:
         exp_score = min(len(experience), 3) / 3 * component_weights['experience']
         score += exp_score